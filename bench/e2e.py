@@ -0,0 +1,116 @@
+import io
+import os
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime
+
+from bench import mock_govkz
+from bench.run import RESULTS_DIR
+
+# Сквозной прогон настоящих потоков Selenium (parse_sanctions, extract_excel_from_govkz)
+# против локальной заглушки gov.kz в headless Chrome: записи в секунду и полнота
+# (сколько карточек потеряно из-за «плавающих» кликов).
+#   python -m bench.e2e --pages 30 --latency 0.2 --flaky 0.05
+
+
+def point_parsers_at(base_url):
+    # Адреса берутся из модульных URL в момент вызова — подменяем их на заглушку
+    import rcb
+    import sanc
+    import issued_parser
+    import issued_insurances_parser
+
+    sanc.URL = f"{base_url}/sanctions"
+    rcb.URL = f"{base_url}/registry/rcb"
+    issued_parser.URL = f"{base_url}/registry/issued"
+    issued_insurances_parser.URL = f"{base_url}/registry/insurances"
+
+
+def run_flow(name, expected, fn, verbose):
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    error = None
+    with quiet:
+        try:
+            records = fn()
+        except Exception as e:
+            records, error = 0, str(e)
+    seconds = time.perf_counter() - started
+    result = {
+        "flow": name,
+        "records": records,
+        "expected": expected,
+        "missing": expected - records,
+        "seconds": round(seconds, 2),
+        "records_per_second": round(records / seconds, 2) if seconds else None,
+        "error": error,
+    }
+    mark = "✅" if not error and records == expected else "⚠️"
+    print(f"{mark} {name}: {records}/{expected} записей за {result['seconds']} с ({result['records_per_second']} зап/с)" + (f" — {error}" if error else ""))
+    return result
+
+
+def sanctions_flow(extraction, workdir):
+    import sanc
+
+    def run():
+        stream_path = os.path.join(workdir, f"sanctions-{extraction}.jsonl")
+        sanc.parse_sanctions(
+            extraction, compact=False,
+            stream_path=stream_path, checkpoint_path=os.path.join(workdir, f"checkpoint-{extraction}.json"),
+        )
+        return sum(1 for _ in sanc.iter_stream(stream_path))
+    return run
+
+
+def issued_flow(extraction):
+    import issued_parser
+    return lambda: len(issued_parser.extract_excel_from_govkz(extraction) or [])
+
+
+def insurances_flow(extraction):
+    import issued_insurances_parser
+    return lambda: len(issued_insurances_parser.extract_excel_from_govkz(extraction) or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сквозной прогон парсеров против заглушки gov.kz")
+    mock_govkz.config_arguments(parser)
+    parser.add_argument("--extraction", choices=("browser", "soup"), default="browser")
+    parser.add_argument("--output", help="файл результатов (по умолчанию bench/results/e2e-<время>.json)")
+    parser.add_argument("--verbose", action="store_true", help="показывать вывод парсеров")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOVKZ_HEADLESS", "1")
+    config = mock_govkz.config_from_args(args)
+    server, base_url = mock_govkz.serve(config)
+    print(f"🌐 Заглушка: {base_url}")
+    point_parsers_at(base_url)
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            results.append(run_flow("sanctions", config.expected("sanctions"), sanctions_flow(args.extraction, workdir), args.verbose))
+            results.append(run_flow("issued", config.expected("issued"), issued_flow(args.extraction), args.verbose))
+            results.append(run_flow("insurances", config.expected("insurances"), insurances_flow(args.extraction), args.verbose))
+    finally:
+        server.shutdown()
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "extraction": args.extraction,
+        "config": vars(config),
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, "e2e-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 Результаты: {output}")
+
+
+if __name__ == "__main__":
+    main()
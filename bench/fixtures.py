@@ -0,0 +1,250 @@
+import random
+from html import escape
+
+# Синтетические страницы реестров gov.kz в той же вёрстке Ant Design, что разбирают парсеры:
+# .collapse > .collapse__header/.collapse__value + .collapse__content > .collapse__content__card,
+# вложенные .ant-collapse со стрелками, для санкций — .collapse-group и li.ant-pagination-*.
+# Генерация детерминирована (seed), сеть и Chrome не нужны.
+# expanded=False — страница «до раскрытия», как её отдаёт gov.kz: содержимое карточек и
+# вложенных секций лежит в <template> и появляется в DOM только после клика (см. bench/mock_govkz.py).
+# per_container > 1 — несколько карточек в одном .collapse (сверка разбора в пуле процессов).
+
+REGISTRIES = ("rcb", "issued", "insurances", "sanctions")
+
+ORG_TYPES = ("Банк второго уровня", "Организация, осуществляющая отдельные виды банковских операций", "Ипотечная организация")
+INSURANCE_FORMS = ("Обязательное страхование", "Добровольное личное страхование", "Добровольное имущественное страхование")
+INSURANCE_CLASSES = ("страхование от несчастных случаев", "страхование на случай болезни", "страхование автомобильного транспорта",
+                     "страхование грузов", "страхование имущества от ущерба", "страхование гражданско-правовой ответственности")
+SANCTION_TYPES = ("Штраф", "Предписание", "Письменное предупреждение", "Ограниченные меры воздействия")
+
+
+def page_shell(body, title="Реестр"):
+    # Шапка, скрипты и подвал — всё то, что парсер выбрасывает
+    scripts = "".join(f"<script>window.__chunk{i} = {{\"collapse\": \"<div class='collapse'>\"}};</script>" for i in range(30))
+    styles = "".join(f"<style>.c{i} {{ margin: {i}px; }} .collapse__header {{ cursor: pointer; }}</style>" for i in range(30))
+    menu = "".join(f"<li><a href='/memleket/entities/ardfm/{i}'>Раздел {i} &amp; подраздел</a></li>" for i in range(80))
+    footer = "".join(f"<p>Агентство по регулированию и развитию финансового рынка&nbsp;{i}</p>" for i in range(120))
+    return (
+        f"<!DOCTYPE html><html lang='ru'><head><meta charset='utf-8'><title>{title}</title>{scripts}{styles}</head>"
+        f"<body><header><nav><ul>{menu}</ul></nav></header><main>{body}</main><footer>{footer}</footer></body></html>"
+    )
+
+
+def descriptions(pairs, row_class="ant-descriptions-row"):
+    rows = "".join(
+        f"<tr class='{row_class}'><th class='ant-descriptions-item-label'>{escape(k)}</th>"
+        f"<td class='ant-descriptions-item-content'><span>{escape(v)}</span></td></tr>"
+        for k, v in pairs
+    )
+    return f"<div class='ant-descriptions'><table><tbody>{rows}</tbody></table></div>"
+
+
+def two_cells(pairs):
+    return "<table><tbody>" + "".join(f"<tr><td>{escape(k)}</td><td>{escape(v)}</td></tr>" for k, v in pairs) + "</tbody></table>"
+
+
+def lazy(content, expanded):
+    return content if expanded else f"<template>{content}</template>"
+
+
+def inner_collapse(title, content, expanded=True):
+    item_class = "ant-collapse-item ant-collapse-item-active" if expanded else "ant-collapse-item"
+    body = f"<div class='ant-collapse-content ant-collapse-content-active'><div class='ant-collapse-content-box'>{content}</div></div>"
+    return (
+        f"<div class='ant-collapse'><div class='{item_class}'>"
+        f"<div class='ant-collapse-header'><span class='anticon anticon-right ant-collapse-arrow'><svg></svg></span>{title}</div>"
+        f"{lazy(body, expanded)}</div></div>"
+    )
+
+
+def ant_table(rows):
+    body = "".join("<tr>" + "".join(f"<td class='ant-table-cell'>{escape(c)}</td>" for c in row) + "</tr>" for row in rows)
+    return f"<div class='ant-table-wrapper'><table><thead><tr><th>Дата</th><th>Основание</th><th>Причина</th><th>Валюта</th></tr></thead><tbody>{body}</tbody></table></div>"
+
+
+def card(name, content, expanded=True):
+    # content — одна карточка или список карточек одного контейнера
+    contents = content if isinstance(content, list) else [content]
+    body = "".join(lazy(f"<div class='collapse__content__card'>{c}</div>", expanded) for c in contents)
+    return (
+        f"<div class='collapse card'><div class='collapse__header'><div class='collapse__header__title'>"
+        f"<span class='collapse__value'>{escape(name)}</span></div></div>"
+        f"<div class='collapse__content'>{body}</div></div>"
+    )
+
+
+def date(rng):
+    return f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2005, 2024)}"
+
+
+def bin_code(i):
+    return f"{(i * 7919) % 10 ** 12:012d}"
+
+
+def rcb_content(i, rng, expanded=True):
+    pairs = [
+        ("Наименование", f"АО «Брокер {i}»"),
+        ("БИН", bin_code(i)),
+        ("Номер лицензии", f"3.2.{i}"),
+        ("Дата выдачи лицензии", date(rng)),
+        ("Виды деятельности", "брокерская и дилерская деятельность на рынке ценных бумаг"),
+    ]
+    return descriptions(pairs, "ant-descriptions-row")
+
+
+def rcb_card(i, rng, expanded=True):
+    return card(f"АО «Брокер {i}»", rcb_content(i, rng, expanded), expanded)
+
+
+def issued_content(i, rng, expanded=True):
+    pairs = [
+        ("БИН", bin_code(i)),
+        ("Тип организации", rng.choice(ORG_TYPES)),
+        ("Номер первичной лицензии", f"1.2.{i}"),
+        ("Дата первичной лицензии", date(rng)),
+        ("Номер действующей лицензии", f"1.2.{i}/{rng.randint(1, 9)}"),
+        ("Дата действующей лицензии", date(rng)),
+        ("Номер решения", f"{rng.randint(1, 400)}"),
+        ("Дата решения", date(rng)),
+        ("Операции в национальной валюте в тенге", "в национальной и иностранной валюте"),
+        ("Количество операций", str(rng.randint(1, 20))),
+        ("Банковские заемные операции: предоставление кредитов", "✓"),
+    ]
+    content = descriptions(pairs)
+    if rng.random() < 0.3:
+        content += inner_collapse("Переоформление", ant_table([["Переоформление лицензии", "реорганизация", "изменение наименования", "KZT"]]), expanded)
+    return content
+
+
+def issued_card(i, rng, expanded=True):
+    return card(f"АО «Банк {i}»", issued_content(i, rng, expanded), expanded)
+
+
+def insurance_content(i, rng, expanded=True):
+    pairs = [
+        ("БИН", bin_code(i)),
+        ("Номер лицензии", f"2.1.{i}"),
+        ("Дата выдачи лицензии", date(rng)),
+        ("Всего классов", str(rng.randint(1, 30))),
+    ]
+    content = two_cells(pairs)
+    if rng.random() < 0.5:
+        content += inner_collapse("Переоформления", ant_table([[date(rng), "решение", "переоформление", "KZT"] for _ in range(rng.randint(1, 3))]), expanded)
+    for form in INSURANCE_FORMS:
+        content += f"<b>{form}:</b>" + two_cells([(c, rng.choice(("✓", ""))) for c in INSURANCE_CLASSES])
+    return content
+
+
+def insurance_card(i, rng, expanded=True):
+    return card(f"АО «Страховая компания {i}»", insurance_content(i, rng, expanded), expanded)
+
+
+def sanction_card(i, rng, expanded=True):
+    header = [
+        ("БИН", bin_code(i)),
+        ("Наименование организации", f"ТОО «Организация {i}»"),
+        ("Дата решения", date(rng)),
+        ("Номер принятия решения", f"{i}-{rng.randint(1, 99)}"),
+    ]
+    details = [
+        ("Вид взыскания", "Санкция"),
+        ("Тип взыскания", rng.choice(SANCTION_TYPES)),
+        ("Наложенное взыскание", f"{rng.randint(1, 500) * 1000} тенге"),
+        ("Существо нарушения", "нарушение требований пруденциальных нормативов"),
+        ("Срок исполнения", date(rng)),
+        ("Статья НПА", f"статья {rng.randint(1, 300)}"),
+        ("Примечание", ""),
+        ("Тип НПА", "Закон"),
+        ("Наименование департамента", "Департамент надзора"),
+    ]
+    title = "".join(f"<div class='row'><div class='col-md-4'>{escape(k)}</div><div class='col-md-8'>{escape(v)}</div></div>" for k, v in header)
+    rows = "".join(
+        f"<div class='row'><div class='typography__variant-bodyhl'>{escape(k)}</div><div class='typography__variant-body'>{escape(v)}</div></div>"
+        for k, v in details
+    )
+    body = lazy(f"<div class='collapse__content__card'>{rows}</div>", expanded)
+    return (
+        f"<div class='card collapse'><button type='button' class='collapse__header'><div class='collapse__header__title--html'>{title}</div></button>"
+        f"<div class='collapse__content'>{body}</div></div>"
+    )
+
+
+CARD_BUILDERS = {
+    "rcb": rcb_card,
+    "issued": issued_card,
+    "insurances": insurance_card,
+    "sanctions": sanction_card,
+}
+
+
+CONTENT_BUILDERS = {
+    "rcb": rcb_content,
+    "issued": issued_content,
+    "insurances": insurance_content,
+}
+
+
+def grouped_cards(registry, cards, per_container, seed=0, expanded=True):
+    # Несколько карточек в одном .collapse — организация с несколькими лицензиями.
+    # У страховых таблица последней формы стоит уже после контейнера: block_forms находит
+    # её через find_next, как на живой странице
+    rng = random.Random(f"{registry}:{seed}:grouped")
+    builder = CONTENT_BUILDERS[registry]
+    containers = []
+    for start in range(0, cards, per_container):
+        contents = [builder(i, rng, expanded) for i in range(start, min(start + per_container, cards))]
+        following = ""
+        if registry == "insurances":
+            cut = contents[-1].rindex("<table>")
+            contents[-1], following = contents[-1][:cut], contents[-1][cut:]
+        containers.append(card(f"Организация {start // per_container}", contents, expanded) + following)
+    return "".join(containers)
+
+
+def pagination(current, total):
+    # Окно Ant Design: 1 … current±2 … total, «±5 страниц» и quick jumper
+    def item(n):
+        active = " ant-pagination-item-active" if n == current else ""
+        return f"<li title='{n}' class='ant-pagination-item ant-pagination-item-{n}{active}' tabindex='0'><a rel='nofollow'>{n}</a></li>"
+
+    prev_disabled = " ant-pagination-disabled" if current == 1 else ""
+    next_disabled = " ant-pagination-disabled" if current == total else ""
+    items = [f"<li title='Previous Page' class='ant-pagination-prev{prev_disabled}'><a class='ant-pagination-item-link'>‹</a></li>"]
+    window = range(max(1, current - 2), min(total, current + 2) + 1)
+    if window[0] > 1:
+        items.append(item(1))
+    if window[0] > 2:
+        items.append("<li title='Previous 5 Pages' class='ant-pagination-jump-prev' tabindex='0'><a class='ant-pagination-item-link'>•••</a></li>")
+    items.extend(item(n) for n in window)
+    if window[-1] < total - 1:
+        items.append("<li title='Next 5 Pages' class='ant-pagination-jump-next' tabindex='0'><a class='ant-pagination-item-link'>•••</a></li>")
+    if window[-1] < total:
+        items.append(item(total))
+    items.append(f"<li title='Next Page' class='ant-pagination-next{next_disabled}'><a class='ant-pagination-item-link'>›</a></li>")
+    items.append("<li class='ant-pagination-options'><div class='ant-pagination-options-quick-jumper'>Перейти<input type='text'></div></li>")
+    return f"<ul class='ant-pagination'>{''.join(items)}</ul>"
+
+
+def registry_cards(registry, cards, seed=0, offset=0, expanded=True):
+    rng = random.Random(f"{registry}:{seed}:{offset}")
+    builder = CARD_BUILDERS[registry]
+    return "".join(builder(offset + i, rng, expanded) for i in range(cards))
+
+
+def registry_page(registry, cards, seed=0, expanded=True, per_container=1):
+    if per_container > 1 and registry != "sanctions":
+        body = grouped_cards(registry, cards, per_container, seed, expanded)
+    else:
+        body = registry_cards(registry, cards, seed, expanded=expanded)
+    if registry == "sanctions":
+        body = f"<div class='collapse-group'>{body}</div>{pagination(1, 1)}"
+    return page_shell(body)
+
+
+def sanctions_page(page, pages, per_page=10, seed=0, expanded=True):
+    body = registry_cards("sanctions", per_page, seed, offset=(page - 1) * per_page, expanded=expanded)
+    return page_shell(f"<div class='collapse-group'>{body}</div>{pagination(page, pages)}")
+
+
+def sanctions_pages(pages, per_page=10, seed=0):
+    return [sanctions_page(page, pages, per_page, seed) for page in range(1, pages + 1)]
@@ -0,0 +1,190 @@
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from bench import fixtures
+
+# Локальная заглушка gov.kz для сквозных прогонов Selenium без живого сайта.
+#   /registry/<rcb|issued|insurances>  — реестр с нераскрытыми карточками
+#   /sanctions                         — первая страница санкций, дальше пагинация через XHR
+#   /api/sanctions?page=N              — карточки и пагинация страницы N (JSON)
+# Содержимое карточек и вложенных секций появляется в DOM только после клика, с задержкой
+# отрисовки; часть кликов можно «терять» (flaky), задержку ответа сервера — задать latency.
+
+PAGE_JS = """
+<script>
+(function () {
+    const config = %(config)s;
+    const later = (fn) => setTimeout(fn, config.render_delay);
+    const lost = (p) => Math.random() < p;
+
+    const unpack = (el) => {
+        const tpl = el.querySelector(':scope > template');
+        if (tpl) { el.appendChild(tpl.content.cloneNode(true)); tpl.remove(); }
+    };
+    const openCard = (card) => unpack(card.querySelector('.collapse__content'));
+    const openItem = (item) => {
+        unpack(item);
+        item.classList.add('ant-collapse-item-active');
+    };
+
+    const goTo = (page) => {
+        const current = parseInt(document.querySelector('li.ant-pagination-item-active').getAttribute('title'), 10);
+        page = Math.max(1, Math.min(config.pages, page));
+        if (page === current) { return; }
+        const xhr = new XMLHttpRequest();
+        xhr.open('GET', '/api/sanctions?page=' + page);
+        xhr.onload = () => {
+            const data = JSON.parse(xhr.responseText);
+            document.querySelector('.collapse-group').innerHTML = data.cards;
+            document.querySelector('ul.ant-pagination').outerHTML = data.pagination;
+        };
+        xhr.send();
+    };
+
+    document.addEventListener('click', (event) => {
+        const cookie = event.target.closest('#onetrust-accept-btn-handler');
+        if (cookie) { document.getElementById('onetrust-banner-sdk').remove(); return; }
+
+        const header = event.target.closest('.collapse__header');
+        if (header) {
+            if (!lost(config.flaky)) { later(() => openCard(header.closest('.collapse'))); }
+            return;
+        }
+        const arrow = event.target.closest('.ant-collapse-arrow');
+        if (arrow) {
+            if (!lost(config.flaky)) { later(() => openItem(arrow.closest('.ant-collapse-item'))); }
+            return;
+        }
+        const li = event.target.closest('ul.ant-pagination li');
+        if (!li || li.classList.contains('ant-pagination-disabled') || lost(config.flaky_pages)) { return; }
+        const current = parseInt(document.querySelector('li.ant-pagination-item-active').getAttribute('title'), 10);
+        if (li.classList.contains('ant-pagination-next')) { goTo(current + 1); }
+        else if (li.classList.contains('ant-pagination-prev')) { goTo(current - 1); }
+        else if (li.classList.contains('ant-pagination-jump-next')) { goTo(current + 5); }
+        else if (li.classList.contains('ant-pagination-jump-prev')) { goTo(current - 5); }
+        else if (li.classList.contains('ant-pagination-item')) { goTo(parseInt(li.getAttribute('title'), 10)); }
+    });
+
+    document.addEventListener('keydown', (event) => {
+        const input = event.target.closest('.ant-pagination-options-quick-jumper input');
+        if (input && event.key === 'Enter') {
+            const page = parseInt(input.value, 10);
+            input.value = '';
+            if (!isNaN(page)) { goTo(page); }
+        }
+    });
+})();
+</script>
+"""
+
+COOKIE_BANNER = (
+    "<div id='onetrust-banner-sdk'><p>Сайт использует cookies</p>"
+    "<button id='onetrust-accept-btn-handler' type='button'>Принять</button></div>"
+)
+
+
+class MockConfig:
+    def __init__(self, cards=100, pages=20, per_page=10, latency=0.0, render_delay=50, flaky=0.0, flaky_pages=0.0, seed=0):
+        self.cards = cards
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.render_delay = render_delay
+        self.flaky = flaky
+        self.flaky_pages = flaky_pages
+        self.seed = seed
+
+    def expected(self, registry):
+        return self.pages * self.per_page if registry == "sanctions" else self.cards
+
+    def page_script(self):
+        config = {key: getattr(self, key) for key in ("pages", "render_delay", "flaky", "flaky_pages")}
+        return PAGE_JS % {"config": json.dumps(config)}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, content_type="text/html; charset=utf-8", status=200):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def render(self, body):
+        # Скрипт — в конце body, как бандл у gov.kz
+        html = fixtures.page_shell(COOKIE_BANNER + body)
+        return html.replace("</body>", self.config.page_script() + "</body>")
+
+    def do_GET(self):
+        config = self.config
+        if config.latency:
+            # Небольшой разброс, чтобы ожидания не подстраивались под фиксированную задержку
+            time.sleep(config.latency * random.uniform(0.5, 1.5))
+
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts[0] == "registry" and len(parts) == 2 and parts[1] in fixtures.CARD_BUILDERS and parts[1] != "sanctions":
+            body = fixtures.registry_cards(parts[1], config.cards, config.seed, expanded=False)
+            self.send_body(self.render(body))
+        elif parts == ["sanctions"]:
+            cards = fixtures.registry_cards("sanctions", config.per_page, config.seed, expanded=False)
+            self.send_body(self.render(f"<div class='collapse-group'>{cards}</div>{fixtures.pagination(1, config.pages)}"))
+        elif parts == ["api", "sanctions"]:
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            page = max(1, min(config.pages, page))
+            payload = {
+                "cards": fixtures.registry_cards("sanctions", config.per_page, config.seed, offset=(page - 1) * config.per_page, expanded=False),
+                "pagination": fixtures.pagination(page, config.pages),
+            }
+            self.send_body(json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8")
+        else:
+            self.send_body("not found", "text/plain; charset=utf-8", status=404)
+
+
+def serve(config=None, host="127.0.0.1", port=0):
+    # port=0 — свободный порт; возвращает (server, base_url), сервер крутится в фоновом потоке
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def config_arguments(parser):
+    parser.add_argument("--cards", type=int, default=100, help="карточек в реестрах rcb/issued/insurances")
+    parser.add_argument("--pages", type=int, default=20, help="страниц санкций")
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа сервера, сек")
+    parser.add_argument("--render-delay", type=int, default=50, help="задержка отрисовки после клика, мс")
+    parser.add_argument("--flaky", type=float, default=0.0, help="доля потерянных кликов по карточкам")
+    parser.add_argument("--flaky-pages", type=float, default=0.0, help="доля потерянных кликов по пагинации")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args):
+    return MockConfig(args.cards, args.pages, args.per_page, args.latency, args.render_delay, args.flaky, args.flaky_pages, args.seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальная заглушка реестров gov.kz")
+    parser.add_argument("--port", type=int, default=8765)
+    config_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = serve(config_from_args(args), port=args.port)
+    print(f"🌐 Заглушка gov.kz: {base_url}/sanctions, {base_url}/registry/issued")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
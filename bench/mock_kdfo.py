@@ -0,0 +1,95 @@
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Локальная заглушка КДФО для FinResolver без живого сервиса (make_http_lookup / KDFO_URL).
+#   /fin/<bin>  — карточка организации JSON-ом; 404 — БИН не найден, 500 — сбой сервиса
+# Счётчик запросов по БИН показывает, какие БИН ушли в КДФО, а какие отсёк кэш.
+#   python bench/mock_kdfo.py --found 50 --failing 000000000099
+#   KDFO_URL=http://127.0.0.1:8766/fin/{bin} python sanc.py --load
+
+
+def organization(bin_code):
+    number = int(bin_code)
+    return {
+        "bin": bin_code,
+        "full_name_ru": f"Акционерное общество «Организация {number}»",
+        "short_name_ru": f"АО «Организация {number}»",
+        "org_status": "Действующий",
+        "address": f"г. Алматы, ул. Тестовая, {number}",
+        # Полей не из Fin в ответе КДФО хватает — make_http_lookup их отбрасывает
+        "leader": {"full_name": f"Руководитель {number}"},
+    }
+
+
+class KdfoConfig:
+    def __init__(self, found=(), failing=(), latency=0.0):
+        self.found = {b: organization(b) for b in found}
+        self.failing = set(failing)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+
+class KdfoHandler(BaseHTTPRequestHandler):
+    config = KdfoConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        config = self.config
+        if config.latency:
+            time.sleep(config.latency * random.uniform(0.5, 1.5))
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "fin":
+            self.send_json({"error": "not found"}, status=404)
+            return
+
+        bin_code = parts[1]
+        with config.lock:
+            config.requests[bin_code] += 1
+        if bin_code in config.failing:
+            self.send_json({"error": "internal error"}, status=500)
+        elif bin_code in config.found:
+            self.send_json(config.found[bin_code])
+        else:
+            self.send_json({"error": "organization not found"}, status=404)
+
+
+def serve(config=None, host="127.0.0.1", port=0):
+    # port=0 — свободный порт; возвращает (server, url_template для make_http_lookup)
+    handler = type("ConfiguredKdfoHandler", (KdfoHandler,), {"config": config or KdfoConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/fin/{{bin}}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальная заглушка КДФО")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--found", type=int, default=100, help="найденные БИН: 000000000001 … N")
+    parser.add_argument("--failing", nargs="*", default=(), help="БИН, на которых сервис отвечает 500")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, сек")
+    args = parser.parse_args()
+
+    found = [f"{i:012d}" for i in range(1, args.found + 1)]
+    server, url_template = serve(KdfoConfig(found, args.failing, args.latency), port=args.port)
+    print(f"🌐 Заглушка КДФО: KDFO_URL={url_template}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
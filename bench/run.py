@@ -0,0 +1,211 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import contextlib
+from datetime import datetime
+
+from bench import fixtures
+
+# Офлайн-бенчмарк парсеров и загрузчиков на синтетических страницах (bench/fixtures.py).
+#   python -m bench.run                                  — разбор всех реестров
+#   python -m bench.run --settings project.settings      — плюс загрузка в БД
+#   python -m bench.run --baseline bench/results/X.json  — сравнение с прошлым прогоном
+# Всё, что пишется в БД, откатывается. Результаты — JSON в bench/results/.
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def timed(fn, repeat):
+    runs = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = fn()
+            runs.append(time.perf_counter() - started)
+    return result, {
+        "min": round(min(runs), 4),
+        "median": round(statistics.median(runs), 4),
+        "runs": [round(r, 4) for r in runs],
+    }
+
+
+def setup_django(settings):
+    if settings:
+        os.environ["DJANGO_SETTINGS_MODULE"] = settings
+    if not os.environ.get("DJANGO_SETTINGS_MODULE"):
+        return False
+    import django
+    django.setup()
+    return True
+
+
+@contextlib.contextmanager
+def rollback():
+    from django.db import transaction
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def fin_lookup(bin_code):
+    return {"short_name_ru": f"Организация {bin_code}"}
+
+
+def fin_resolver():
+    from fin_resolver import FinResolver, KdfoCache
+    return FinResolver(lookup=fin_lookup, cache=KdfoCache(path=None))
+
+
+def check_parallel(case, run, workers):
+    # run(workers) -> записи; разбор в пуле процессов обязан дать ровно то же, что последовательный
+    with contextlib.redirect_stdout(io.StringIO()):
+        serial = run(1)
+        parallel = run(workers or 2)
+    if serial != parallel:
+        print(f"❌ {case}: разбор в {workers or 2} процессах расходится с последовательным")
+        return False
+    return True
+
+
+def bench_extraction(sizes, pages, per_page, repeat, backend, workers, per_container=3):
+    import rcb
+    import sanc
+    import issued_parser
+    import issued_insurances_parser
+
+    extractors = {
+        "rcb": rcb.extract_from_html,
+        "issued": issued_parser.extract_from_html,
+        "insurances": issued_insurances_parser.extract_from_html,
+    }
+
+    results = []
+    for registry, extract in extractors.items():
+        for size in sizes:
+            for suffix, grouped in (("", 1), (".grouped", per_container)):
+                case = f"extract.{registry}{suffix}"
+                html = fixtures.registry_page(registry, size, per_container=grouped)
+
+                def run(workers=workers):
+                    return extract(html, backend, workers)
+
+                records, timing = timed(run, repeat)
+                matches = check_parallel(case, run, workers)
+                results.append(dict(case=case, size=size, records=len(records), html_bytes=len(html), parallel_matches=matches, **timing))
+                print(f"⏱️ {case} [{size}]: {timing['median']} с, {round(size / timing['median'])} карточек/с")
+
+    html_pages = fixtures.sanctions_pages(pages, per_page)
+
+    def run_sanctions(workers=workers):
+        return [r for html in html_pages for r in sanc.extract_from_html(html, backend, workers)]
+
+    records, timing = timed(run_sanctions, repeat)
+    matches = check_parallel("extract.sanctions", run_sanctions, workers)
+    results.append(dict(case="extract.sanctions", size=pages * per_page, pages=pages, records=len(records), parallel_matches=matches, **timing))
+    print(f"⏱️ extract.sanctions [{pages} стр.]: {timing['median']} с")
+    return results
+
+
+def bench_loaders(sizes, repeat):
+    import issued_parser
+    import issued_insurances_parser
+    from loaders import load_issued_licenses
+
+    results = []
+    for registry, extract in (("issued", issued_parser.extract_from_html), ("insurances", issued_insurances_parser.extract_from_html)):
+        for size in sizes:
+            html = fixtures.registry_page(registry, size)
+            first_runs, again_runs = [], []
+            for _ in range(repeat):
+                with rollback():
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        records = extract(html)
+                        resolver = fin_resolver()
+                        started = time.perf_counter()
+                        load_issued_licenses(records, resolver)
+                        first_runs.append(time.perf_counter() - started)
+                        # Повторная загрузка тех же записей — путь «без изменений»
+                        started = time.perf_counter()
+                        load_issued_licenses(records, resolver)
+                        again_runs.append(time.perf_counter() - started)
+            for case, runs in (("load", first_runs), ("reload", again_runs)):
+                timing = {"min": round(min(runs), 4), "median": round(statistics.median(runs), 4), "runs": [round(r, 4) for r in runs]}
+                results.append(dict(case=f"{case}.{registry}", size=size, records=len(records), **timing))
+                print(f"⏱️ {case}.{registry} [{size}]: {timing['median']} с")
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Регрессия — медиана выросла больше чем на threshold относительно прошлого прогона
+    previous = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["case"], result["size"]))
+        if not old or not old["median"]:
+            continue
+        change = result["median"] / old["median"] - 1
+        mark = "❌" if change > threshold else "✅"
+        print(f"{mark} {result['case']} [{result['size']}]: {old['median']} → {result['median']} с ({change:+.0%})")
+        if change > threshold:
+            regressions.append(result["case"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк парсеров реестров gov.kz")
+    parser.add_argument("--sizes", default="100,1000,10000", help="число карточек на странице, через запятую")
+    parser.add_argument("--pages", type=int, default=20, help="страниц санкций")
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", choices=("full", "strainer", "lxml"), help="бэкенд разбора HTML (по умолчанию — выбранный для реестра)")
+    parser.add_argument("--workers", type=int, help="процессов для разбора карточек")
+    parser.add_argument("--per-container", type=int, default=3, help="карточек в одном контейнере для случаев .grouped")
+    parser.add_argument("--settings", help="DJANGO_SETTINGS_MODULE для загрузчиков")
+    parser.add_argument("--output", help="файл результатов (по умолчанию bench/results/<время>.json)")
+    parser.add_argument("--baseline", help="прошлый результат для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимый рост медианы, доля")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    with_db = setup_django(args.settings)
+    if not with_db:
+        print("⚠️ Django не настроен — загрузчики пропущены")
+
+    results = bench_extraction(sizes, args.pages, args.per_page, args.repeat, args.backend, args.workers, args.per_container)
+    if with_db:
+        results.extend(bench_loaders(sizes, args.repeat))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "backend": args.backend,
+        "workers": args.workers,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 Результаты: {output}")
+
+    mismatched = [r["case"] for r in results if r.get("parallel_matches") is False]
+    if mismatched:
+        print(f"❌ Параллельный разбор расходится с последовательным: {', '.join(mismatched)}")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
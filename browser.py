@@ -0,0 +1,192 @@
+import os
+import queue
+import atexit
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import metrics
+from waits import install_hooks
+
+# Одна фабрика Chrome на все парсеры: chromedriver ставится один раз за процесс,
+# тёплые сессии переиспользуются между задачами через пул.
+
+_install_lock = threading.Lock()
+_driver_path = None
+
+
+def chromedriver_path():
+    # CHROMEDRIVER_PATH — явный путь (например, chromedriver.exe на Windows), иначе автоустановка
+    global _driver_path
+    with _install_lock:
+        if _driver_path is None:
+            _driver_path = os.environ.get("CHROMEDRIVER_PATH")
+            if not _driver_path:
+                import chromedriver_autoinstaller
+                _driver_path = chromedriver_autoinstaller.install()
+        return _driver_path
+
+
+def chrome_options(tmp_profile, headless=None):
+    if headless is None:
+        headless = os.environ.get("GOVKZ_HEADLESS", "") not in ("", "0")
+    options = Options()
+    if headless:
+        options.add_argument('--headless=new')
+    # С этим user-agent ходили парсеры issued/insurances до общей фабрики
+    options.add_argument('--user-agent=Mozilla/5.0')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-ipv6')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument(f'--user-data-dir={tmp_profile}')
+    return options
+
+
+def make_driver(wire=False, headless=None):
+    # wire=True — selenium-wire, нужен только там, где читаются driver.requests
+    tmp_profile = tempfile.mkdtemp()
+    options = chrome_options(tmp_profile, headless)
+    try:
+        with metrics.span("chrome_start"):
+            service = Service(chromedriver_path())
+            if wire:
+                from seleniumwire import webdriver
+                driver = webdriver.Chrome(service=service, options=options, seleniumwire_options={'verify_ssl': False})
+            else:
+                from selenium import webdriver
+                driver = webdriver.Chrome(service=service, options=options)
+    except Exception:
+        shutil.rmtree(tmp_profile, ignore_errors=True)
+        raise
+    driver.tmp_profile = tmp_profile
+    install_hooks(driver)
+    return driver
+
+
+def close_driver(driver):
+    try:
+        driver.quit()
+    finally:
+        shutil.rmtree(getattr(driver, "tmp_profile", ""), ignore_errors=True)
+
+
+def reset_driver(driver):
+    # Сброс состояния между задачами без перезапуска процесса Chrome
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        pass
+    driver.delete_all_cookies()
+    if hasattr(driver, "requests"):
+        del driver.requests
+    driver.get("about:blank")
+
+
+class DriverPool:
+    def __init__(self, size=1, wire=False, headless=None):
+        self.size = size
+        self.wire = wire
+        self.headless = headless
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def resize(self, size):
+        with self.lock:
+            self.size = max(self.size, size)
+
+    def acquire(self, timeout=None):
+        # Сначала тёплая сессия, потом — новая, пока не упёрлись в размер пула
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                print("🚀 Запуск Chrome для пула...")
+                return make_driver(self.wire, self.headless)
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+        return self.idle.get(timeout=timeout)
+
+    def release(self, driver):
+        if self.closed:
+            self.discard(driver)
+            return
+        try:
+            reset_driver(driver)
+        except WebDriverException:
+            self.discard(driver)
+            return
+        self.idle.put(driver)
+
+    def discard(self, driver):
+        with self.lock:
+            self.created -= 1
+        close_driver(driver)
+
+    @contextmanager
+    def session(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except WebDriverException:
+            # Сессия могла умереть вместе с Chrome — в пул её не возвращаем
+            self.discard(driver)
+            driver = None
+            raise
+        finally:
+            if driver is not None:
+                self.release(driver)
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(size=1, wire=False):
+    with _pools_lock:
+        pool = _pools.get(wire)
+        if pool is None:
+            pool = _pools[wire] = DriverPool(size, wire)
+        else:
+            pool.resize(size)
+        return pool
+
+
+@contextmanager
+def driver_session(driver=None, wire=False):
+    # Задача получает либо переданный ей драйвер, либо сессию из общего пула
+    if driver is not None:
+        yield driver
+        return
+    with get_pool(wire=wire).session() as pooled:
+        yield pooled
+
+
+@atexit.register
+def close_pools():
+    for pool in list(_pools.values()):
+        pool.close()
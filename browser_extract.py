@@ -0,0 +1,120 @@
+# Извлечение карточек одним execute_script прямо в браузере.
+# Возвращаются только пары «метка — значение» по каждой карточке, без page_source и BeautifulSoup;
+# ключи записей расставляют те же build_* функции парсеров.
+
+# Аналог get_text(strip=True): склеиваем обрезанные текстовые узлы без разделителя
+TEXT_JS = """
+const text = (el) => {
+    if (!el) { return null; }
+    const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    let out = '';
+    let node;
+    while ((node = walker.nextNode())) {
+        const t = node.nodeValue.trim();
+        if (t) { out += t; }
+    }
+    return out;
+};
+const all = (root, selector) => Array.from(root.querySelectorAll(selector));
+const cardName = (block) => {
+    const parent = block.parentElement && block.parentElement.closest('.collapse');
+    return parent ? text(parent.querySelector('.collapse__value')) : null;
+};
+"""
+
+SANCTIONS_JS = TEXT_JS + """
+return all(document, '.collapse-group .card.collapse').map(block => ({
+    header: all(block, '.collapse__header__title--html .row')
+        .map(row => [text(row.querySelector('.col-md-4')), text(row.querySelector('.col-md-8'))])
+        .filter(([k, v]) => k && v),
+    details: all(block, '.collapse__content__card .row')
+        .map(row => [text(row.querySelector('.typography__variant-bodyhl')), text(row.querySelector('.typography__variant-body'))])
+        .filter(([label]) => label),
+}));
+"""
+
+RCB_JS = TEXT_JS + """
+return all(document, '.collapse__content__card').map(block => ({
+    pairs: all(block, 'tr')
+        .filter(row => row.querySelector('th') && row.querySelector('td'))
+        .map(row => [text(row.querySelector('th')), text(row.querySelector('td'))]),
+}));
+"""
+
+ISSUED_JS = TEXT_JS + """
+return all(document, '.collapse__content__card').map(block => {
+    const table = block.querySelector('.ant-table-wrapper table');
+    return {
+        name: cardName(block),
+        pairs: all(block, 'tr.ant-descriptions-row')
+            .filter(row => row.querySelector('th') && row.querySelector('td'))
+            .map(row => [text(row.querySelector('th')), text(row.querySelector('td'))]),
+        reissue: table ? all(table, 'tbody tr td.ant-table-cell').map(text) : null,
+    };
+});
+"""
+
+INSURANCES_JS = TEXT_JS + """
+const nextTable = (el) => document.evaluate(
+    'following::table[1]', el, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const twoCells = (rows) => rows
+    .map(row => all(row, 'td'))
+    .filter(cells => cells.length === 2)
+    .map(cells => [text(cells[0]), text(cells[1])]);
+
+return all(document, '.collapse__content__card').map(block => {
+    const table = block.querySelector('.ant-table-wrapper table');
+    return {
+        name: cardName(block),
+        pairs: twoCells(all(block, 'tr')),
+        reissue: table ? all(table, 'tbody tr').map(row => all(row, 'td.ant-table-cell').map(text)) : null,
+        forms: all(block, 'b')
+            .map(b => [text(b).replace(/:/g, ''), nextTable(b)])
+            .filter(([, formTable]) => formTable)
+            .map(([formName, formTable]) => [formName, twoCells(all(formTable, 'tr'))]),
+    };
+});
+"""
+
+
+def extract_cards(driver, script):
+    return driver.execute_script(script) or []
+
+
+def extract_sanctions(driver):
+    return extract_cards(driver, SANCTIONS_JS)
+
+
+def extract_rcb(driver):
+    return extract_cards(driver, RCB_JS)
+
+
+def extract_issued(driver):
+    return extract_cards(driver, ISSUED_JS)
+
+
+def extract_insurances(driver):
+    return extract_cards(driver, INSURANCES_JS)
+
+
+# Универсальный вариант для реестров, описанных только спекой (registry.py):
+# строки «th + td» или ровно две td, селектор карточки передаётся аргументом
+GENERIC_JS = TEXT_JS + """
+return all(document, arguments[0]).map(block => ({
+    name: cardName(block),
+    pairs: all(block, 'tr')
+        .map(row => {
+            const th = row.querySelector('th');
+            const td = row.querySelector('td');
+            if (th && td) { return [text(th), text(td)]; }
+            const cells = all(row, 'td');
+            return cells.length === 2 ? [text(cells[0]), text(cells[1])] : null;
+        })
+        .filter(pair => pair),
+}));
+"""
+
+
+def extract_generic(driver, block_selector):
+    return driver.execute_script(GENERIC_JS, block_selector) or []
@@ -0,0 +1,129 @@
+import json
+import time
+import argparse
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+
+import metrics
+from fins.models import Fin, IssuedLicense
+
+# Карточка организации для потребителей: Fin + руководитель, учредители, секторы и все три
+# реестра лицензий. Любой набор БИН — за фиксированное число запросов (1 + 7 prefetch),
+# результат — dict, готовый к json.dumps, в кэше Django.
+# Кэш версионный: у каждого БИН свой токен версии, загрузчики и FinResolver меняют его после
+# записи (invalidate), и старые карточки просто перестают читаться — без перебора ключей.
+#   python fin_profile.py 123456789012 --no-cache
+
+CACHE_PREFIX = "fin_profile"
+CACHE_TIMEOUT = 24 * 3600
+
+
+def version_key(bin_code):
+    return f"{CACHE_PREFIX}:version:{bin_code}"
+
+
+def profile_key(bin_code, version):
+    return f"{CACHE_PREFIX}:{bin_code}:{version}"
+
+
+def invalidate(bins):
+    # Новый токен вместо инкремента — одна запись set_many на все БИН, без гонок incr/add
+    bins = {b for b in bins if b}
+    if bins:
+        token = time.time_ns()
+        cache.set_many({version_key(b): token for b in bins}, timeout=None)
+
+
+def value(v):
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def row(obj, exclude=("id",)):
+    return {f.attname: value(getattr(obj, f.attname)) for f in obj._meta.concrete_fields if f.attname not in exclude}
+
+
+def profile_queryset():
+    return Fin.objects.select_related("leader").prefetch_related(
+        "sector",
+        "founders_ul",
+        "founders_fl",
+        Prefetch("issued_licenses", queryset=IssuedLicense.objects.order_by("id").prefetch_related("reissues")),
+        "suspended_licenses",
+        "revoked_licenses",
+    )
+
+
+def build_profile(fin):
+    try:
+        leader = row(fin.leader, exclude=("id", "fin_id"))
+    except ObjectDoesNotExist:
+        leader = None
+    profile = row(fin)
+    profile.update({
+        "sectors": [s.name_sector for s in fin.sector.all()],
+        "leader": leader,
+        "founders_ul": [row(f, exclude=("id", "fin_id")) for f in fin.founders_ul.all()],
+        "founders_fl": [row(f, exclude=("id", "fin_id")) for f in fin.founders_fl.all()],
+        "issued_licenses": [
+            dict(row(lic, exclude=("fin_id",)), reissues=[row(r, exclude=("id", "license_id")) for r in lic.reissues.all()])
+            for lic in fin.issued_licenses.all()
+        ],
+        "suspended_licenses": [row(lic, exclude=("fin_id",)) for lic in fin.suspended_licenses.all()],
+        "revoked_licenses": [row(lic, exclude=("fin_id",)) for lic in fin.revoked_licenses.all()],
+    })
+    return profile
+
+
+def load_profiles(bins):
+    with metrics.span("profile_query"):
+        return {fin.bin: build_profile(fin) for fin in profile_queryset().filter(bin__in=bins)}
+
+
+def get_profiles(bins, use_cache=True):
+    # БИН -> карточка; неизвестных БИН в ответе нет (и в кэш они не попадают)
+    bins = sorted({b.strip() for b in bins if b and b.strip()})
+    if not use_cache:
+        return load_profiles(bins)
+
+    versions = cache.get_many([version_key(b) for b in bins])
+    unversioned = [version_key(b) for b in bins if version_key(b) not in versions]
+    token = time.time_ns()
+    if unversioned:
+        # Токена нет (вытеснен или ещё не выставлен) — заводим новый, а не 0: под 0 могла
+        # остаться карточка до invalidate. add не затирает токен, выставленный параллельно
+        for key in unversioned:
+            cache.add(key, token, timeout=None)
+        versions.update(cache.get_many(unversioned))
+    keys = {b: profile_key(b, versions.get(version_key(b), token)) for b in bins}
+    cached = cache.get_many(keys.values())
+    profiles = {b: cached[key] for b, key in keys.items() if key in cached}
+
+    missing = [b for b in bins if b not in profiles]
+    metrics.count("profile_cache_hits", len(profiles))
+    metrics.count("profile_cache_misses", len(missing))
+    if missing:
+        loaded = load_profiles(missing)
+        cache.set_many({keys[b]: p for b, p in loaded.items()}, timeout=CACHE_TIMEOUT)
+        profiles.update(loaded)
+    return profiles
+
+
+def get_profile(bin_code, use_cache=True):
+    return get_profiles([bin_code], use_cache).get(bin_code.strip())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Карточка организации по БИН")
+    parser.add_argument("bins", nargs="+")
+    parser.add_argument("--no-cache", action="store_true", help="читать из БД в обход кэша")
+    args = parser.parse_args()
+
+    print(json.dumps(get_profiles(args.bins, use_cache=not args.no_cache), ensure_ascii=False, indent=2))
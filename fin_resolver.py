@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.db import connection, transaction
+
+import metrics
+from fin_profile import invalidate as invalidate_profiles
+from fin_search import refresh as refresh_names
+from fins.models import Fin
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kdfo_cache.json")
+FOUND_TTL = 7 * 24 * 3600
+MISSING_TTL = 24 * 3600
+
+FIN_FIELDS = {field.name for field in Fin._meta.concrete_fields} - {"id"}
+
+
+class KdfoCache:
+    # Результаты запросов в КДФО, включая отрицательные, с TTL; хранится в JSON между запусками
+
+    def __init__(self, path=CACHE_PATH, found_ttl=FOUND_TTL, missing_ttl=MISSING_TTL):
+        self.path = path
+        self.found_ttl = found_ttl
+        self.missing_ttl = missing_ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def fresh(self, bin_code):
+        entry = self.entries.get(bin_code)
+        if entry is None:
+            return None
+        ttl = self.found_ttl if entry["found"] else self.missing_ttl
+        if time.time() - entry["checked_at"] > ttl:
+            return None
+        return entry
+
+    def put(self, bin_code, found):
+        with self.lock:
+            self.entries[bin_code] = {"found": bool(found), "checked_at": time.time()}
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+def kdfo_lookup(bin_code):
+    from parsers.fin_updater import update_fin_from_kdfo
+    return update_fin_from_kdfo(bin_code)
+
+
+def make_http_lookup(url_template, session=None, timeout=15):
+    # Lookup через HTTP-сервис, отдающий карточку организации JSON-ом по БИН
+    # (например, локальная заглушка КДФО): url_template вида "http://127.0.0.1:8001/fin/{bin}".
+    # Возвращает поля Fin — в БД их запишет резолвер одним bulk_create из основного потока.
+    session = session or requests.Session()
+
+    def lookup(bin_code):
+        response = session.get(url_template.format(bin=bin_code), timeout=timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        payload = response.json()
+        return {key: value for key, value in payload.items() if key in FIN_FIELDS and key != "bin"}
+
+    return lookup
+
+
+def default_lookup():
+    url_template = os.environ.get("KDFO_URL")
+    if url_template:
+        return make_http_lookup(url_template)
+    return kdfo_lookup
+
+
+class FinResolver:
+    # БИН -> Fin: один in_bulk на все известные БИН, недостающие — параллельно в КДФО
+    # через ограниченный пул, затем ещё один in_bulk на подтянутые.
+    # lookup(bin) либо сам пишет в БД (update_fin_from_kdfo, его ответ не используется),
+    # либо возвращает dict с полями Fin / None, и тогда запись делает резолвер.
+    # Найден ли БИН, решает повторный in_bulk, а не ответ lookup.
+
+    def __init__(self, lookup=None, workers=8, cache=None):
+        self.lookup = lookup or default_lookup()
+        self.workers = workers
+        self.cache = cache if cache is not None else KdfoCache()
+
+    def known_missing(self, bin_code):
+        entry = self.cache.fresh(bin_code)
+        return entry is not None and not entry["found"]
+
+    def fetch(self, bin_code):
+        try:
+            return bin_code, self.lookup(bin_code), None
+        except Exception as e:
+            return bin_code, None, e
+        finally:
+            # У каждого потока своё соединение с БД — закрываем, чтобы не копились
+            connection.close()
+
+    def resolve(self, bins):
+        bins = {b.strip() for b in bins if b and b.strip()}
+        fins = Fin.objects.in_bulk(bins, field_name="bin")
+
+        missing = [b for b in sorted(bins - set(fins)) if not self.known_missing(b)]
+        skipped = len(bins) - len(fins) - len(missing)
+        if missing:
+            print(f"🔎 КДФО: запрашиваем {len(missing)} БИН ({skipped} в отрицательном кэше)")
+            new_fins, fetched = [], []
+            metrics.count("kdfo_lookups", len(missing))
+            with metrics.span("kdfo_lookup"), ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for bin_code, result, error in pool.map(self.fetch, missing):
+                    if error is not None:
+                        # Ошибки не кэшируем — попробуем в следующий раз
+                        metrics.count("kdfo_errors")
+                        print(f"⚠️ КДФО: ошибка для {bin_code}: {error}")
+                        continue
+                    fetched.append(bin_code)
+                    if isinstance(result, dict):
+                        new_fins.append(Fin(bin=bin_code, **result))
+
+            if new_fins:
+                Fin.objects.bulk_create(new_fins, ignore_conflicts=True)
+            fins.update(Fin.objects.in_bulk(missing, field_name="bin"))
+            # bulk_create идёт мимо сигналов — добавляем новые организации в индекс названий сами
+            refresh_names([fins[b].id for b in missing if b in fins])
+            for bin_code in fetched:
+                self.cache.put(bin_code, bin_code in fins)
+            self.cache.save()
+            # update_fin_from_kdfo пишет и колонки Fin, и руководителя, учредителей, секторы —
+            # карточки этих БИН (fin_profile) сбрасываем после коммита
+            transaction.on_commit(lambda: invalidate_profiles(fetched))
+        return fins
@@ -0,0 +1,197 @@
+import re
+import json
+import argparse
+import threading
+from collections import Counter, defaultdict
+
+from django.db.models.signals import post_save, post_delete
+
+import metrics
+from fins.models import Fin
+
+# Поиск организации по названию, когда в записи реестра нет БИН. Названия из всех восьми
+# колонок Fin нормализуются (регистр, кавычки, ОПФ вроде АО/ТОО/АҚ/ЖШС) и раскладываются
+# в триграммы как в pg_trgm; похожесть — доля общих триграмм (|A∩B| / |A∪B|).
+# Индекс в памяти процесса: строится одним select при первом поиске, дальше обновляется
+# по одной организации — сигналы Fin и явный refresh() после bulk_create в FinResolver.
+#   python fin_search.py "Народный банк Казахстана" "ТОО Микрокредит"
+
+NAME_FIELDS = (
+    "full_name_ru", "full_name_kz", "full_name_en",
+    "short_name_ru", "short_name_kz", "short_name_en",
+    "eprgo_name", "eprgo_extra_name",
+)
+
+# Организационно-правовые формы: полные — до сокращений, чтобы «Акционерное общество» не осталось обрывком
+LEGAL_FORMS = (
+    "акционерное общество", "товарищество с ограниченной ответственностью", "дочерний банк акционерного общества",
+    "акционерлік қоғамы", "акционерлік қоғам", "жауапкершілігі шектеулі серіктестігі", "жауапкершілігі шектеулі серіктестік",
+    "joint stock company", "limited liability partnership", "limited liability company",
+    "дб ао", "ао", "тоо", "оао", "зао", "пао", "ао нк", "ақ", "жшс", "jsc", "llp", "llc", "ltd",
+)
+LEGAL_FORM_RE = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(f) for f in sorted(LEGAL_FORMS, key=len, reverse=True)) + r")(?!\w)")
+QUOTES_RE = re.compile(r"[«»\"'“”„‘’`]")
+PUNCT_RE = re.compile(r"[^\w]+")
+
+THRESHOLD = 0.3
+
+
+def normalize(name):
+    name = (name or "").lower().replace("ё", "е")
+    name = QUOTES_RE.sub(" ", name)
+    name = PUNCT_RE.sub(" ", name)
+    name = LEGAL_FORM_RE.sub(" ", name)
+    return " ".join(name.split())
+
+
+def trigrams(normalized):
+    # Как pg_trgm: каждое слово с двумя пробелами в начале и одним в конце
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class NameIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+        self.bins = {}
+        self.entries = {}                 # (fin_id, поле) -> (исходное название, нормализованное, триграммы)
+        self.by_fin = defaultdict(set)    # fin_id -> ключи entries
+        self.exact = defaultdict(set)     # нормализованное название -> fin_id
+        self.postings = defaultdict(set)  # триграмма -> ключи entries
+
+    def build(self):
+        with self.lock, metrics.span("name_index_build"):
+            self.bins.clear()
+            self.entries.clear()
+            self.by_fin.clear()
+            self.exact.clear()
+            self.postings.clear()
+            for row in Fin.objects.values_list("id", "bin", *NAME_FIELDS).iterator():
+                self.add(row)
+            self.built = True
+        print(f"🔤 Индекс названий: {len(self.bins)} организаций, {len(self.entries)} названий")
+
+    def add(self, row):
+        fin_id, bin_code, names = row[0], row[1], row[2:]
+        self.bins[fin_id] = bin_code
+        for field, name in zip(NAME_FIELDS, names):
+            normalized = normalize(name)
+            if not normalized:
+                continue
+            key = (fin_id, field)
+            grams = trigrams(normalized)
+            self.entries[key] = (name, normalized, grams)
+            self.by_fin[fin_id].add(key)
+            self.exact[normalized].add(fin_id)
+            for gram in grams:
+                self.postings[gram].add(key)
+
+    def remove(self, fin_ids):
+        with self.lock:
+            for fin_id in fin_ids:
+                for key in self.by_fin.pop(fin_id, ()):
+                    _, normalized, grams = self.entries.pop(key)
+                    self.exact[normalized].discard(fin_id)
+                    for gram in grams:
+                        self.postings[gram].discard(key)
+                self.bins.pop(fin_id, None)
+
+    def update(self, fin_ids):
+        fin_ids = set(fin_ids)
+        if not fin_ids:
+            return
+        rows = list(Fin.objects.filter(id__in=fin_ids).values_list("id", "bin", *NAME_FIELDS))
+        with self.lock:
+            self.remove(fin_ids)
+            for row in rows:
+                self.add(row)
+
+    def search(self, name, limit=5, threshold=THRESHOLD):
+        # Ранжированный список [{fin_id, bin, name, score}], по одной строке на организацию
+        normalized = normalize(name)
+        if not normalized:
+            return []
+        with self.lock:
+            exact = self.exact.get(normalized)
+            if exact:
+                best = {
+                    fin_id: (1.0, next(self.entries[key][0] for key in self.by_fin[fin_id] if self.entries[key][1] == normalized))
+                    for fin_id in exact
+                }
+            else:
+                grams = trigrams(normalized)
+                shared = Counter()
+                for gram in grams:
+                    shared.update(self.postings.get(gram, ()))
+                best = {}
+                for key, common in shared.items():
+                    entry_name, _, entry_grams = self.entries[key]
+                    score = common / (len(grams) + len(entry_grams) - common)
+                    if score >= threshold and score > best.get(key[0], (0, None))[0]:
+                        best[key[0]] = (score, entry_name)
+            ranked = sorted(best.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+            return [
+                {"fin_id": fin_id, "bin": self.bins[fin_id], "name": entry_name, "score": round(score, 3)}
+                for fin_id, (score, entry_name) in ranked
+            ]
+
+    def match_many(self, names, threshold=THRESHOLD):
+        # Пакетное сопоставление: название -> лучший кандидат или None, если кандидатов нет
+        # или два лучших равны (тёзки с разными БИН); повторы считаются один раз
+        results = {}
+        with metrics.span("name_match"):
+            for name in dict.fromkeys(names):
+                found = self.search(name, limit=2, threshold=threshold)
+                unique = found and (len(found) == 1 or found[0]["score"] > found[1]["score"])
+                results[name] = found[0] if unique else None
+        metrics.count("name_matches", sum(1 for r in results.values() if r))
+        return results
+
+
+INDEX = NameIndex()
+
+
+def get_index():
+    if not INDEX.built:
+        with INDEX.lock:
+            if not INDEX.built:
+                INDEX.build()
+                post_save.connect(on_fin_saved, sender=Fin, dispatch_uid="fin_search_save")
+                post_delete.connect(on_fin_deleted, sender=Fin, dispatch_uid="fin_search_delete")
+    return INDEX
+
+
+def on_fin_saved(sender, instance, **kwargs):
+    INDEX.update([instance.id])
+
+
+def on_fin_deleted(sender, instance, **kwargs):
+    INDEX.remove([instance.id])
+
+
+def refresh(fin_ids):
+    # Для записей мимо сигналов (bulk_create, update) — только если индекс уже построен
+    if INDEX.built:
+        INDEX.update(fin_ids)
+
+
+def search(name, limit=5, threshold=THRESHOLD):
+    return get_index().search(name, limit, threshold)
+
+
+def match_many(names, threshold=THRESHOLD):
+    return get_index().match_many(names, threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Поиск организаций по названию")
+    parser.add_argument("names", nargs="+")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    print(json.dumps({name: search(name, args.limit, args.threshold) for name in args.names}, ensure_ascii=False, indent=2))
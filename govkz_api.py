@@ -0,0 +1,439 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENDPOINTS_PATH = os.path.join(BASE_DIR, "govkz_endpoints.json")
+CAPTURES_DIR = os.path.join(BASE_DIR, "govkz_captures")
+
+REGISTRY_PAGES = {
+    "rcb": "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/3/registry/29?lang=ru",
+    "issued": "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/5/registry/19?lang=ru",
+    "insurances": "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/8/registry/22?lang=ru",
+    "sanctions": "https://www.gov.kz/memleket/entities/ardfm/sanctions?lang=ru",
+}
+
+# Статика и счётчики, которые страница тоже тянет XHR-ом, но данных реестра в них нет
+IGNORED_HOSTS = ("google-analytics.com", "googletagmanager.com", "yandex.ru", "onetrust.com", "cookielaw.org")
+
+# Номер страницы в query или JSON-теле запроса (Spring Data: page/size, ответ с content/last/totalPages)
+PAGE_PARAMS = ("page", "pageNumber", "pageNo", "page_number")
+MAX_PAGES = 10000
+
+
+def load_endpoints(path=ENDPOINTS_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_endpoints(endpoints, path=ENDPOINTS_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(endpoints, f, ensure_ascii=False, indent=2)
+
+
+def is_json_response(request):
+    if request.response is None or request.response.status_code != 200:
+        return False
+    if any(host in request.host for host in IGNORED_HOSTS):
+        return False
+    content_type = request.response.headers.get("Content-Type", "")
+    return "json" in content_type
+
+
+def capture_name(index, url):
+    path = urlsplit(url).path.strip("/").replace("/", "_") or "root"
+    return f"{index:03d}_{path[-80:]}.json"
+
+
+def save_capture(registry_dir, found, url, method, body, content):
+    capture = capture_name(len(found), url)
+    with open(os.path.join(registry_dir, capture), "wb") as f:
+        f.write(content)
+    found.append({"url": url, "method": method, "body": body, "capture": capture})
+
+
+def discover_endpoints(registries=None, wait=20, captures_dir=CAPTURES_DIR):
+    # Открываем каждую страницу реестра и записываем все JSON-запросы, которые она делает;
+    # у постраничных эндпоинтов остальные страницы докачиваем сразу — стабу нужны все
+    from seleniumwire.utils import decode
+    from browser import make_driver, close_driver
+
+    driver = make_driver(wire=True, headless=True)
+    session = make_session()
+
+    endpoints = load_endpoints()
+    try:
+        for registry in registries or REGISTRY_PAGES:
+            page_url = REGISTRY_PAGES[registry]
+            print(f"🛰️ Поиск API для {registry}: {page_url}")
+            del driver.requests
+            driver.get(page_url)
+            time.sleep(wait)
+
+            registry_dir = os.path.join(captures_dir, registry)
+            os.makedirs(registry_dir, exist_ok=True)
+
+            found = []
+            for request in driver.requests:
+                if not is_json_response(request):
+                    continue
+                body = decode(
+                    request.response.body,
+                    request.response.headers.get("Content-Encoding", "identity"),
+                )
+                save_capture(registry_dir, found, request.url, request.method,
+                             request.body.decode("utf-8", errors="ignore") or None, body)
+
+            seen = {(e["method"], e["url"], e["body"]) for e in found}
+            for endpoint in unique_endpoints(list(found)):
+                for url, body, response in iter_pages(session, endpoint):
+                    if (endpoint["method"], url, body) not in seen:
+                        seen.add((endpoint["method"], url, body))
+                        save_capture(registry_dir, found, url, endpoint["method"], body, response.content)
+
+            print(f"🔹 Найдено JSON-эндпоинтов: {len(unique_endpoints(found))}, ответов сохранено: {len(found)}")
+            endpoints[registry] = found
+    finally:
+        session.close()
+        close_driver(driver)
+
+    save_endpoints(endpoints)
+    print(f"💾 Эндпоинты сохранены: {ENDPOINTS_PATH}")
+    return endpoints
+
+
+def make_session(pool_size=10, retries=3):
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "Mozilla/5.0", "Accept": "application/json"})
+    return session
+
+
+def rebase_url(url, base_url):
+    # Подменяем схему и хост, чтобы ходить в локальный стаб вместо gov.kz
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    base = urlsplit(base_url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def json_body(body):
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def page_param(url, body=None):
+    # (где, имя, номер) параметра страницы или None, если эндпоинт не постраничный
+    query = dict(parse_qsl(urlsplit(url).query))
+    payload = json_body(body) or {}
+    for name in PAGE_PARAMS:
+        if str(query.get(name, "")).isdigit():
+            return "query", name, int(query[name])
+        if isinstance(payload.get(name), int):
+            return "body", name, payload[name]
+    return None
+
+
+def with_page(url, body, paging, page):
+    where, name, _ = paging
+    if where == "body":
+        return url, json.dumps(dict(json_body(body), **{name: page}), ensure_ascii=False)
+    parts = urlsplit(url)
+    query = [(k, str(page) if k == name else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query))), body
+
+
+def unique_endpoints(endpoints):
+    # Сохранённые страницы одного эндпоинта сводим к одному — с самой ранней страницы
+    unique = {}
+    for endpoint in endpoints:
+        method, url, body = endpoint.get("method", "GET"), endpoint["url"], endpoint.get("body")
+        paging = page_param(url, body)
+        key = (method,) + (with_page(url, body, paging, 0) if paging else (url, body))
+        if key not in unique or (paging and paging[2] < page_param(unique[key]["url"], unique[key].get("body"))[2]):
+            unique[key] = dict(endpoint, method=method)
+    return list(unique.values())
+
+
+def largest_list(payload, depth=2):
+    # Список записей — самый длинный список объектов в ответе (content, data.items, ...)
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+    best = []
+    if isinstance(payload, dict) and depth:
+        for value in payload.values():
+            if isinstance(value, (list, dict)):
+                found = largest_list(value, depth - 1)
+                if len(found) > len(best):
+                    best = found
+    return best
+
+
+def find_items(payload, path=None):
+    # path — явный путь к списку из govkz_endpoints.json ("items": "data.content")
+    if path:
+        for key in path.split("."):
+            payload = payload.get(key) if isinstance(payload, dict) else None
+        return [item for item in payload or [] if isinstance(item, dict)]
+    return largest_list(payload)
+
+
+def is_last_page(payload, items, page, first):
+    if not items:
+        return True
+    if isinstance(payload, dict):
+        if payload.get("last") is True:
+            return True
+        total = payload.get("totalPages")
+        if isinstance(total, int) and page - first + 1 >= total:
+            return True
+    return False
+
+
+def request(session, method, url, body):
+    if method == "POST":
+        headers = {"Content-Type": "application/json"} if json_body(body) is not None else None
+        response = session.post(url, data=body, headers=headers, timeout=30)
+    else:
+        response = session.get(url, timeout=30)
+    response.raise_for_status()
+    return response
+
+
+def iter_pages(session, endpoint, base_url=None):
+    # (url, body, response) каждой страницы эндпоинта: номер страницы растёт, пока ответ
+    # не пуст, не помечен last и не упёрся в totalPages
+    method, body = endpoint.get("method", "GET"), endpoint.get("body")
+    url = rebase_url(endpoint["url"], base_url)
+    paging = page_param(url, body)
+    if not paging:
+        yield url, body, request(session, method, url, body)
+        return
+
+    first = 0 if paging[2] == 0 else 1
+    previous = None
+    for page in range(first, first + MAX_PAGES):
+        page_url, page_body = with_page(url, body, paging, page)
+        response = request(session, method, page_url, page_body)
+        payload = response.json()
+        items = find_items(payload, endpoint.get("items"))
+        if items and items == previous:
+            # Параметр страницы игнорируется сервером — дальше та же страница
+            break
+        yield page_url, page_body, response
+        if is_last_page(payload, items, page, first):
+            break
+        previous = items
+
+
+def snake_case(key):
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", key).lower()
+
+
+def registry_schemas(registry):
+    # Схемы полей тех же сборщиков записей, что у HTML-парсеров (rcb собирает запись как есть)
+    if registry == "issued":
+        from issued_parser import RECORD_SCHEMA
+        return [RECORD_SCHEMA]
+    if registry == "insurances":
+        from issued_insurances_parser import RECORD_SCHEMA
+        return [RECORD_SCHEMA]
+    if registry == "sanctions":
+        from sanc import HEADER_SCHEMA, DETAIL_SCHEMA
+        return [HEADER_SCHEMA, DETAIL_SCHEMA]
+    if registry == "rcb":
+        return []
+    raise ValueError(f"Неизвестный реестр: {registry}")
+
+
+def item_values(item, prefix=""):
+    # Листья объекта: (ключ, значение); вложенные объекты раскрываются, {label, value} — пара метка/значение
+    if set(item) == {"label", "value"}:
+        yield str(item["label"]), item["value"]
+        return
+    for key, value in item.items():
+        if isinstance(value, dict):
+            yield from item_values(value)
+        elif isinstance(value, list):
+            for child in value:
+                if isinstance(child, dict):
+                    yield from item_values(child)
+        else:
+            yield str(key), value
+
+
+def item_pairs(item, schemas, fields=None):
+    # JSON-ключ -> метка схемы: bin / decisionNumber -> поле записи bin / decision_number -> «БИН» /
+    # «Номер принятия»; fields — явные соответствия «ключ: поле записи» из govkz_endpoints.json.
+    # Русские метки ({label, value}) сборщики понимают сами. Возвращает (пары, название организации)
+    labels = {field.name: field.labels[0] for schema in schemas for field in schema.fields if field.labels and not field.from_label}
+    pairs, name = [], None
+    for key, value in item_values(item):
+        value = "" if value is None else str(value).strip()
+        field = (fields or {}).get(key) or snake_case(key)
+        if field == "name":
+            name = value
+        if field in labels:
+            pairs.append((labels[field], value))
+        else:
+            pairs.append((key, value))
+    return pairs, name
+
+
+def known_pairs(pairs, schema):
+    return [(label, value) for label, value in pairs if schema.resolve(label) is not None]
+
+
+def build_records(registry, items, fields=None):
+    # Те же сборщики записей, что и у HTML-парсеров; объекты без единого поля схемы
+    # (меню, настройки страницы) пропускаются
+    schemas = registry_schemas(registry)
+    if registry == "rcb":
+        from rcb import build_license
+        return [record for record in (build_license(item_pairs(item, schemas, fields)[0]) for item in items) if record]
+    if registry == "sanctions":
+        from sanc import build_item
+    elif registry == "issued":
+        from issued_parser import build_record
+    else:
+        from issued_insurances_parser import build_record
+
+    records = []
+    for item in items:
+        pairs, name = item_pairs(item, schemas, fields)
+        known = [known_pairs(pairs, schema) for schema in schemas]
+        if not any(known):
+            continue
+        if registry == "sanctions":
+            # Заголовок и подробности карточки — разные схемы, их поля не пересекаются
+            records.append(build_item(*known))
+        else:
+            records.append(build_record(pairs, name))
+    return records
+
+
+def fetch_registry(registry, base_url=None, session=None, endpoints=None):
+    endpoints = endpoints if endpoints is not None else load_endpoints()
+    if not endpoints.get(registry):
+        raise RuntimeError(f"Нет сохранённых эндпоинтов для {registry}, сначала запустите --discover")
+
+    session = session or make_session()
+    records = []
+    for endpoint in unique_endpoints(endpoints[registry]):
+        pages = 0
+        for _, _, response in iter_pages(session, endpoint, base_url):
+            records.extend(build_records(registry, find_items(response.json(), endpoint.get("items")), endpoint.get("fields")))
+            pages += 1
+        if pages > 1:
+            print(f"📄 {registry}: {urlsplit(endpoint['url']).path} — {pages} стр.")
+    return records
+
+
+def fetch_all(registries=None, base_url=None):
+    start = time.time()
+    endpoints = load_endpoints()
+    session = make_session()
+    result = {}
+    try:
+        for registry in registries or REGISTRY_PAGES:
+            result[registry] = fetch_registry(registry, base_url, session, endpoints)
+            print(f"✅ {registry}: {len(result[registry])} записей")
+    finally:
+        session.close()
+    print(f"⏱️ Время выполнения: {round(time.time() - start, 1)} сек")
+    return result
+
+
+def route_key(method, url, body=None):
+    # Ответ выбирается по методу, пути, query (без учёта порядка параметров) и телу POST
+    parts = urlsplit(url)
+    payload = json_body(body)
+    if payload is not None:
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return method, parts.path, tuple(sorted(parse_qsl(parts.query, keep_blank_values=True))), body or None
+
+
+class CaptureHandler(BaseHTTPRequestHandler):
+    routes = {}
+
+    def respond(self, body):
+        capture = self.routes.get(route_key(self.command, self.path, body))
+        if capture is None:
+            self.send_error(404)
+            return
+        with open(capture, "rb") as f:
+            content = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self.respond(None)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.respond(self.rfile.read(length).decode("utf-8") if length else None)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_captures(endpoints=None, captures_dir=CAPTURES_DIR, host="127.0.0.1", port=0):
+    endpoints = endpoints if endpoints is not None else load_endpoints()
+    routes = {}
+    for registry, items in endpoints.items():
+        for endpoint in items:
+            key = route_key(endpoint.get("method", "GET"), endpoint["url"], endpoint.get("body"))
+            routes[key] = os.path.join(captures_dir, registry, endpoint["capture"])
+
+    handler = type("RoutedCaptureHandler", (CaptureHandler,), {"routes": routes})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Работа с JSON API реестров gov.kz")
+    parser.add_argument("--discover", action="store_true", help="записать эндпоинты через браузер")
+    parser.add_argument("--base-url", help="ходить не в gov.kz, а в указанный хост (например, локальный стаб)")
+    parser.add_argument("--stub", action="store_true", help="поднять локальный стаб из сохранённых ответов")
+    parser.add_argument("registries", nargs="*", help=f"реестры: {', '.join(REGISTRY_PAGES)}")
+    args = parser.parse_args()
+
+    if args.discover:
+        discover_endpoints(args.registries or None)
+        sys.exit(0)
+
+    base_url = args.base_url
+    server = None
+    if args.stub:
+        server, base_url = serve_captures()
+        print(f"🧪 Стаб запущен: {base_url}")
+    try:
+        data = fetch_all(args.registries or None, base_url)
+        print(json.dumps(data, ensure_ascii=False, indent=2, default=str))
+    finally:
+        if server:
+            server.shutdown()
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Разбор снимков страниц gov.kz. Нам нужны только карточки реестра, а полное дерево
+# html.parser строит ещё и шапку, подвал, скрипты и стили. Бэкенды:
+#   full     — как раньше, BeautifulSoup(html, "html.parser") по всей странице
+#   strainer — html.parser, но в дерево попадают только контейнеры карточек (SoupStrainer)
+#   lxml     — то же через lxml (нужен пакет lxml)
+# Контейнер — ближайший общий предок, которого хватает селекторам парсера
+# (block_name ищет родителя .collapse, sanctions выбирает .collapse-group .card.collapse).
+
+BACKENDS = ("full", "strainer", "lxml")
+
+SCOPES = {
+    "rcb": "collapse",
+    "issued": "collapse",
+    "insurances": "collapse",
+    "sanctions": "collapse-group",
+    "suspended": "collapse",
+    "revoked": "collapse",
+}
+
+# strainer и lxml пока сверяли с full только на синтетических страницах bench/fixtures.py,
+# снимков настоящих страниц ещё нет — поэтому везде full. Реестр переводится на другой
+# бэкенд, когда на его реальных снимках проходит сверка:
+#   python html_backend.py rcb issued --ref latest
+# GOVKZ_HTML_BACKEND перекрывает выбор для всех реестров.
+REGISTRY_BACKENDS = {
+    "rcb": "full",
+    "issued": "full",
+    "insurances": "full",
+    "sanctions": "full",
+    "suspended": "full",
+    "revoked": "full",
+}
+
+
+def lxml_available():
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def backend_for(registry):
+    backend = os.environ.get("GOVKZ_HTML_BACKEND") or REGISTRY_BACKENDS.get(registry, "full")
+    if backend == "lxml" and not lxml_available():
+        backend = "strainer"
+    return backend
+
+
+def parse(html, registry, backend=None):
+    backend = backend or backend_for(registry)
+    if backend == "full":
+        return BeautifulSoup(html, "html.parser")
+    features = "lxml" if backend == "lxml" else "html.parser"
+    return BeautifulSoup(html, features, parse_only=SoupStrainer(class_=SCOPES.get(registry, "collapse")))
+
+
+def select_blocks(html, registry, selector, backend=None):
+    backend = backend or backend_for(registry)
+    blocks = parse(html, registry, backend).select(selector)
+    if not blocks and backend != "full":
+        # Вёрстка без ожидаемого контейнера — разбираем страницу целиком
+        blocks = parse(html, registry, "full").select(selector)
+    return blocks
+
+
+# Разбор карточек в пуле процессов: основной процесс только режет страницу на фрагменты,
+# воркеры разбирают их и возвращают простые данные — списки пар, как у извлечения в браузере;
+# записи собирают build_* парсеров в исходном порядке. Фрагмент — контейнер карточки целиком
+# (из него берётся название организации) и номера его карточек: в контейнере их бывает
+# несколько, воркер выбирает каждую по номеру. following — тег, который card_fn ищет через
+# find_next за пределами контейнера (таблицы форм страхования), его кладём следом за контейнером.
+# card_fn приходит в воркер по имени модуля — модули парсеров не должны трогать БД при импорте
+# (под spawn воркер импортирует их без django.setup()).
+MIN_PARALLEL_CARDS = 500
+
+
+def extract_workers():
+    return int(os.environ.get("GOVKZ_EXTRACT_WORKERS") or os.cpu_count() or 1)
+
+
+def tail(block, following):
+    # Первый following после конца контейнера — туда и упрётся find_next из последней карточки
+    last = block
+    while getattr(last, "contents", None):
+        last = last.contents[-1]
+    return last.find_next(following)
+
+
+def card_fragments(blocks, selector, container=None, following=None):
+    # [(html, [(номер карточки во фрагменте или None, номер на странице)])] в порядке страницы
+    fragments = {}
+    for position, block in enumerate(blocks):
+        parent = block.find_parent(class_=container) if container else None
+        if parent is None:
+            fragments[id(block)] = (block, None, [(None, position)])
+            continue
+        if id(parent) not in fragments:
+            numbers = {id(card): i for i, card in enumerate(parent.select(selector))}
+            fragments[id(parent)] = (parent, numbers, [])
+        _, numbers, positions = fragments[id(parent)]
+        positions.append((numbers[id(block)], position))
+
+    result = []
+    for root, _, positions in fragments.values():
+        html = str(root)
+        extra = tail(root, following) if following else None
+        if extra is not None:
+            html = f"<div>{html}{extra}</div>"
+        result.append((html, positions))
+    return result
+
+
+def parse_chunk(card_fn, selector, fragments):
+    cards = []
+    for fragment, positions in fragments:
+        root = BeautifulSoup(fragment, "html.parser").find()
+        found = root.select(selector)
+        for number, position in positions:
+            cards.append((position, card_fn(root if number is None else found[number])))
+    return cards
+
+
+def map_cards(html, registry, selector, card_fn, container=None, backend=None, workers=None, following=None):
+    # card_fn(block) -> данные карточки; должна быть функцией верхнего уровня модуля (pickle).
+    # Явно заданные workers включают пул при любом числе карточек (сверка parallel == serial)
+    blocks = select_blocks(html, registry, selector, backend)
+    if workers is None:
+        workers = extract_workers() if len(blocks) >= MIN_PARALLEL_CARDS else 1
+    if workers <= 1 or len(blocks) < 2:
+        return [card_fn(block) for block in blocks]
+
+    inner = selector.split()[-1]
+    fragments = card_fragments(blocks, inner, container, following)
+    chunk_size = -(-len(fragments) // (workers * 4))
+    chunks = [fragments[i:i + chunk_size] for i in range(0, len(fragments), chunk_size)]
+    print(f"⚙️ Разбор {len(blocks)} карточек в {workers} процессах ({len(chunks)} частей)")
+
+    cards = [None] * len(blocks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_cards in pool.map(parse_chunk, [card_fn] * len(chunks), [inner] * len(chunks), chunks):
+            for position, card in chunk_cards:
+                cards[position] = card
+    return cards
+
+
+def validate(html, extract, backends=BACKENDS, workers=2):
+    # extract(html, backend, workers) -> записи; сравниваем с эталонным full и меряем время.
+    # Разбор в пуле процессов сверяется с тем же эталоном (parallel == serial)
+    results = {}
+    reference = None
+    runs = [(backend, backend, None) for backend in backends]
+    if workers and workers > 1:
+        runs.append((f"full/{workers} процесса", "full", workers))
+    for label, backend, run_workers in runs:
+        if backend == "lxml" and not lxml_available():
+            continue
+        started = time.perf_counter()
+        records = extract(html, backend, run_workers)
+        elapsed = time.perf_counter() - started
+        if reference is None:
+            reference = records
+        results[label] = {"seconds": round(elapsed, 4), "records": len(records), "matches": records == reference}
+    return results
+
+
+def extractor(registry):
+    # Функция разбора HTML из парсера реестра, принимающая backend
+    from registry import REGISTRIES
+    if registry == "sanctions":
+        import sanc
+        return sanc.extract_from_html
+    return REGISTRIES[registry].extract_from_html
+
+
+if __name__ == "__main__":
+    from snapshots import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Сверка бэкендов разбора HTML на сохранённых снимках")
+    parser.add_argument("registries", nargs="+", help=f"реестры: {', '.join(SCOPES)}")
+    parser.add_argument("--ref", default="latest", help="снимок (sha или latest)")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.registries:
+        html = load_snapshot(name, args.ref)
+        for backend, result in validate(html, extractor(name)).items():
+            mark = "✅" if result["matches"] else "❌"
+            failed = failed or not result["matches"]
+            print(f"{mark} {name} / {backend}: {result['records']} записей за {result['seconds']} с")
+    sys.exit(1 if failed else 0)
@@ -1,226 +1,208 @@
-import os
-import time
-import shutil
-import tempfile
-import requests
-import pandas as pd
-from io import BytesIO
-from datetime import datetime
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from bs4 import BeautifulSoup
 import json
+import argparse
 
-import chromedriver_autoinstaller
-chromedriver_autoinstaller.install()
+import metrics
+import profiling
+from browser import driver_session
+from browser_extract import extract_insurances
+from html_backend import map_cards
+from registry import open_registry, expand_page
+from schema import Schema, Field, to_date
+from snapshots import save_snapshot, load_snapshot
+from waits import Waiter
 
-from django.db import transaction
-from fins.models import Fin, IssuedLicense, LicenseReissue, LicenseType, OperationType, OrganizationTypeLicense, License
 
-# from parsers.fin_updater import update_fin_from_kdfo
+URL = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/8/registry/22?lang=ru"
+
+
+def block_name(block):
+    org_name_div = block.find_parent(class_="collapse").select_one(".collapse__value")
+    return org_name_div.get_text(strip=True) if org_name_div else None
 
-def safe_date(value):
-    try:
-        return datetime.strptime(value.strip(), "%d.%m.%Y").date()
-    except Exception:
-        return None
-    
-def safe_int(value):
-    try:
-        return int(value)
-    except Exception:
-        return 0
 
-def parse_date(val):
-    if pd.isna(val):
+def block_pairs(block):
+    pairs = []
+    for row in block.select("tr"):
+        cells = row.select("td")
+        if len(cells) == 2:
+            pairs.append((cells[0].get_text(strip=True), cells[1].get_text(strip=True)))
+    return pairs
+
+
+def reissue_rows(block):
+    # поля переоформления из внутренней ant-table
+    table = block.select_one(".ant-table-wrapper table")
+    if not table:
         return None
-    if isinstance(val, datetime):
-        return val.date()
+    return [
+        [cell.get_text(strip=True) for cell in row.select("td.ant-table-cell")]
+        for row in table.select("tbody tr")
+    ]
+
+
+def block_forms(block):
+    # Поиск секций формы (bold теги)
+    forms = []
+    for form_header in block.select("b"):
+        form_name = form_header.get_text(strip=True).replace(":", "")
+        form_table = form_header.find_next("table")
+
+        if not form_table:
+            continue
+
+        rows = []
+        for row in form_table.select("tr"):
+            cells = row.select("td")
+            if len(cells) != 2:
+                continue
+            rows.append((cells[0].get_text(strip=True), cells[1].get_text(strip=True)))
+        forms.append((form_name, rows))
+    return forms
+
+
+RECORD_SCHEMA = Schema([
+    Field("bin", "БИН"),
+    Field("primary_license_number", "Номер лицензии"),
+    Field("primary_license_date", "Дата выдачи лицензии"),
+    Field("current_license_number", "Всего классов"),
+])
+
+
+def reissue_date(value):
+    # Дата переоформления тем же конвертером, что и поля схемы; нераспознанная — None
     try:
-        return datetime.strptime(str(val), "%d.%m.%Y").date()
-    except Exception:
+        return to_date(value)
+    except ValueError:
         return None
 
 
-def extract_excel_from_govkz():
-    options = Options()
-    options.add_argument('--user-agent=Mozilla/5.0')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--disable-ipv6')
+def build_record(pairs, name=None, reissue=None):
+    record = {}
+    if name:
+        record["name"] = name
 
-    # service = Service("/usr/bin/chromedriver")
+    RECORD_SCHEMA.build(pairs, record)
 
-    seleniumwire_options = {'verify_ssl': False}
-    driver = webdriver.Chrome(options=options, seleniumwire_options=seleniumwire_options)
+    reissues = []
+    for cells in reissue or []:
+        if len(cells) >= 4:
+            reissues.append({
+                "date": reissue_date(cells[0]),
+                "basis": cells[1],
+                "reason": cells[2],
+                "currency_type": cells[3],
+            })
 
-    try:
-        url = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/8/registry/22?lang=ru"
-        driver.get(url)
-        time.sleep(10)
-
-        # 1) раскрываем все основные блоки
-        main_buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse__header")
-        for btn in main_buttons:
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                btn.click()
-                time.sleep(0.2)
-            except:
-                pass
-
-
-        content_divs = driver.find_elements(By.CSS_SELECTOR, ".collapse__content")
-
-        for content_div in content_divs:
-            # 2) раскрываем все вложенные секции Ant-Design
-            inner_arrows = content_div.find_elements(By.CSS_SELECTOR, ".anticon-right.ant-collapse-arrow")
-            if inner_arrows:
-                print(f"🔍 Найдено {len(inner_arrows)} внутренних секций")
-                for j, arrow in enumerate(inner_arrows):
-                    try:
-                        driver.execute_script("arguments[0].scrollIntoView(true);", arrow)
-                        time.sleep(1)
-
-                        driver.execute_script("arguments[0].click();", arrow)
-                        time.sleep(2)
-                    except:
-                        pass
-
-
-        # 👇 Принудительно раскрываем все внутренние ant-collapse через JS
-        driver.execute_script("""
-        document.querySelectorAll('.ant-collapse-item').forEach(item => {
-            item.classList.add('ant-collapse-item-active');
-        });
-        document.querySelectorAll('.ant-collapse-content').forEach(content => {
-            content.classList.remove('ant-collapse-content-inactive');
-            content.classList.add('ant-collapse-content-active');
-            content.style.display = 'block';
-            content.style.height = 'auto';
-        });
-        """)
-        time.sleep(1)
-
-        # 💾 Сохраняем HTML-страницу
-        html_source = driver.page_source
-        html_path = os.path.join(os.path.dirname(__file__), "govkz_issued_insurances_page.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_source)
-        print(f"💾 HTML сохранён: {html_path}")
-
-        with open(html_path, "r", encoding="utf-8") as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, "html.parser")
-        license_blocks = soup.select('.collapse__content__card')
-        parsed_data = []
-
-        for block in license_blocks:
-            record = {}
-            org_name_div = block.find_parent(class_="collapse").select_one(".collapse__value")
-            if org_name_div:
-                record["name"] = org_name_div.get_text(strip=True)
-
-            for row in block.select("tr"):
-                cells = row.select("td")
-                if len(cells) == 2:
-                    key = cells[0].get_text(strip=True)
-                    value = cells[1].get_text(strip=True)
-
-                    if "БИН" in key:
-                        record["bin"] = value
-                    elif "Номер лицензии" in key:
-                        record["primary_license_number"] = value
-                    elif "Дата выдачи лицензии" in key:
-                        record["primary_license_date"] = value
-                    elif "Всего классов" in key:
-                        record["current_license_number"] = value
-                    
-                        
-                # поля переоформления из внутренней ant-table
-                table = block.select_one(".ant-table-wrapper table")
-
-                reissues = []
-
-                if table:
-                    rows = table.select("tbody tr")
-                    for row in rows:
-                        cells = row.select("td.ant-table-cell")
-                        if len(cells) >= 4:
-                            reissue = {
-                                "date": parse_date(cells[0].get_text(strip=True)),
-                                "basis": cells[1].get_text(strip=True),
-                                "reason": cells[2].get_text(strip=True),
-                                "currency_type": cells[3].get_text(strip=True),
-                            }
-                            reissues.append(reissue)
-
-                record["is_reissued"] = bool(reissues)
-                record["reissues"] = reissues if reissues else None
-
-            parsed_data.append(record)
-
-            organization_type_name = record.get("organization_type", "").strip().lower()
-            org_type, _ = OrganizationTypeLicense.objects.get_or_create(name=organization_type_name)
-
-            # Поиск секций формы (bold теги)
-            form_headers = block.select("b")
-
-            operation_data = []
-
-            for form_header in form_headers:
-                form_name = form_header.get_text(strip=True).replace(":", "")
-                form_table = form_header.find_next("table")
-
-                if not form_table:
-                    continue
-
-                lic_type, _ = LicenseType.objects.get_or_create(
-                    type=org_type,
-                    name=form_name
-                )
-
-                rows = form_table.select("tr")
-                for row in rows:
-                    cells = row.select("td")
-                    if len(cells) != 2:
-                        continue
-                    name = cells[0].get_text(strip=True)
-                    value = cells[1].get_text(strip=True)
-
-                    # если стоит галочка
-                    if "✓" in value or "✔" in value:
-                        op_type, _ = OperationType.objects.get_or_create(
-                            licensetype=lic_type,
-                            name=name
-                        )
-                        operation_data.append({
-                            "license_type": lic_type,
-                            "operation_type": op_type,
-                            "license_name": record.get("current_license_number", "")
-                        })
-
-            record["operations"] = operation_data
+    record["is_reissued"] = bool(reissues)
+    record["reissues"] = reissues if reissues else None
+    return record
+
+
+def build_operations(record, forms):
+    # Только названия из реестра — справочники (вид организации, тип лицензии, вид операции)
+    # по этим натуральным ключам разрешает загрузчик, так что разбор снимка обходится без БД
+    operation_data = []
+
+    for form_name, rows in forms:
+        for name, value in rows:
+            # если стоит галочка
+            if "✓" in value or "✔" in value:
+                operation_data.append({
+                    "license_type": form_name,
+                    "operation_type": name,
+                    "license_name": record.get("current_license_number", "")
+                })
+
+    return operation_data
+
+
+def block_data(block):
+    # Те же данные, что отдаёт INSURANCES_JS при извлечении в браузере
+    return {"name": block_name(block), "pairs": block_pairs(block), "reissue": reissue_rows(block), "forms": block_forms(block)}
+
+
+def build_records(cards):
+    parsed_data = []
+    for card in cards:
+        record = build_record(card["pairs"], card["name"], card["reissue"])
+        record["operations"] = build_operations(record, card["forms"])
+        parsed_data.append(record)
+    return parsed_data
 
+
+def extract_from_html(html, backend=None, workers=None):
+    return build_records(map_cards(html, "insurances", '.collapse__content__card', block_data, "collapse", backend, workers, following="table"))
+
+
+def extract_from_snapshot(ref=None):
+    # Повторный разбор сохранённого снимка, без Chrome
+    return extract_from_html(load_snapshot("insurances", ref))
+
+
+def extract_excel_from_govkz(extraction="browser", snapshot=False, driver=None, sink=None):
+    with driver_session(driver) as driver:
+        waiter = Waiter(driver, registry="insurances")
+        return expand_and_extract(driver, waiter, extraction, snapshot, sink)
+
+
+def expand_and_extract(driver, waiter, extraction="browser", snapshot=False, sink=None):
+    open_registry(driver, waiter, URL)
+    expand_page(driver, waiter)
+    return extract_page(driver, extraction, snapshot, sink)
+
+
+def extract_page(driver, extraction="browser", snapshot=False, sink=None):
+    # sink — приёмник записей конвейера (Pipeline.put_many): получает их сразу после разбора
+    if extraction == "browser":
+        # Один execute_script вместо page_source + BeautifulSoup
+        with metrics.span("extract_browser", registry="insurances"):
+            parsed_data = build_records(extract_insurances(driver))
+        if sink:
+            sink(parsed_data)
+        if snapshot:
+            save_snapshot("insurances", driver.page_source)
         return parsed_data
 
+    # 💾 Снимок страницы после раскрытия — в хранилище снимков, разбор прямо из памяти
+    with metrics.span("page_source", registry="insurances"):
+        html_source = driver.page_source
+    save_snapshot("insurances", html_source)
+    with metrics.span("parse", registry="insurances"):
+        parsed_data = extract_from_html(html_source)
+    if sink:
+        sink(parsed_data)
+    return parsed_data
+
+
+def parse_issued_assurances_licenses(from_snapshot=None, load=True, pipelined=False):
+    try:
+        if load and pipelined:
+            # Запись в БД потоком-писателем параллельно с разбором и выводом (см. pipeline.py)
+            from pipeline import Pipeline
+            from loaders import load_issued_licenses
+            with Pipeline(load_issued_licenses, name="insurances") as pipeline:
+                run_issued_assurances_licenses(from_snapshot, load=False, sink=pipeline.put_many)
+        else:
+            run_issued_assurances_licenses(from_snapshot, load)
     finally:
-        driver.quit()
+        metrics.write_report("insurances", registry="insurances")
 
 
-def parse_issued_assurances_licenses():
+def run_issued_assurances_licenses(from_snapshot=None, load=True, sink=None):
     print("🚀 Начало парсинга лицензий страховых компаний...")
-    
-    parsed_data = extract_excel_from_govkz()
+
+    with profiling.stage("extract"):
+        if from_snapshot:
+            with metrics.span("parse", registry="insurances"):
+                parsed_data = extract_from_snapshot(from_snapshot)
+            if sink:
+                sink(parsed_data)
+        else:
+            parsed_data = extract_excel_from_govkz(sink=sink)
     if not parsed_data:
         print("❌ Не удалось получить данные.")
         return
+    metrics.count("records", len(parsed_data), registry="insurances")
 
     print(f"📄 Найдено записей: {len(parsed_data)}")
 
@@ -234,99 +216,24 @@ def parse_issued_assurances_licenses():
         print(f"  ▶️ Операций: {len(record.get('operations') or [])}")
 
     print("\n🧾 Полный JSON:")
-    print(json.dumps(parsed_data, indent=2, ensure_ascii=False))
+    print(json.dumps(parsed_data, indent=2, ensure_ascii=False, default=str))
 
     print("\n✅ Парсинг завершён.")
 
-
-
-    # with transaction.atomic():
-    #     for record in parsed_data:
-    #         bin_code = record.get("bin", "").strip()
-    #         name = record.get("name", "").strip()
-
-    #         if not bin_code or not name:
-    #             print(f"⛔ Пропущено: bin='{bin_code}', name='{name}'")
-    #             skipped += 1
-    #             continue
-
-    #         if not bin_code or not name:
-    #             skipped += 1
-    #             continue
-
-    #         fin = Fin.objects.filter(bin=bin_code).first()
-    #         if not fin:
-    #             update_fin_from_kdfo(bin_code)
-    #             fin = Fin.objects.filter(bin=bin_code).first()
-    #             if not fin:
-    #                 skipped += 1
-    #                 continue
-
-            # IssuedLicense.objects.update_or_create(
-            #     fin=fin,
-            #     current_license_number=record.get("current_license_number", "").strip(),
-            #     defaults={
-            #         "organization_type": record.get("organization_type", ""),
-            #         "primary_license_number": record.get("primary_license_number", ""),
-            #         "primary_license_date": safe_date(record.get("primary_license_date")),
-            #         "current_license_date": safe_date(record.get("current_license_date")),
-            #         "decision_number": record.get("decision_number", ""),
-            #         "decision_date": safe_date(record.get("decision_date")),
-            #         "currency": record.get("currency", ""),
-            #         "operations_count": safe_int(record.get("operations_count")),
-            #         "operations_description": record.get("operations_description", ""),
-            #         "is_reissued": record.get("is_reissued", False),
-            #         "reissue_basis": record.get("reissue_basis"),
-            #         "reissue_reason": record.get("reissue_reason"),
-            #         "reissue_currency_type": record.get("reissue_currency_type"),
-            #     }
-            # )
-
-    #         issued_license, _ = IssuedLicense.objects.update_or_create(
-    #             fin=fin,
-    #             current_license_number=record.get("current_license_number", "").strip(),
-    #             defaults={
-    #                 "organization_type": record.get("organization_type", ""),
-    #                 "primary_license_number": record.get("primary_license_number", ""),
-    #                 "primary_license_date": safe_date(record.get("primary_license_date")),
-    #                 "current_license_date": safe_date(record.get("current_license_date")),
-    #                 "decision_number": record.get("decision_number", ""),
-    #                 "decision_date": safe_date(record.get("decision_date")),
-    #                 "currency": record.get("currency", ""),
-    #                 "operations_count": safe_int(record.get("operations_count")),
-    #                 "operations_description": record.get("operations_description", ""),
-    #                 "is_reissued": record.get("is_reissued", False),
-    #             }
-    #         )
-
-    #         # Удаляем старые переоформления (если перезаписываем)
-    #         issued_license.reissues.all().delete()
-
-    #         # Добавляем новые, если есть
-    #         reissues = record.get("reissues") or []
-    #         for reissue in reissues:
-    #             LicenseReissue.objects.create(
-    #                 license=issued_license,
-    #                 basis=reissue.get("basis", ""),
-    #                 reason=reissue.get("reason", ""),
-    #                 currency_type=reissue.get("currency_type", "")
-    #             )
-
-    #         # Удалить старые операции по этой лицензии
-    #         issued_license.licenses.all().delete()
-
-    #         # Сохраняем новые операции
-    #         for op in record.get("operations", []):
-    #             License.objects.create(
-    #                 license_type=op["license_type"],
-    #                 operation_type=op["operation_type"],
-    #                 license_name=op["license_name"],
-    #             )
-
-    #         total += 1
-
-    # print(f"✅ Загружено в БД: {total}, пропущено: {skipped}")
+    if load:
+        from loaders import load_issued_licenses
+        with profiling.stage("load"):
+            load_issued_licenses(parsed_data)
 
 
 if __name__ == "__main__":
-    parse_issued_assurances_licenses()
+    parser = argparse.ArgumentParser(description="Парсер реестра лицензий страховых организаций gov.kz")
+    parser.add_argument("--from-snapshot", nargs="?", const="latest", help="разобрать сохранённый снимок вместо Chrome")
+    parser.add_argument("--no-load", action="store_true", help="не загружать записи в БД")
+    parser.add_argument("--pipeline", action="store_true", help="писать в БД параллельно с разбором")
+    parser.add_argument("--profile", action="store_true", help="профилировать разбор и загрузку (cProfile + tracemalloc)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable("insurances")
+    parse_issued_assurances_licenses(args.from_snapshot, load=not args.no_load, pipelined=args.pipeline)
@@ -1,187 +1,180 @@
-import os
-import time
-import shutil
-import tempfile
-import requests
-import pandas as pd
-from io import BytesIO
-from datetime import datetime
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from bs4 import BeautifulSoup
 import json
+import argparse
 
-import chromedriver_autoinstaller
-chromedriver_autoinstaller.install()
+import metrics
+import profiling
+from browser import driver_session
+from browser_extract import extract_issued
+from html_backend import map_cards
+from registry import open_registry, expand_page
+from schema import Schema, Field, to_int
+from snapshots import save_snapshot, load_snapshot
+from waits import Waiter
 
 
-def parse_date(val):
-    if pd.isna(val):
-        return None
-    if isinstance(val, datetime):
-        return val.date()
-    try:
-        return datetime.strptime(str(val), "%d.%m.%Y").date()
-    except Exception:
-        return None
+URL = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/5/registry/19?lang=ru"
 
 
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+def block_name(block):
+    org_name_div = block.find_parent(class_="collapse").select_one(".collapse__value")
+    return org_name_div.get_text(strip=True) if org_name_div else None
 
-def extract_excel_from_govkz():
-    tmp_profile = tempfile.mkdtemp()
-    options = Options()
-    options.add_argument('--user-agent=Mozilla/5.0')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument(f'--user-data-dir={tmp_profile}')
-    options.add_argument('--disable-ipv6')
 
-    # service = Service("/usr/local/bin/chromedriver")  # укажи путь к chromedriver если надо
-    seleniumwire_options = {'verify_ssl': False}
-    driver = webdriver.Chrome(options=options, seleniumwire_options=seleniumwire_options)
+def block_pairs(block):
+    pairs = []
+    for row in block.select("tr.ant-descriptions-row"):
+        key_cell = row.select_one("th")
+        val_cell = row.select_one("td")
+        if key_cell and val_cell:
+            pairs.append((key_cell.get_text(strip=True), val_cell.get_text(strip=True)))
+    return pairs
 
-    try:
-        url = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/5/registry/19?lang=ru"
-        driver.get(url)
-        time.sleep(10)
-
-        # 1) раскрываем все основные блоки
-        main_buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse__header")
-        for btn in main_buttons:
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                btn.click()
-                time.sleep(0.2)
-            except:
-                pass
-
-
-        content_divs = driver.find_elements(By.CSS_SELECTOR, ".collapse__content")
-
-        for content_div in content_divs:
-            # 2) раскрываем все вложенные секции Ant-Design
-            inner_arrows = content_div.find_elements(By.CSS_SELECTOR, ".anticon-right.ant-collapse-arrow")
-            if inner_arrows:
-                print(f"🔍 Найдено {len(inner_arrows)} внутренних секций")
-                for j, arrow in enumerate(inner_arrows):
-                    try:
-                        driver.execute_script("arguments[0].scrollIntoView(true);", arrow)
-                        time.sleep(1)
-
-                        driver.execute_script("arguments[0].click();", arrow)
-                        time.sleep(2)
-                    except:
-                        pass
-
-
-        # 👇 Принудительно раскрываем все внутренние ant-collapse через JS
-        driver.execute_script("""
-        document.querySelectorAll('.ant-collapse-item').forEach(item => {
-            item.classList.add('ant-collapse-item-active');
-        });
-        document.querySelectorAll('.ant-collapse-content').forEach(content => {
-            content.classList.remove('ant-collapse-content-inactive');
-            content.classList.add('ant-collapse-content-active');
-            content.style.display = 'block';
-            content.style.height = 'auto';
-        });
-        """)
-        time.sleep(1)
-
-
-        # 💾 Сохраняем HTML после раскрытия
-        html_source = driver.page_source
-        html_path = os.path.join(os.path.dirname(__file__), "govkz_issued_page.html")
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(html_source)
-        print(f"💾 HTML сохранён: {html_path}")
-
-        # Чтение и парсинг
-        with open(html_path, "r", encoding="utf-8") as f:
-            html = f.read()
-
-        soup = BeautifulSoup(html, "html.parser")
-        license_blocks = soup.select('.collapse__content__card')
-        parsed_data = []
-
-        for block in license_blocks:
-            record = {}
-            org_name_div = block.find_parent(class_="collapse").select_one(".collapse__value")
-            if org_name_div:
-                record["name"] = org_name_div.get_text(strip=True)
-
-            for row in block.select("tr.ant-descriptions-row"):
-                key_cell = row.select_one("th")
-                val_cell = row.select_one("td")
-                if key_cell and val_cell:
-                    key = key_cell.get_text(strip=True)
-                    value = val_cell.get_text(strip=True)
-
-                    if "БИН" in key:
-                        record["bin"] = value
-                    elif "Тип организации" in key:
-                        record["organization_type"] = value
-                    elif "Номер первичной лицензии" in key:
-                        record["primary_license_number"] = value
-                    elif "Дата первичной лицензии" in key:
-                        record["primary_license_date"] = value
-                    elif "Номер действующей лицензии" in key:
-                        record["current_license_number"] = value
-                    elif "Дата действующей лицензии" in key:
-                        record["current_license_date"] = value
-                    elif "Номер решения" in key:
-                        record["decision_number"] = value
-                    elif "Дата решения" in key:
-                        record["decision_date"] = value
-                    elif "в тенге" in key:
-                        record["currency"] = value
-                    elif "Количество" in key:
-                        record["operations_count"] = value
-                    elif "Банковские заемные операции" in key:
-                        record["operations_description"] = key
-
-                # поля переоформления из внутренней ant-table
-                table = block.select_one(".ant-table-wrapper table")
-                if table:
-                    tds = table.select("tbody tr td.ant-table-cell")
-                    # 0-й ячейка — всегда "Переоформление лицензии"
-                    record["is_reissued"] = True
-                    record["reissue_basis"]           = tds[1].get_text(strip=True)
-                    record["reissue_reason"]          = tds[2].get_text(strip=True)
-                    record["reissue_currency_type"]   = tds[3].get_text(strip=True)
-                else:
-                    record["is_reissued"] = False
-                    record["reissue_basis"] = None
-                    record["reissue_reason"] = None
-                    record["reissue_currency_type"] = None
-
-            parsed_data.append(record)
 
+def reissue_cells(block):
+    # поля переоформления из внутренней ant-table
+    table = block.select_one(".ant-table-wrapper table")
+    if not table:
+        return None
+    return [td.get_text(strip=True) for td in table.select("tbody tr td.ant-table-cell")]
+
+
+RECORD_SCHEMA = Schema([
+    Field("bin", "БИН"),
+    Field("organization_type", "Тип организации"),
+    Field("primary_license_number", "Номер первичной лицензии"),
+    Field("primary_license_date", "Дата первичной лицензии"),
+    Field("current_license_number", "Номер действующей лицензии"),
+    Field("current_license_date", "Дата действующей лицензии"),
+    Field("decision_number", "Номер решения"),
+    Field("decision_date", "Дата решения"),
+    Field("currency", "в тенге"),
+    Field("operations_count", "Количество", convert=to_int),
+    Field("operations_description", "Банковские заемные операции", from_label=True),
+])
+
+
+def build_record(pairs, name=None, reissue=None):
+    record = {}
+    if name:
+        record["name"] = name
+
+    RECORD_SCHEMA.build(pairs, record)
+
+    if reissue:
+        # 0-й ячейка — всегда "Переоформление лицензии"
+        record["is_reissued"] = True
+        record["reissue_basis"]           = reissue[1]
+        record["reissue_reason"]          = reissue[2]
+        record["reissue_currency_type"]   = reissue[3]
+    else:
+        record["is_reissued"] = False
+        record["reissue_basis"] = None
+        record["reissue_reason"] = None
+        record["reissue_currency_type"] = None
+
+    return record
+
+
+def block_data(block):
+    # Те же данные, что отдаёт ISSUED_JS при извлечении в браузере
+    return {"name": block_name(block), "pairs": block_pairs(block), "reissue": reissue_cells(block)}
+
+
+def extract_from_html(html, backend=None, workers=None):
+    cards = map_cards(html, "issued", '.collapse__content__card', block_data, "collapse", backend, workers)
+    return [build_record(card["pairs"], card["name"], card["reissue"]) for card in cards]
+
+
+def extract_from_snapshot(ref=None):
+    # Повторный разбор сохранённого снимка, без Chrome
+    return extract_from_html(load_snapshot("issued", ref))
+
+
+def extract_excel_from_govkz(extraction="browser", snapshot=False, driver=None, sink=None):
+    with driver_session(driver) as driver:
+        waiter = Waiter(driver, registry="issued")
+        return expand_and_extract(driver, waiter, extraction, snapshot, sink)
+
+
+def expand_and_extract(driver, waiter, extraction="browser", snapshot=False, sink=None):
+    open_registry(driver, waiter, URL)
+    expand_page(driver, waiter)
+    return extract_page(driver, extraction, snapshot, sink)
+
+
+def extract_page(driver, extraction="browser", snapshot=False, sink=None):
+    # sink — приёмник записей конвейера (Pipeline.put_many): получает их сразу после разбора
+    if extraction == "browser":
+        # Один execute_script вместо page_source + BeautifulSoup
+        with metrics.span("extract_browser", registry="issued"):
+            parsed_data = [
+                build_record(card["pairs"], card["name"], card["reissue"])
+                for card in extract_issued(driver)
+            ]
+        if sink:
+            sink(parsed_data)
+        if snapshot:
+            save_snapshot("issued", driver.page_source)
         return parsed_data
 
-    finally:
-        driver.quit()
-        shutil.rmtree(tmp_profile, ignore_errors=True)
-
+    # 💾 Снимок страницы после раскрытия — в хранилище снимков, разбор прямо из памяти
+    with metrics.span("page_source", registry="issued"):
+        html_source = driver.page_source
+    save_snapshot("issued", html_source)
+    with metrics.span("parse", registry="issued"):
+        parsed_data = extract_from_html(html_source)
+    if sink:
+        sink(parsed_data)
+    return parsed_data
 
 
-def parse_issued_licenses():
-    parsed_data = extract_excel_from_govkz()
+def parse_issued_licenses(from_snapshot=None, load=False, pipelined=False):
+    try:
+        if load and pipelined:
+            # Запись в БД потоком-писателем параллельно с разбором и выводом (см. pipeline.py)
+            from pipeline import Pipeline
+            from loaders import load_issued_licenses
+            with Pipeline(load_issued_licenses, name="issued") as pipeline:
+                run_issued_licenses(from_snapshot, load=False, sink=pipeline.put_many)
+        else:
+            run_issued_licenses(from_snapshot, load)
+    finally:
+        metrics.write_report("issued", registry="issued")
+
+
+def run_issued_licenses(from_snapshot=None, load=False, sink=None):
+    with profiling.stage("extract"):
+        if from_snapshot:
+            with metrics.span("parse", registry="issued"):
+                parsed_data = extract_from_snapshot(from_snapshot)
+            if sink:
+                sink(parsed_data)
+        else:
+            parsed_data = extract_excel_from_govkz(sink=sink)
     if not parsed_data:
         print("❌ Не удалось получить данные.")
         return
+    metrics.count("records", len(parsed_data), registry="issued")
 
     print(f"📄 Найдено записей: {len(parsed_data)}")
 
     for record in parsed_data:
         print(json.dumps(record, ensure_ascii=False, indent=2))
 
+    if load:
+        from loaders import load_issued_licenses
+        with profiling.stage("load"):
+            load_issued_licenses(parsed_data)
+
 
 if __name__ == "__main__":
-    parse_issued_licenses()
+    parser = argparse.ArgumentParser(description="Парсер реестра выданных лицензий gov.kz")
+    parser.add_argument("--from-snapshot", nargs="?", const="latest", help="разобрать сохранённый снимок вместо Chrome")
+    parser.add_argument("--load", action="store_true", help="загрузить записи в БД")
+    parser.add_argument("--pipeline", action="store_true", help="писать в БД параллельно с разбором")
+    parser.add_argument("--profile", action="store_true", help="профилировать разбор и загрузку (cProfile + tracemalloc)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable("issued")
+    parse_issued_licenses(args.from_snapshot, load=args.load, pipelined=args.pipeline)
@@ -0,0 +1,477 @@
+from datetime import date, datetime
+
+from django.db import transaction
+
+import metrics
+from fins.models import IssuedLicense, LicenseReissue, License, SuspendedLicense, RevokedLicense
+
+# Поля IssuedLicense, которые загрузчик берёт из записи парсера
+LICENSE_FIELDS = (
+    "organization_type",
+    "primary_license_number",
+    "primary_license_date",
+    "current_license_date",
+    "decision_number",
+    "decision_date",
+    "currency",
+    "operations_count",
+    "operations_description",
+    "is_reissued",
+)
+
+
+def safe_date(value):
+    try:
+        return datetime.strptime(value.strip(), "%d.%m.%Y").date()
+    except Exception:
+        return None
+
+
+def safe_int(value):
+    try:
+        return int(value)
+    except Exception:
+        return 0
+
+
+def license_defaults(record):
+    primary_date = safe_date(record.get("primary_license_date") or "")
+    current_date = safe_date(record.get("current_license_date") or "")
+    return {
+        "organization_type": record.get("organization_type") or "",
+        "primary_license_number": (record.get("primary_license_number") or "").strip(),
+        # Обе даты в модели обязательные; у страховых в реестре только одна дата выдачи
+        "primary_license_date": primary_date or current_date,
+        "current_license_date": current_date or primary_date,
+        "decision_number": record.get("decision_number") or "",
+        "decision_date": safe_date(record.get("decision_date") or ""),
+        "currency": record.get("currency") or "",
+        "operations_count": safe_int(record.get("operations_count")),
+        "operations_description": record.get("operations_description") or "",
+        "is_reissued": bool(record.get("is_reissued")),
+    }
+
+
+def record_reissues(record):
+    # Банки отдают одно переоформление плоскими полями, страховые — списком reissues
+    if record.get("reissues"):
+        return [
+            (r.get("basis") or "", r.get("reason") or "", r.get("currency_type") or "")
+            for r in record["reissues"]
+        ]
+    if record.get("is_reissued"):
+        return [(record.get("reissue_basis") or "", record.get("reissue_reason") or "", record.get("reissue_currency_type") or "")]
+    return []
+
+
+def operation_org_type(record):
+    return (record.get("organization_type") or "").strip().lower()
+
+
+def resolve_taxonomy(parsed_data):
+    # Операции страховых приходят названиями (тип лицензии, вид операции); справочники
+    # разрешаются здесь, одним bulk_create на таблицу для новых значений (см. taxonomy.py)
+    if not any(record.get("operations") for record in parsed_data):
+        return None
+    from taxonomy import TaxonomyResolver
+    taxonomy = TaxonomyResolver()
+    for record in parsed_data:
+        org_type = operation_org_type(record)
+        for op in record.get("operations") or []:
+            taxonomy.operation_type(taxonomy.license_type(org_type, op["license_type"]), op["operation_type"])
+    taxonomy.flush()
+    return taxonomy
+
+
+def record_operations(record, taxonomy):
+    org_type = operation_org_type(record)
+    return sorted(
+        taxonomy.ids(org_type, op["license_type"], op["operation_type"]) + (op["license_name"],)
+        for op in record.get("operations") or []
+    )
+
+
+def upsert(model, rows, unique_fields, update_fields):
+    # INSERT ... ON CONFLICT (натуральный ключ) DO UPDATE: конфликт ловит уникальное ограничение
+    # из Meta.constraints модели, created_at при обновлении не трогаем
+    if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        update_fields = tuple(update_fields) + ("updated_at",)
+    model.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
+
+
+def invalidate_profiles(fins, fin_ids):
+    # Карточки организаций (fin_profile) с изменившимися лицензиями — после коммита транзакции,
+    # чтобы читатель не закэшировал старое состояние заново
+    from fin_profile import invalidate
+    bins = [fin.bin for fin in fins.values() if fin.id in fin_ids]
+    transaction.on_commit(lambda: invalidate(bins))
+
+
+NAME_MATCH_THRESHOLD = 0.9
+
+
+def fill_bins_by_name(parsed_data):
+    # Запись без БИН — ищем организацию по названию (fin_search); берём только однозначное совпадение
+    without_bin = [r for r in parsed_data if not (r.get("bin") or "").strip() and (r.get("name") or "").strip()]
+    if not without_bin:
+        return
+    from fin_search import match_many
+    matches = match_many([r["name"] for r in without_bin], threshold=NAME_MATCH_THRESHOLD)
+    for record in without_bin:
+        match = matches.get(record["name"])
+        if match:
+            record["bin"] = match["bin"]
+            print(f"🔗 БИН по названию: '{record['name']}' → {match['bin']} (похожесть {match['score']})")
+
+
+def resolve_fins(bins, resolver=None):
+    # Отсутствующие в БД организации подтягиваются из КДФО (см. fin_resolver)
+    from fin_resolver import FinResolver
+    return (resolver or FinResolver()).resolve(bins)
+
+
+def prepare_licenses(parsed_data, fins, taxonomy=None):
+    # Последняя запись с тем же (fin, current_license_number) побеждает
+    prepared = {}
+    skipped = 0
+    for record in parsed_data:
+        bin_code = (record.get("bin") or "").strip()
+        name = (record.get("name") or "").strip()
+        fin = fins.get(bin_code)
+        if not bin_code or not name or fin is None:
+            print(f"⛔ Пропущено: bin='{bin_code}', name='{name}'")
+            skipped += 1
+            continue
+
+        defaults = license_defaults(record)
+        if not defaults["primary_license_date"]:
+            print(f"⛔ Пропущено: bin='{bin_code}' — нет даты лицензии")
+            skipped += 1
+            continue
+
+        key = (fin.id, (record.get("current_license_number") or "").strip())
+        operations = record_operations(record, taxonomy) if taxonomy else []
+        prepared[key] = (defaults, record_reissues(record), operations)
+    return prepared, skipped
+
+
+def load_issued_licenses(parsed_data, resolver=None):
+    # Set-based загрузка: один select по существующим лицензиям (индекс fin + номер), новые и
+    # изменившиеся — одним upsert по уникальному ключу, переоформления и операции трогаем
+    # только у лицензий, где они изменились
+    fill_bins_by_name(parsed_data)
+    bins = {(r.get("bin") or "").strip() for r in parsed_data} - {""}
+    fins = resolve_fins(bins, resolver)
+    prepared, skipped = prepare_licenses(parsed_data, fins, resolve_taxonomy(parsed_data))
+
+    stats = {"created": 0, "updated": 0, "unchanged": 0, "reissues_changed": 0, "operations_changed": 0, "skipped": skipped}
+    if not prepared:
+        return stats
+
+    with metrics.span("db_write", table="issued_license"), transaction.atomic():
+        existing = {}
+        for lic in IssuedLicense.objects.filter(fin_id__in={fin_id for fin_id, _ in prepared}).order_by("id"):
+            existing.setdefault((lic.fin_id, lic.current_license_number), lic)
+
+        rows = []
+        for (fin_id, number), (defaults, _, _) in prepared.items():
+            lic = existing.get((fin_id, number))
+            if lic is None:
+                stats["created"] += 1
+            elif any(getattr(lic, field) != value for field, value in defaults.items()):
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+                continue
+            rows.append(IssuedLicense(fin_id=fin_id, current_license_number=number, **defaults))
+
+        if rows:
+            upsert(IssuedLicense, rows, ("fin", "current_license_number"), LICENSE_FIELDS)
+        if stats["created"]:
+            # Не все БД возвращают pk из bulk_create — перечитываем созданные одним запросом
+            created_keys = {(lic.fin_id, lic.current_license_number) for lic in rows} - set(existing)
+            for lic in IssuedLicense.objects.filter(
+                fin_id__in={fin_id for fin_id, _ in created_keys},
+                current_license_number__in={number for _, number in created_keys},
+            ).order_by("id"):
+                existing.setdefault((lic.fin_id, lic.current_license_number), lic)
+
+        license_ids = {key: existing[key].id for key in prepared}
+        reissued = set(sync_reissues(prepared, license_ids, stats))
+        sync_operations(prepared, license_ids, stats)
+
+        changed_fins = {lic.fin_id for lic in rows} | {fin_id for (fin_id, _), lic_id in license_ids.items() if lic_id in reissued}
+        invalidate_profiles(fins, changed_fins)
+
+    for key in ("created", "updated", "unchanged", "skipped"):
+        metrics.count(f"rows_{key}", stats[key], table="issued_license")
+    print(
+        f"✅ Лицензии: создано {stats['created']}, обновлено {stats['updated']}, без изменений {stats['unchanged']}, "
+        f"пропущено {stats['skipped']}; переоформления изменены у {stats['reissues_changed']}"
+    )
+    return stats
+
+
+def sync_reissues(prepared, license_ids, stats):
+    current = {}
+    for reissue in LicenseReissue.objects.filter(license_id__in=license_ids.values()).order_by("id"):
+        current.setdefault(reissue.license_id, []).append((reissue.basis, reissue.reason, reissue.currency_type or ""))
+
+    changed_ids, new_rows = [], []
+    for key, (_, reissues, _) in prepared.items():
+        license_id = license_ids[key]
+        if current.get(license_id, []) == reissues:
+            continue
+        changed_ids.append(license_id)
+        new_rows.extend(
+            LicenseReissue(license_id=license_id, basis=basis, reason=reason, currency_type=currency_type)
+            for basis, reason, currency_type in reissues
+        )
+
+    if changed_ids:
+        LicenseReissue.objects.filter(license_id__in=changed_ids).delete()
+        LicenseReissue.objects.bulk_create(new_rows, batch_size=500)
+    stats["reissues_changed"] = len(changed_ids)
+    return changed_ids
+
+
+def sync_operations(prepared, license_ids, stats):
+    # Операции (License) привязаны к своей лицензии (issued_license): license_name у страховых —
+    # «Всего классов», по нему лицензии разных организаций совпадают
+    wanted = {}
+    for key, (_, _, operations) in prepared.items():
+        wanted[license_ids[key]] = set(operations)
+
+    current = {}
+    for lic in License.objects.filter(issued_license_id__in=wanted):
+        current.setdefault(lic.issued_license_id, set()).add((lic.license_type_id, lic.operation_type_id, lic.license_name))
+
+    changed = [license_id for license_id, ops in wanted.items() if current.get(license_id, set()) != ops]
+    if changed:
+        License.objects.filter(issued_license_id__in=changed).delete()
+        License.objects.bulk_create([
+            License(issued_license_id=license_id, license_type_id=license_type_id, operation_type_id=operation_type_id, license_name=name)
+            for license_id in changed
+            for license_type_id, operation_type_id, name in sorted(wanted[license_id])
+        ], batch_size=500)
+    stats["operations_changed"] = len(changed)
+
+
+# Реестры приостановленных/прекративших действие лицензий: запись — одно решение по лицензии
+DECISION_MODELS = {
+    "suspended": SuspendedLicense,
+    "revoked": RevokedLicense,
+}
+DECISION_DATE_FIELDS = ("license_issue_date", "decision_date")
+
+
+def decision_defaults(model, record):
+    defaults = {}
+    for field in model._meta.concrete_fields:
+        if field.name in ("id", "fin", "created_at", "updated_at"):
+            continue
+        value = record.get(field.name)
+        if field.name in DECISION_DATE_FIELDS:
+            defaults[field.name] = safe_date(value or "")
+        else:
+            defaults[field.name] = (value or "").strip() or (None if field.null else "")
+    return defaults
+
+
+def load_decision_licenses(model, parsed_data, resolver=None):
+    # Ключ — (fin, license_number, decision_number); тот же diff + upsert, что и у выданных лицензий
+    fill_bins_by_name(parsed_data)
+    bins = {(r.get("bin") or "").strip() for r in parsed_data} - {""}
+    fins = resolve_fins(bins, resolver)
+
+    prepared = {}
+    stats = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    for record in parsed_data:
+        fin = fins.get((record.get("bin") or "").strip())
+        defaults = decision_defaults(model, record)
+        if fin is None or not all(defaults[field] for field in DECISION_DATE_FIELDS):
+            print(f"⛔ Пропущено: bin='{record.get('bin')}', лицензия='{record.get('license_number')}'")
+            stats["skipped"] += 1
+            continue
+        prepared[(fin.id, defaults["license_number"], defaults["decision_number"])] = defaults
+
+    if not prepared:
+        return stats
+
+    with metrics.span("db_write", table=model._meta.model_name), transaction.atomic():
+        existing = {}
+        for lic in model.objects.filter(fin_id__in={fin_id for fin_id, _, _ in prepared}).order_by("id"):
+            existing.setdefault((lic.fin_id, lic.license_number, lic.decision_number), lic)
+
+        rows = []
+        for (fin_id, _, _), defaults in prepared.items():
+            lic = existing.get((fin_id, defaults["license_number"], defaults["decision_number"]))
+            if lic is None:
+                stats["created"] += 1
+            elif any(getattr(lic, field) != value for field, value in defaults.items()):
+                stats["updated"] += 1
+            else:
+                stats["unchanged"] += 1
+                continue
+            rows.append(model(fin_id=fin_id, **defaults))
+
+        if rows:
+            update_fields = [field for field in next(iter(prepared.values())) if field not in ("license_number", "decision_number")]
+            upsert(model, rows, ("fin", "license_number", "decision_number"), update_fields)
+            invalidate_profiles(fins, {lic.fin_id for lic in rows})
+    for key in ("created", "updated", "unchanged", "skipped"):
+        metrics.count(f"rows_{key}", stats[key], table=model._meta.model_name)
+    print(
+        f"✅ {model._meta.verbose_name_plural}: создано {stats['created']}, обновлено {stats['updated']}, "
+        f"без изменений {stats['unchanged']}, пропущено {stats['skipped']}"
+    )
+    return stats
+
+
+# Санкции (приложение sanctions основного проекта). Поля RegulatoryDecision совпадают с ключами
+# записи sanc.build_item; вид/тип взыскания и департамент — FK на справочники с полем name.
+# Ключ решения — (decision_number, decision_date, bin). Уникальное ограничение на нём должно быть
+# в модели внешнего приложения sanctions: в этом дереве его не создаёт ни одна миграция,
+# а без него upsert (ON CONFLICT) не сработает.
+SANCTION_KEY = ("decision_number", "decision_date", "bin")
+SANCTION_TEXT_FIELDS = ("organization", "sanction_amount", "responsible_body", "npa_article", "note", "npa_type")
+SANCTION_DICTIONARIES = ("violation_type", "sanction_type", "department")
+SANCTION_UPDATE_FIELDS = SANCTION_TEXT_FIELDS + ("execution_deadline", "fin") + SANCTION_DICTIONARIES
+
+
+def iso_date(value):
+    # sanc отдаёт даты в ISO, а нераспознанные — как есть с сайта
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return safe_date(value)
+
+
+class DictionaryCache:
+    # Справочник «название → объект» в памяти: один select на весь прогон,
+    # новые названия — одним bulk_create на пачку
+
+    def __init__(self, model, field="name"):
+        self.model = model
+        self.field = field
+        self.items = {}
+        for obj in model.objects.order_by("id"):
+            self.items.setdefault(getattr(obj, field), obj)
+
+    def add(self, names):
+        names = {name for name in names if name} - set(self.items)
+        if not names:
+            return
+        self.model.objects.bulk_create([self.model(**{self.field: name}) for name in sorted(names)], ignore_conflicts=True)
+        for obj in self.model.objects.filter(**{f"{self.field}__in": names}).order_by("id"):
+            self.items.setdefault(getattr(obj, self.field), obj)
+
+    def id(self, name):
+        obj = self.items.get(name) if name else None
+        return obj.id if obj else None
+
+
+class SanctionsLoader:
+    # Загрузка решений пачками (страница сайта — одна пачка, одна транзакция).
+    # Справочники и найденные Fin живут между пачками, чтобы не перечитывать их на каждой странице.
+
+    def __init__(self, resolver=None):
+        from sanctions.models import RegulatoryDecision, ViolationType, SanctionType, Department
+        self.model = RegulatoryDecision
+        self.dictionaries = {
+            "violation_type": DictionaryCache(ViolationType),
+            "sanction_type": DictionaryCache(SanctionType),
+            "department": DictionaryCache(Department),
+        }
+        self.resolver = resolver
+        self.fins = {}
+        self.seen_bins = set()
+
+    def __call__(self, items):
+        return self.load(items)
+
+    def defaults(self, item):
+        defaults = {field: (item.get(field) or "").strip() for field in SANCTION_TEXT_FIELDS}
+        defaults["execution_deadline"] = iso_date(item.get("execution_deadline"))
+        fin = self.fins.get((item.get("bin") or "").strip())
+        defaults["fin_id"] = fin.id if fin else None
+        for field in SANCTION_DICTIONARIES:
+            defaults[f"{field}_id"] = self.dictionaries[field].id((item.get(field) or "").strip())
+        return defaults
+
+    def load(self, items):
+        stats = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+        keyed = {}
+        for item in items:
+            bin_code = (item.get("bin") or "").strip()
+            number = (item.get("decision_number") or "").strip()
+            decision_date = iso_date(item.get("decision_date"))
+            if not bin_code or not number or not decision_date:
+                print(f"⛔ Пропущено решение: bin='{bin_code}', номер='{number}'")
+                stats["skipped"] += 1
+                continue
+            keyed[(number, decision_date, bin_code)] = item
+        if not keyed:
+            return stats
+
+        new_bins = {bin_code for _, _, bin_code in keyed} - self.seen_bins
+        if new_bins:
+            self.fins.update(resolve_fins(new_bins, self.resolver))
+            self.seen_bins |= new_bins
+
+        table = self.model._meta.model_name
+        with metrics.span("db_write", table=table), transaction.atomic():
+            for field, cache in self.dictionaries.items():
+                cache.add((item.get(field) or "").strip() for item in keyed.values())
+
+            # Select нужен только для статистики и чтобы не переписывать неизменившиеся решения;
+            # запись — одним upsert по ключу, так что параллельный загрузчик, вставивший то же
+            # решение между select и записью, даёт обновление, а не IntegrityError
+            existing = {
+                (d.decision_number, d.decision_date, d.bin): d
+                for d in self.model.objects.filter(decision_number__in={number for number, _, _ in keyed})
+            }
+            rows, created = [], 0
+            for (number, decision_date, bin_code), item in keyed.items():
+                defaults = self.defaults(item)
+                decision = existing.get((number, decision_date, bin_code))
+                if decision is not None and all(getattr(decision, field) == value for field, value in defaults.items()):
+                    stats["unchanged"] += 1
+                    continue
+                created += decision is None
+                rows.append(self.model(decision_number=number, decision_date=decision_date, bin=bin_code, **defaults))
+
+            if rows:
+                upsert(self.model, rows, SANCTION_KEY, SANCTION_UPDATE_FIELDS)
+
+        stats["created"] = created
+        stats["updated"] = len(rows) - created
+        for key in ("created", "updated", "unchanged", "skipped"):
+            metrics.count(f"rows_{key}", stats[key], table=table)
+        print(
+            f"✅ Санкции: создано {stats['created']}, обновлено {stats['updated']}, "
+            f"без изменений {stats['unchanged']}, пропущено {stats['skipped']}"
+        )
+        return stats
+
+
+def load_sanctions(parsed_data, resolver=None):
+    return SanctionsLoader(resolver).load(parsed_data)
+
+
+def load_registry(name, parsed_data, resolver=None):
+    if name in DECISION_MODELS:
+        return load_decision_licenses(DECISION_MODELS[name], parsed_data, resolver)
+    if name == "sanctions":
+        return load_sanctions(parsed_data, resolver)
+    if name in ("issued", "insurances"):
+        return load_issued_licenses(parsed_data, resolver)
+    print(f"⚠️ Загрузчик для реестра {name} не предусмотрен")
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# Спаны (длительность фаз), счётчики и пиковая память за прогон.
+# Один общий реестр на процесс; потоки и задачи различаются метками (registry=...).
+# Отчёт — JSON и текстовый файл в формате Prometheus (для textfile collector node_exporter).
+
+METRICS_DIR = os.environ.get("GOVKZ_METRICS_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics")
+PREFIX = "govkz"
+
+
+def label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт килобайты, macOS — байты
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = datetime.now()
+            self.spans = defaultdict(list)
+            self.counters = defaultdict(int)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def observe(self, name, seconds, **labels):
+        with self.lock:
+            self.spans[(name, label_key(labels))].append(seconds)
+
+    def count(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[(name, label_key(labels))] += value
+
+    def snapshot(self, **match):
+        # match — фильтр по меткам, например registry="sanctions"; метрики без такой метки
+        # (запуск Chrome из общего пула) попадают в отчёт любой задачи
+        wanted = dict(label_key(match))
+
+        def matches(labels):
+            labels = dict(labels)
+            return all(labels.get(k, v) == v for k, v in wanted.items())
+
+        with self.lock:
+            spans = [
+                {"span": name, "labels": dict(labels), "count": len(values),
+                 "total": round(sum(values), 4), "max": round(max(values), 4)}
+                for (name, labels), values in self.spans.items()
+                if matches(labels)
+            ]
+            counters = [
+                {"counter": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self.counters.items()
+                if matches(labels)
+            ]
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "spans": spans,
+            "counters": counters,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def write_report(self, job, directory=None, **match):
+        directory = directory or METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        report = self.snapshot(**match)
+        report["job"] = job
+
+        json_path = os.path.join(directory, f"{job}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        prom_path = os.path.join(directory, f"{job}.prom")
+        tmp_path = prom_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(prometheus_text(job, report))
+        # Атомарная замена — коллектор не должен прочитать недописанный файл
+        os.replace(tmp_path, prom_path)
+
+        print_summary(job, report)
+        return report
+
+
+def prom_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prom_labels(job, labels):
+    items = [("job", job)] + sorted(labels.items())
+    return "{" + ",".join(f'{k}="{prom_value(v)}"' for k, v in items) + "}"
+
+
+def prometheus_text(job, report):
+    lines = [
+        f"# HELP {PREFIX}_span_seconds Длительность фаз прогона",
+        f"# TYPE {PREFIX}_span_seconds summary",
+    ]
+    for span in report["spans"]:
+        labels = prom_labels(job, dict(span["labels"], span=span["span"]))
+        lines.append(f"{PREFIX}_span_seconds_sum{labels} {span['total']}")
+        lines.append(f"{PREFIX}_span_seconds_count{labels} {span['count']}")
+    lines += [
+        f"# HELP {PREFIX}_events_total Счётчики прогона",
+        f"# TYPE {PREFIX}_events_total counter",
+    ]
+    for counter in report["counters"]:
+        labels = prom_labels(job, dict(counter["labels"], counter=counter["counter"]))
+        lines.append(f"{PREFIX}_events_total{labels} {counter['value']}")
+    if report["peak_rss_bytes"] is not None:
+        lines += [
+            f"# HELP {PREFIX}_peak_rss_bytes Пиковая память процесса",
+            f"# TYPE {PREFIX}_peak_rss_bytes gauge",
+            f"{PREFIX}_peak_rss_bytes{prom_labels(job, {})} {report['peak_rss_bytes']}",
+        ]
+    lines += [
+        f"# TYPE {PREFIX}_last_run_timestamp_seconds gauge",
+        f"{PREFIX}_last_run_timestamp_seconds{prom_labels(job, {})} {int(time.time())}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def print_summary(job, report):
+    print(f"📊 {job}: фазы")
+    for span in sorted(report["spans"], key=lambda s: -s["total"]):
+        labels = ", ".join(f"{k}={v}" for k, v in span["labels"].items())
+        print(f"  └ {span['span']} [{labels}]: {span['count']} раз, всего {span['total']} сек, макс {span['max']} сек")
+    if report["counters"]:
+        print(f"📊 {job}: счётчики")
+        for counter in report["counters"]:
+            labels = ", ".join(f"{k}={v}" for k, v in counter["labels"].items())
+            print(f"  └ {counter['counter']} [{labels}]: {counter['value']}")
+    if report["peak_rss_bytes"]:
+        print(f"📊 Пиковая память: {report['peak_rss_bytes'] // (1024 * 1024)} МБ")
+
+
+METRICS = Metrics()
+span = METRICS.span
+observe = METRICS.observe
+count = METRICS.count
+write_report = METRICS.write_report
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+
+# До уникальных ограничений в реестрах могли накопиться дубли натурального ключа.
+# Оставляем самую раннюю запись (загрузчики и раньше брали первую по id), остальные удаляем.
+NATURAL_KEYS = {
+    "IssuedLicense": ("fin_id", "current_license_number"),
+    "SuspendedLicense": ("fin_id", "license_number", "decision_number"),
+    "RevokedLicense": ("fin_id", "license_number", "decision_number"),
+}
+
+
+def drop_duplicates(apps, schema_editor):
+    for model_name, key in NATURAL_KEYS.items():
+        model = apps.get_model("fins", model_name)
+        seen, duplicates = set(), []
+        for row in model.objects.order_by("id").values_list("id", *key).iterator():
+            if row[1:] in seen:
+                duplicates.append(row[0])
+            else:
+                seen.add(row[1:])
+        for start in range(0, len(duplicates), 500):
+            model.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fins", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="issuedlicense",
+            constraint=models.UniqueConstraint(fields=["fin", "current_license_number"], name="issued_license_fin_number_uniq"),
+        ),
+        migrations.AddIndex(
+            model_name="issuedlicense",
+            index=models.Index(fields=["decision_date"], name="issued_license_decision_date"),
+        ),
+        migrations.AddIndex(
+            model_name="issuedlicense",
+            index=models.Index(fields=["organization_type", "decision_date"], name="issued_license_org_type_date"),
+        ),
+        migrations.AddConstraint(
+            model_name="suspendedlicense",
+            constraint=models.UniqueConstraint(fields=["fin", "license_number", "decision_number"], name="suspended_license_decision_uniq"),
+        ),
+        migrations.AddIndex(
+            model_name="suspendedlicense",
+            index=models.Index(fields=["decision_date"], name="suspended_license_decision_dt"),
+        ),
+        migrations.AddConstraint(
+            model_name="revokedlicense",
+            constraint=models.UniqueConstraint(fields=["fin", "license_number", "decision_number"], name="revoked_license_decision_uniq"),
+        ),
+        migrations.AddIndex(
+            model_name="revokedlicense",
+            index=models.Index(fields=["decision_date"], name="revoked_license_decision_date"),
+        ),
+    ]
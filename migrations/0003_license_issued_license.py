@@ -0,0 +1,20 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fins", "0002_license_registry_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="license",
+            name="issued_license",
+            field=models.ForeignKey(
+                blank=True, null=True, on_delete=django.db.models.deletion.CASCADE,
+                related_name="operations", to="fins.issuedlicense", verbose_name="Выданная лицензия",
+            ),
+        ),
+    ]
@@ -139,6 +139,14 @@ class IssuedLicense(models.Model):
     class Meta:
         verbose_name = "Выданная лицензия"
         verbose_name_plural = "Реестр выданных лицензий"
+        # Натуральный ключ загрузчика (loaders.load_issued_licenses) и фильтры отчётов
+        constraints = [
+            models.UniqueConstraint(fields=["fin", "current_license_number"], name="issued_license_fin_number_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["decision_date"], name="issued_license_decision_date"),
+            models.Index(fields=["organization_type", "decision_date"], name="issued_license_org_type_date"),
+        ]
 
     def __str__(self):
         return f"{self.fin} — {self.current_license_number}"
@@ -184,6 +192,12 @@ class SuspendedLicense(models.Model):
     class Meta:
         verbose_name = "Приостановленная/лишённая лицензия"
         verbose_name_plural = "Реестр приостановленных/лишённых лицензий"
+        constraints = [
+            models.UniqueConstraint(fields=["fin", "license_number", "decision_number"], name="suspended_license_decision_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["decision_date"], name="suspended_license_decision_dt"),
+        ]
 
     def __str__(self):
         return f"{self.fin} — {self.license_number}"
@@ -211,6 +225,12 @@ class RevokedLicense(models.Model):
     class Meta:
         verbose_name = "Прекратившая действие лицензия"
         verbose_name_plural = "Реестр прекращённых лицензий"
+        constraints = [
+            models.UniqueConstraint(fields=["fin", "license_number", "decision_number"], name="revoked_license_decision_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["decision_date"], name="revoked_license_decision_date"),
+        ]
 
     def __str__(self):
         return f"{self.fin} — {self.license_number}"
@@ -252,6 +272,11 @@ class OperationType(models.Model):
         verbose_name_plural = 'Вид операции для лицензирования'
 
 class License(models.Model):
+    issued_license = models.ForeignKey(
+        IssuedLicense, on_delete=models.CASCADE,
+        related_name='operations', null=True, blank=True,
+        verbose_name='Выданная лицензия'
+    )
     license_type = models.ForeignKey(LicenseType, on_delete=models.CASCADE, related_name='licenses', null=True, blank=True)
     operation_type = models.ForeignKey(OperationType, on_delete=models.SET_NULL, related_name='licenses', null=True, blank=True)
     license_name = models.CharField(max_length=200)
@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import metrics
+from browser import get_pool
+from pipeline import Pipeline, PipelineError
+from registry import REGISTRIES
+from waits import Waiter
+
+# Ночная синхронизация всех реестров одной командой: задачи идут параллельно, но браузеров
+# одновременно не больше --browsers (общий пул). Окно синхронизации задаёт самый долгий
+# реестр, а не сумма всех. У каждой задачи — таймаут на работу с браузером, повторы
+# с экспоненциальной задержкой и строка в итоговом отчёте.
+#   python orchestrator.py --browsers 3 --timeout 1800 --timeout sanctions=10800 --load
+
+# Самые долгие — первыми, чтобы они не ждали свободного браузера в конце очереди
+JOBS = ("sanctions", "issued", "insurances", "rcb", "suspended", "revoked")
+
+TIMEOUTS = {
+    "sanctions": 4 * 3600,
+    "issued": 1800,
+    "insurances": 1800,
+    "rcb": 900,
+    "suspended": 900,
+    "revoked": 900,
+}
+
+
+class JobTimeout(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, name, timeout=None, retries=2, backoff=30, extraction="browser", pipeline=None):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.extraction = extraction
+        # Общий конвейер записи в БД (см. pipeline.py) и приёмник записей этой задачи
+        self.pipeline = pipeline
+        self.sink = tagged_sink(pipeline, name) if pipeline else None
+        self.status = "pending"
+        self.attempts = 0
+        self.records = None
+        self.error = None
+        self.seconds = None
+
+    def runnable(self):
+        return self.name == "sanctions" or bool(REGISTRIES[self.name].address())
+
+    def crawl(self, driver, attempt):
+        if self.name == "sanctions":
+            import sanc
+            # Повтор продолжает с чекпоинта, а не с первой страницы; чекпоинт идёт за коммитами конвейера
+            ack = self.pipeline.after if self.pipeline else None
+            return sanc.parse_sanctions(self.extraction, resume=attempt > 1, driver=driver, sink=self.sink, ack=ack)
+        waiter = Waiter(driver, registry=self.name)
+        return REGISTRIES[self.name].crawl(driver, waiter, self.extraction)
+
+    def summary(self):
+        return {
+            "job": self.name,
+            "status": self.status,
+            "attempts": self.attempts,
+            "records": self.records,
+            "seconds": self.seconds,
+            "error": self.error,
+        }
+
+
+def discard(pool, driver):
+    try:
+        pool.discard(driver)
+    except Exception:
+        pass  # браузер уже закрыт по таймауту
+
+
+def run_attempt(job, pool, attempt):
+    driver = pool.acquire()
+    timed_out = threading.Event()
+
+    def kill():
+        # Поток задачи извне не прервать — закрываем её браузер, и она падает на ближайшей команде
+        timed_out.set()
+        print(f"⏰ {job.name}: превышен таймаут {job.timeout} сек, закрываем браузер")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    timer = threading.Timer(job.timeout, kill) if job.timeout else None
+    if timer:
+        timer.daemon = True
+        timer.start()
+    try:
+        result = job.crawl(driver, attempt)
+    except Exception as e:
+        if timer:
+            timer.cancel()
+        discard(pool, driver)
+        if timed_out.is_set():
+            raise JobTimeout(f"превышен таймаут {job.timeout} сек") from e
+        raise
+
+    if timer:
+        timer.cancel()
+    if timed_out.is_set():
+        discard(pool, driver)
+    else:
+        pool.release(driver)
+    if not result:
+        raise RuntimeError("реестр вернул пустой результат")
+    return result
+
+
+def run_job(job, pool):
+    started = time.perf_counter()
+    result = None
+    for attempt in range(1, job.retries + 2):
+        job.attempts = attempt
+        try:
+            with metrics.span("job_attempt", registry=job.name):
+                result = run_attempt(job, pool, attempt)
+            job.status, job.error = "ok", None
+            break
+        except Exception as e:
+            job.status = "timeout" if isinstance(e, JobTimeout) else "failed"
+            job.error = str(e)
+            metrics.count("job_timeouts" if job.status == "timeout" else "job_errors", registry=job.name)
+            if attempt > job.retries:
+                print(f"❌ {job.name}: все {attempt} попыток не удались: {e}")
+                break
+            delay = job.backoff * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+            metrics.count("job_retries", registry=job.name)
+            print(f"🔁 {job.name}: попытка {attempt} не удалась ({e}), повтор через {delay:.0f} сек")
+            time.sleep(delay)
+            if job.pipeline:
+                # Повтор читает чекпоинт — дожидаемся, пока писатель закоммитит страницы прошлой попытки
+                try:
+                    job.pipeline.wait()
+                except PipelineError as e:
+                    job.status, job.error = "load_failed", str(e)
+                    break
+
+    if job.status == "ok":
+        # Санкции отдают число записей (сами пишут JSON Lines), реестры — список записей
+        job.records = result if isinstance(result, int) else len(result)
+        if job.sink and isinstance(result, list):
+            # Браузер уже в пуле, записи пишет поток-писатель — поток задачи свободен для следующей
+            try:
+                job.sink(result)
+            except PipelineError as e:
+                job.status, job.error = "load_failed", str(e)
+
+    job.seconds = round(time.perf_counter() - started, 1)
+    metrics.count("jobs", registry=job.name, status=job.status)
+    print(f"{'✅' if job.status == 'ok' else '❌'} {job.name}: {job.status}, записей {job.records}, {job.seconds} сек, попыток {job.attempts}")
+    return job
+
+
+class BatchLoader:
+    # В пачке записи разных реестров — каждый реестр своим загрузчиком, в порядке поступления.
+    # Загрузчик санкций один на прогон (как в sanc.sanctions_pipeline): справочники и найденные
+    # Fin не перечитываются на каждой пачке
+    def __init__(self):
+        self.sanctions = None
+
+    def __call__(self, batch):
+        from loaders import SanctionsLoader, load_registry
+        groups = {}
+        for name, record in batch:
+            groups.setdefault(name, []).append(record)
+        for name, records in groups.items():
+            if name == "sanctions":
+                self.sanctions = self.sanctions or SanctionsLoader()
+                self.sanctions(records)
+            else:
+                load_registry(name, records)
+
+
+def tagged_sink(pipeline, name):
+    return lambda records: pipeline.put_many((name, record) for record in records)
+
+
+def run_all(names=None, browsers=2, timeouts=None, retries=2, backoff=30, extraction="browser", load=False):
+    timeouts = dict(TIMEOUTS, **(timeouts or {}))
+    pipeline = Pipeline(BatchLoader(), name="orchestrator") if load else None
+    jobs = [
+        Job(name, timeouts.get(name), retries, backoff, extraction, pipeline)
+        for name in (names or JOBS)
+    ]
+    runnable = []
+    for job in jobs:
+        if job.runnable():
+            runnable.append(job)
+        else:
+            job.status = "skipped"
+            print(f"⚠️ Для реестра {job.name} не задан адрес, пропускаем")
+
+    started = datetime.now()
+    print(f"🧵 Задач: {len(runnable)}, браузеров: {browsers}")
+    # Потоков столько же, сколько браузеров: задача держит один браузер на всё время обхода
+    pool = get_pool(size=browsers)
+    if pipeline:
+        pipeline.start()
+    try:
+        with ThreadPoolExecutor(max_workers=browsers, thread_name_prefix="registry") as executor:
+            list(executor.map(lambda job: run_job(job, pool), runnable))
+    finally:
+        if pipeline:
+            try:
+                pipeline.close()
+            except PipelineError as e:
+                for job in runnable:
+                    if job.sink and job.status == "ok":
+                        job.status, job.error = "load_failed", str(e)
+
+    report = {
+        "started_at": started.isoformat(timespec="seconds"),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "seconds": round((datetime.now() - started).total_seconds(), 1),
+        "browsers": browsers,
+        "jobs": [job.summary() for job in jobs],
+    }
+    write_summary(report)
+    metrics.write_report("orchestrator")
+    return report
+
+
+def write_summary(report, directory=None):
+    directory = directory or metrics.METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "orchestrator-summary.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"📋 Итог синхронизации за {report['seconds']} сек:")
+    for job in report["jobs"]:
+        mark = {"ok": "✅", "skipped": "⏭️"}.get(job["status"], "❌")
+        print(f"  {mark} {job['job']}: {job['status']}, записей {job['records']}, {job['seconds']} сек, попыток {job['attempts']}"
+              + (f" — {job['error']}" if job["error"] else ""))
+    print(f"💾 Отчёт: {path}")
+
+
+def parse_timeouts(values):
+    # --timeout 1800 — для всех задач, --timeout sanctions=10800 — для одной
+    timeouts = {}
+    # Общий таймаут — первым, чтобы не перетереть заданные для отдельных задач
+    for value in sorted(values or [], key=lambda v: "=" in v):
+        name, _, seconds = value.rpartition("=")
+        if name:
+            timeouts[name] = float(seconds)
+        else:
+            timeouts.update(dict.fromkeys(JOBS, float(seconds)))
+    return timeouts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Параллельная синхронизация всех реестров gov.kz")
+    parser.add_argument("jobs", nargs="*", help=f"задачи: {', '.join(JOBS)}")
+    parser.add_argument("--browsers", type=int, default=2, help="не больше N браузеров одновременно")
+    parser.add_argument("--timeout", action="append", help="таймаут, сек: 1800 или sanctions=10800")
+    parser.add_argument("--retries", type=int, default=2, help="повторов после неудачной попытки")
+    parser.add_argument("--backoff", type=float, default=30, help="задержка перед первым повтором, сек (дальше удваивается)")
+    parser.add_argument("--extraction", choices=("browser", "soup"), default="browser")
+    parser.add_argument("--load", action="store_true", help="загрузить записи в БД")
+    args = parser.parse_args()
+    unknown = set(args.jobs) - set(JOBS)
+    if unknown:
+        parser.error(f"неизвестные задачи: {', '.join(sorted(unknown))}")
+
+    report = run_all(args.jobs or None, args.browsers, parse_timeouts(args.timeout), args.retries, args.backoff, args.extraction, args.load)
+    sys.exit(0 if all(job["status"] in ("ok", "skipped") for job in report["jobs"]) else 1)
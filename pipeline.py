@@ -0,0 +1,138 @@
+import sys
+import time
+import queue
+import threading
+
+import metrics
+
+# Конвейер «парсер → БД»: парсер кладёт записи в ограниченную очередь и сразу идёт дальше
+# (следующая страница, следующий реестр), поток-писатель собирает их в пачки и пишет
+# каждую пачку одним вызовом write (загрузчики из loaders — каждый в своей транзакции).
+# Очередь полна — парсер ждёт (backpressure, память не растёт); писатель упал — ошибка
+# всплывает у парсера на ближайшем put и при закрытии конвейера.
+# after(callback) — метка в очереди: писатель вызовет callback, когда всё, что положили до неё,
+# закоммичено (чекпоинты парсера двигаются только за БД); wait() — то же с ожиданием.
+#   with Pipeline(load_issued_licenses) as pipeline:
+#       extract_excel_from_govkz(sink=pipeline.put_many)
+
+SENTINEL = object()
+
+
+class PipelineError(Exception):
+    pass
+
+
+class Ack:
+    def __init__(self, callback):
+        self.callback = callback
+
+
+def close_connection():
+    # У Django своё соединение на каждый поток — писатель закрывает своё за собой
+    if "django.db" in sys.modules:
+        from django.db import connection
+        connection.close()
+
+
+class Pipeline:
+    def __init__(self, write, batch_size=200, maxsize=2000, flush_interval=2.0, name="pipeline"):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self.written = 0
+        self.thread = threading.Thread(target=self.run, name=f"{name}-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        # Что парсер успел отдать, дописываем и при его ошибке; ошибка парсера важнее ошибки писателя
+        try:
+            self.close()
+        except PipelineError:
+            if exc_type is None:
+                raise
+        return False
+
+    def put(self, item):
+        started = None
+        while True:
+            self.check()
+            try:
+                self.queue.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                started = started or time.perf_counter()
+        if started:
+            metrics.observe("queue_wait", time.perf_counter() - started, pipeline=self.name)
+
+    def put_many(self, items):
+        for item in items:
+            self.put(item)
+
+    def after(self, callback):
+        self.put(Ack(callback))
+
+    def wait(self):
+        done = threading.Event()
+        self.after(done.set)
+        while not done.wait(0.5):
+            self.check()
+
+    def check(self):
+        if self.error is not None:
+            raise PipelineError(f"запись в БД прервана: {self.error}") from self.error
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(SENTINEL)
+            self.thread.join()
+        self.check()
+        return self.written
+
+    def run(self):
+        batch = []
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    # Парсер задумался (клики, пагинация) — не держим готовую пачку
+                    item = None
+                if item is SENTINEL:
+                    break
+                if isinstance(item, Ack):
+                    if batch:
+                        self.flush(batch)
+                        batch = []
+                    item.callback()
+                    continue
+                if item is not None:
+                    batch.append(item)
+                if batch and (len(batch) >= self.batch_size or item is None):
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+        except Exception as e:
+            self.error = e
+            print(f"❌ {self.name}: ошибка записи в БД: {e}")
+            # Дальше только разгружаем очередь, чтобы парсер не висел на полной очереди до check()
+            while self.queue.get() is not SENTINEL:
+                pass
+        finally:
+            close_connection()
+
+    def flush(self, batch):
+        with metrics.span("pipeline_write", pipeline=self.name):
+            self.write(batch)
+        self.written += len(batch)
+        metrics.count("pipeline_batches", pipeline=self.name)
+        metrics.count("pipeline_records", len(batch), pipeline=self.name)
@@ -0,0 +1,90 @@
+import os
+import io
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Опциональное профилирование стадий (--profile у точек входа): на каждую стадию —
+# cProfile (<stage>.pstats + текстовый топ) и tracemalloc (топ выделений памяти и пик).
+# Файлы стадии нумеруются по порядку запуска (01-extract, 02-load, 03-extract ...), так что
+# повторная стадия не затирает предыдущую. Вместе с --from-snapshot даёт воспроизводимые
+# профили разбора без Chrome.
+#   python -m pstats profiles/issued-.../01-extract.pstats
+
+PROFILE_DIR = os.environ.get("GOVKZ_PROFILE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+TOP = 40
+
+
+class Profiler:
+    def __init__(self):
+        self.directory = None
+        # tracemalloc общий на процесс — одновременно профилируется только одна стадия
+        self.active = threading.Lock()
+        self.sequence = 0
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def enable(self, job, root=None):
+        self.directory = os.path.join(root or PROFILE_DIR, f"{job}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        os.makedirs(self.directory, exist_ok=True)
+        print(f"🔬 Профилирование включено: {self.directory}")
+        return self.directory
+
+    @contextmanager
+    def stage(self, name):
+        # Пока идёт одна стадия, остальные (вложенные и из других потоков) не профилируются:
+        # reset_peak и stop у tracemalloc сбили бы её пик и трассировку
+        if not self.enabled or not self.active.acquire(blocking=False):
+            yield
+            return
+
+        self.sequence += 1
+        name = f"{self.sequence:02d}-{name}"
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(25)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                self.write(name, profile, before, after, peak)
+            finally:
+                self.active.release()
+
+    def write(self, name, profile, before, after, peak):
+        base = os.path.join(self.directory, name)
+        profile.dump_stats(base + ".pstats")
+
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(TOP)
+        with open(base + "-cpu.txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+        # Чистый прирост памяти за стадию по строкам кода — без тракинга самого tracemalloc
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+        diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        with open(base + "-alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"Пик за стадию: {peak / (1024 * 1024):.1f} МБ\n\n")
+            for stat in diff[:TOP]:
+                f.write(f"{stat}\n")
+
+        print(f"🔬 Стадия {name}: {base}.pstats, пик памяти {peak / (1024 * 1024):.1f} МБ")
+
+
+PROFILER = Profiler()
+enable = PROFILER.enable
+stage = PROFILER.stage
@@ -1,120 +1,115 @@
-import os
-import time
 import json
-from datetime import datetime
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-def parse_rcb_from_govkz():
-    start_time = datetime.now()
+import argparse
+
+import metrics
+import profiling
+from browser import driver_session
+from browser_extract import extract_rcb
+from html_backend import map_cards
+from registry import open_registry, expand_page
+from snapshots import save_snapshot, load_snapshot
+from waits import Waiter
+
+URL = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/3/registry/29?lang=ru"
+
+
+def block_pairs(block):
+    pairs = []
+    for row in block.select("tr"):
+        key_cell = row.select_one("th")
+        val_cell = row.select_one("td")
+        if key_cell and val_cell:
+            pairs.append((key_cell.get_text(strip=True), val_cell.get_text(strip=True)))
+    return pairs
+
+
+def build_license(pairs):
+    license_data = {}
+    for key, val in pairs:
+        license_data[key] = val
+    return license_data
+
+
+def html_block_pairs(html, backend=None, workers=None):
+    return map_cards(html, "rcb", '.collapse__content__card', block_pairs, backend=backend, workers=workers)
+
+
+def build_licenses(block_pairs_list):
+    print(f"📦 Найдено блоков лицензий: {len(block_pairs_list)}")
+
+    all_licenses = []
+
+    for i, pairs in enumerate(block_pairs_list):
+        print(f"  └ Блок {i + 1}: {len(pairs)} строк")
+        license_data = build_license(pairs)
+        if license_data:
+            all_licenses.append(license_data)
+
+    print(f"✅ Всего лицензий собрано: {len(all_licenses)}")
+    return all_licenses
+
+
+def parse_rcb_from_snapshot(ref=None):
+    # Повторный разбор сохранённого снимка, без Chrome
+    html = load_snapshot("rcb", ref)
+    with profiling.stage("extract"):
+        all_licenses = extract_from_html(html)
+    print(json.dumps(all_licenses, ensure_ascii=False, indent=2))
+    return all_licenses
+
+
+def extract_from_html(html, backend=None, workers=None):
+    print("📄 Парсинг HTML через BeautifulSoup")
+    return build_licenses(html_block_pairs(html, backend, workers))
+
+
+def extract_page(driver, extraction="browser", snapshot=False):
+    # Карточки уже раскрытой страницы (см. registry.expand_page)
+    if extraction == "browser":
+        print("📄 Извлечение карточек в браузере")
+        with metrics.span("extract_browser", registry="rcb"):
+            all_licenses = build_licenses([card["pairs"] for card in extract_rcb(driver)])
+        if snapshot:
+            save_snapshot("rcb", driver.page_source)
+        return all_licenses
+
+    with metrics.span("page_source", registry="rcb"):
+        html_source = driver.page_source
+    save_snapshot("rcb", html_source)
+    with metrics.span("parse", registry="rcb"):
+        return extract_from_html(html_source)
+
+
+def parse_rcb_from_govkz(extraction="browser", snapshot=False, driver=None):
     try:
-        print("🚀 Инициализация Chrome...")
-        options = Options()
-        # options.add_argument('--headless=new')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--window-size=1920,1080')
-
-        import chromedriver_autoinstaller
-        chromedriver_autoinstaller.install()
-        driver = webdriver.Chrome(options=options)
-
-        try:
-            url = "https://www.gov.kz/memleket/entities/ardfm/permissions-notifications/section/1/subsection/3/registry/29?lang=ru"
-            print(f"🌐 Переход по ссылке: {url}")
-            driver.get(url)
-            time.sleep(20)
-
-            print("🔘 Пробуем нажать кнопку cookies...")
-            try:
-                btn = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"))
-                )
-                btn.click()
-                print("✅ Cookie-кнопка нажата")
-            except Exception:
-                print("⚠️ Cookie-кнопка не найдена или уже скрыта")
-
-            print("🔽 Раскрытие основных блоков...")
-            main_buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse__header")
-            print(f"🔹 Найдено {len(main_buttons)} верхних блоков")
-            for btn in main_buttons:
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                    btn.click()
-                    time.sleep(0.2)
-                except:
-                    print("⚠️ Ошибка при клике на основной блок")
-
-            content_divs = driver.find_elements(By.CSS_SELECTOR, ".collapse__content")
-            print(f"🔍 Проверка внутренних секций в {len(content_divs)} блоках")
-            for content_div in content_divs:
-                inner_arrows = content_div.find_elements(By.CSS_SELECTOR, ".anticon-right.ant-collapse-arrow")
-                if inner_arrows:
-                    print(f"🔸 Найдено {len(inner_arrows)} внутренних стрелок")
-                    for j, arrow in enumerate(inner_arrows):
-                        try:
-                            driver.execute_script("arguments[0].scrollIntoView(true);", arrow)
-                            time.sleep(1)
-                            driver.execute_script("arguments[0].click();", arrow)
-                            time.sleep(2)
-                        except:
-                            print(f"⚠️ Ошибка при раскрытии вложенного блока {j}")
-
-            print("🧩 Принудительное раскрытие через JS")
-            driver.execute_script("""
-            document.querySelectorAll('.ant-collapse-item').forEach(item => {
-                item.classList.add('ant-collapse-item-active');
-            });
-            document.querySelectorAll('.ant-collapse-content').forEach(content => {
-                content.classList.remove('ant-collapse-content-inactive');
-                content.classList.add('ant-collapse-content-active');
-                content.style.display = 'block';
-                content.style.height = 'auto';
-            });
-            """)
-            time.sleep(1)
-
-            html_source = driver.page_source
-            html_path = os.path.join(os.path.dirname(__file__), "govkz_issued_page.html")
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(html_source)
-            print(f"💾 HTML сохранён: {html_path}")
-
-            print("📄 Парсинг HTML через BeautifulSoup")
-            soup = BeautifulSoup(html_source, "html.parser")
-            license_blocks = soup.select('.collapse__content__card')
-            print(f"📦 Найдено блоков лицензий: {len(license_blocks)}")
-
-            all_licenses = []
-
-            for i, block in enumerate(license_blocks):
-                license_data = {}
-                rows = block.select("tr")
-                print(f"  └ Блок {i + 1}: {len(rows)} строк")
-                for row in rows:
-                    key_cell = row.select_one("th")
-                    val_cell = row.select_one("td")
-                    if key_cell and val_cell:
-                        key = key_cell.get_text(strip=True)
-                        val = val_cell.get_text(strip=True)
-                        license_data[key] = val
-                if license_data:
-                    all_licenses.append(license_data)
-
-            print(f"✅ Всего лицензий собрано: {len(all_licenses)}")
+        with driver_session(driver) as driver:
+            waiter = Waiter(driver, registry="rcb")
+            open_registry(driver, waiter, URL)
+            expand_page(driver, waiter)
+            with profiling.stage("extract"):
+                all_licenses = extract_page(driver, extraction, snapshot)
+            metrics.count("records", len(all_licenses), registry="rcb")
             print(json.dumps(all_licenses, ensure_ascii=False, indent=2))
             return all_licenses
 
-        finally:
-            driver.quit()
-            print("🧹 Chrome закрыт")
-
     except Exception as e:
+        metrics.count("errors", registry="rcb")
         print(f"❌ Ошибка при выполнении парсера: {e}")
+    finally:
+        metrics.write_report("rcb", registry="rcb")
+
 
 if __name__ == "__main__":
-    parse_rcb_from_govkz()
+    parser = argparse.ArgumentParser(description="Парсер реестра 29 gov.kz")
+    parser.add_argument("--from-snapshot", nargs="?", const="latest", help="разобрать сохранённый снимок вместо Chrome")
+    parser.add_argument("--snapshot", action="store_true", help="сохранить снимок страницы и в режиме браузерного извлечения")
+    parser.add_argument("--extraction", choices=("browser", "soup"), default="browser")
+    parser.add_argument("--profile", action="store_true", help="профилировать разбор и загрузку (cProfile + tracemalloc)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable("rcb")
+    if args.from_snapshot:
+        parse_rcb_from_snapshot(args.from_snapshot)
+    else:
+        parse_rcb_from_govkz(args.extraction, args.snapshot)
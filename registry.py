@@ -0,0 +1,306 @@
+import os
+import sys
+import json
+import argparse
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+import metrics
+from browser import get_pool
+from browser_extract import extract_generic
+from html_backend import map_cards
+from schema import Schema, Field
+from snapshots import save_snapshot, load_snapshot
+from waits import Waiter, present, collapse_open, all_collapse_open, dom_quiet
+
+# Общий движок для реестров gov.kz с раскрывающимися карточками: один проход
+# по всем реестрам в одной сессии Chrome, отличаются они только спекой.
+
+FORCE_OPEN_JS = """
+document.querySelectorAll('.ant-collapse-item').forEach(item => {
+    item.classList.add('ant-collapse-item-active');
+});
+document.querySelectorAll('.ant-collapse-content').forEach(content => {
+    content.classList.remove('ant-collapse-content-inactive');
+    content.classList.add('ant-collapse-content-active');
+    content.style.display = 'block';
+    content.style.height = 'auto';
+});
+"""
+
+
+def open_registry(driver, waiter, url):
+    print(f"🌐 Переход по ссылке: {url}")
+    with metrics.span("page_get", registry=waiter.registry):
+        driver.get(url)
+        waiter.page_ready()
+        waiter.until("present", present(".collapse__header"))
+
+    # Баннер cookies есть не на всех страницах — без ожидания, только если уже показан
+    for btn in driver.find_elements(By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"):
+        try:
+            btn.click()
+            print("✅ Cookie-кнопка нажата")
+        except Exception:
+            pass
+
+
+def expand_page(driver, waiter):
+    with metrics.span("expand", registry=waiter.registry):
+        expand_blocks(driver, waiter)
+
+
+def expand_blocks(driver, waiter):
+    registry = waiter.registry
+
+    # 1) раскрываем все основные блоки
+    main_buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse__header")
+    print(f"🔹 Найдено {len(main_buttons)} верхних блоков")
+    metrics.count("blocks", len(main_buttons), registry=registry)
+    for btn in main_buttons:
+        try:
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
+            btn.click()
+        except Exception:
+            # Перекрыт другим элементом — кликаем из JS
+            try:
+                driver.execute_script("arguments[0].click();", btn)
+                metrics.count("clicks_js_fallback", registry=registry)
+            except Exception:
+                metrics.count("clicks_failed", registry=registry)
+                print("⚠️ Ошибка при клике на основной блок")
+    waiter.settle()
+
+    # 2) раскрываем все вложенные секции Ant-Design
+    content_divs = driver.find_elements(By.CSS_SELECTOR, ".collapse__content")
+    for content_div in content_divs:
+        inner_arrows = content_div.find_elements(By.CSS_SELECTOR, ".anticon-right.ant-collapse-arrow")
+        if inner_arrows:
+            print(f"🔸 Найдено {len(inner_arrows)} внутренних секций")
+            metrics.count("inner_sections", len(inner_arrows), registry=registry)
+            for j, arrow in enumerate(inner_arrows):
+                try:
+                    driver.execute_script("arguments[0].scrollIntoView(true);", arrow)
+                    driver.execute_script("arguments[0].click();", arrow)
+                    waiter.until("collapse_open", collapse_open(arrow))
+                except Exception:
+                    metrics.count("clicks_failed", registry=registry)
+                    print(f"⚠️ Ошибка при раскрытии вложенного блока {j}")
+
+    # 3) принудительно раскрываем всё, что осталось свёрнутым
+    driver.execute_script(FORCE_OPEN_JS)
+    waiter.until("all_collapse_open", all_collapse_open())
+    waiter.until("dom_quiet", dom_quiet())
+
+
+def generic_block_pairs(block):
+    pairs = []
+    for row in block.select("tr"):
+        key_cell = row.select_one("th")
+        val_cell = row.select_one("td")
+        if key_cell and val_cell:
+            pairs.append((key_cell.get_text(strip=True), val_cell.get_text(strip=True)))
+            continue
+        cells = row.select("td")
+        if len(cells) == 2:
+            pairs.append((cells[0].get_text(strip=True), cells[1].get_text(strip=True)))
+    return pairs
+
+
+def generic_block_name(block):
+    parent = block.find_parent(class_="collapse")
+    name_div = parent.select_one(".collapse__value") if parent else None
+    return name_div.get_text(strip=True) if name_div else None
+
+
+def generic_card(block):
+    return {"name": generic_block_name(block), "pairs": generic_block_pairs(block)}
+
+
+class RegistrySpec:
+    # name — ключ реестра (он же имя в хранилище снимков), url, селектор карточки и
+    # схема полей (см. schema.py).
+    # Реестры со своими парсерами передают module — модуль с URL, extract_page и extract_from_html.
+    # experimental — адрес и метки схемы не сверены с настоящей страницей: обход идёт только
+    # с явно заданным адресом и всегда сохраняет снимок, чтобы схему было по чему проверить.
+
+    def __init__(self, name, url, schema=None, block_selector=".collapse__content__card", module=None, experimental=False):
+        self.name = name
+        self.url = url
+        self.schema = schema
+        self.block_selector = block_selector
+        self.module = module
+        self.experimental = experimental
+
+    def parser(self):
+        return __import__(self.module) if self.module else None
+
+    def address(self):
+        parser = self.parser()
+        return self.url or (parser.URL if parser else None)
+
+    def build_record(self, pairs, name=None):
+        record = self.schema.empty()
+        if name:
+            record["name"] = name
+        return self.schema.build(pairs, record)
+
+    def extract_page(self, driver, extraction="browser", snapshot=False):
+        parser = self.parser()
+        if parser:
+            return parser.extract_page(driver, extraction, snapshot)
+
+        if extraction == "browser":
+            with metrics.span("extract_browser", registry=self.name):
+                records = [self.build_record(card["pairs"], card["name"]) for card in extract_generic(driver, self.block_selector)]
+            if snapshot:
+                save_snapshot(self.name, driver.page_source)
+            return records
+
+        with metrics.span("page_source", registry=self.name):
+            html = driver.page_source
+        save_snapshot(self.name, html)
+        with metrics.span("parse", registry=self.name):
+            return self.extract_from_html(html)
+
+    def check_schema(self, html):
+        # Сверка схемы со страницей: метки, которые не попали ни в одно поле, и поля без меток
+        cards = map_cards(html, self.name, self.block_selector, generic_card, "collapse")
+        labels = {label for card in cards for label, _ in card["pairs"]}
+        matched = {self.schema.resolve(label) for label in labels}
+        unknown = sorted(label for label in labels if self.schema.resolve(label) is None)
+        missing = [field.name for field in self.schema.fields if field not in matched]
+        return len(cards), unknown, missing
+
+    def extract_from_html(self, html, backend=None, workers=None):
+        parser = self.parser()
+        if parser:
+            return parser.extract_from_html(html, backend, workers)
+        cards = map_cards(html, self.name, self.block_selector, generic_card, "collapse", backend, workers)
+        return [self.build_record(card["pairs"], card["name"]) for card in cards]
+
+    def crawl(self, driver, waiter, extraction="browser", snapshot=False):
+        if self.experimental:
+            print(f"⚠️ Реестр {self.name} экспериментальный: метки схемы не сверены со страницей, сохраняем снимок")
+            snapshot = True
+        open_registry(driver, waiter, self.address())
+        expand_page(driver, waiter)
+        return self.extract_page(driver, extraction, snapshot)
+
+
+REGISTRIES = {
+    "rcb": RegistrySpec("rcb", None, module="rcb"),
+    "issued": RegistrySpec("issued", None, module="issued_parser"),
+    "insurances": RegistrySpec("insurances", None, module="issued_insurances_parser"),
+    # Реестры приостановленных и прекративших действие лицензий — экспериментальные: адресов
+    # по умолчанию нет (только GOVKZ_SUSPENDED_URL / GOVKZ_REVOKED_URL), а метки схем
+    # («Тип приостановления», «Основание», «Валют» ...) — предположение по соседним реестрам,
+    # с настоящей страницей их не сверяли. Без адреса crawl_registries и оркестратор их пропускают.
+    # Сверить: обойти с адресом (снимок сохранится) и python registry.py --check <реестр>
+    "suspended": RegistrySpec(
+        "suspended",
+        os.environ.get("GOVKZ_SUSPENDED_URL"),
+        schema=Schema([
+            Field("bin", "БИН"),
+            Field("license_number", "Номер лицензии"),
+            Field("license_issue_date", "Дата выдачи лицензии"),
+            Field("suspension_type", "Тип приостановления"),
+            Field("decision_number", "Номер решения"),
+            Field("decision_date", "Дата решения"),
+            Field("suspension_reason", "Основание"),
+            Field("currency", "Валют"),
+        ], fill=True),
+        experimental=True,
+    ),
+    "revoked": RegistrySpec(
+        "revoked",
+        os.environ.get("GOVKZ_REVOKED_URL"),
+        schema=Schema([
+            Field("bin", "БИН"),
+            Field("decision_number", "Номер решения"),
+            Field("decision_date", "Дата решения"),
+            Field("license_number", "Номер лицензии"),
+            Field("license_issue_date", "Дата выдачи лицензии"),
+            Field("activity_type", "Вид деятельности"),
+            Field("currency", "Валют"),
+        ], fill=True),
+        experimental=True,
+    ),
+}
+
+
+def crawl_registries(names=None, extraction="browser", snapshot=False, driver=None):
+    # Все реестры за один проход в одной сессии браузера. После WebDriverException сессия
+    # могла умереть вместе с Chrome — следующий реестр идёт в новой сессии из пула.
+    # Переданный снаружи драйвер не наш: его не заменить, и обход на нём останавливается
+    results = {}
+    pool = None if driver is not None else get_pool()
+    driver = driver or pool.acquire()
+    try:
+        waiter = Waiter(driver)
+        for name in names or REGISTRIES:
+            spec = REGISTRIES[name]
+            if not spec.address():
+                print(f"⚠️ Для реестра {name} не задан адрес, пропускаем")
+                continue
+            waiter.registry = name
+            try:
+                results[name] = spec.crawl(driver, waiter, extraction, snapshot)
+                metrics.count("records", len(results[name]), registry=name)
+                print(f"✅ {name}: {len(results[name])} записей")
+            except WebDriverException as e:
+                metrics.count("errors", registry=name)
+                print(f"❌ Ошибка браузера на реестре {name}: {e}")
+                if pool is None:
+                    print("⚠️ Драйвер передан снаружи, остальные реестры пропускаем")
+                    break
+                try:
+                    pool.discard(driver)
+                except Exception:
+                    pass  # браузер уже закрыт
+                driver = None
+                metrics.count("driver_restarts", registry=name)
+                driver = pool.acquire()
+                waiter = Waiter(driver)
+            except Exception as e:
+                metrics.count("errors", registry=name)
+                print(f"❌ Ошибка при обходе реестра {name}: {e}")
+    finally:
+        if pool and driver is not None:
+            pool.release(driver)
+    metrics.write_report("registries")
+    return results
+
+
+def parse_from_snapshot(name, ref=None):
+    return REGISTRIES[name].extract_from_html(load_snapshot(name, ref))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Обход реестров лицензий gov.kz за один проход")
+    parser.add_argument("registries", nargs="*", help=f"реестры: {', '.join(REGISTRIES)}")
+    parser.add_argument("--extraction", choices=("browser", "soup"), default="browser")
+    parser.add_argument("--snapshot", action="store_true", help="сохранить снимки страниц")
+    parser.add_argument("--load", action="store_true", help="загрузить записи в БД")
+    parser.add_argument("--check", action="store_true", help="сверить схему с последним снимком реестра вместо обхода")
+    args = parser.parse_args()
+
+    if args.check:
+        failed = False
+        for name in args.registries or [n for n, spec in REGISTRIES.items() if spec.schema]:
+            cards, unknown, missing = REGISTRIES[name].check_schema(load_snapshot(name))
+            failed = failed or not cards or bool(unknown or missing)
+            print(f"{'✅' if cards and not (unknown or missing) else '❌'} {name}: карточек {cards}")
+            for label in unknown:
+                print(f"  └ метка без поля: {label}")
+            for field in missing:
+                print(f"  └ поле без метки: {field}")
+        sys.exit(1 if failed else 0)
+
+    data = crawl_registries(args.registries or None, args.extraction, args.snapshot)
+    if args.load:
+        from loaders import load_registry
+        for name, records in data.items():
+            load_registry(name, records)
+    print(json.dumps(data, ensure_ascii=False, indent=2, default=str))
@@ -1,195 +1,627 @@
 import time
 import os
-import shutil
-import tempfile
 import json
-from datetime import datetime
+import argparse
+import contextlib
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import ElementClickInterceptedException
 
-# from sanctions.models import RegulatoryDecision, ViolationType, SanctionType, Department
-# from fins.models import Fin
+import metrics
+import profiling
+from browser import get_pool, driver_session
+from browser_extract import extract_sanctions
+from html_backend import map_cards
+from pipeline import Pipeline
+from schema import Schema, Field, to_iso_date
+from snapshots import save_snapshot, load_snapshot, latest_run
+from waits import Waiter, present, text_changed, dom_quiet
+
+URL = "https://www.gov.kz/memleket/entities/ardfm/sanctions?lang=ru"
+OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "sanctions.json")
+STATE_PATH = os.path.join(os.path.dirname(__file__), "sanctions_state.json")
+STREAM_PATH = os.path.join(os.path.dirname(__file__), "sanctions.jsonl")
+CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), "sanctions_checkpoint.json")
 
 def get_text_or_none(parent, class_name):
     tag = parent.select_one(class_name)
     return tag.get_text(strip=True) if tag else None
 
-def parse_sanctions():
-    start = time.time()
-    tmp_profile = tempfile.mkdtemp()
+def header_pairs(block):
+    pairs = []
+    for row in block.select(".collapse__header__title--html .row"):
+        k = get_text_or_none(row, ".col-md-4")
+        v = get_text_or_none(row, ".col-md-8")
+        if not k or not v:
+            continue
+        pairs.append((k, v))
+    return pairs
+
+def detail_pairs(block):
+    pairs = []
+    for row in block.select(".collapse__content__card .row"):
+        label = get_text_or_none(row, ".typography__variant-bodyhl")
+        value = get_text_or_none(row, ".typography__variant-body")
+        if not label:
+            continue
+        pairs.append((label, value))
+    return pairs
+
+HEADER_SCHEMA = Schema([
+    Field("bin", "БИН"),
+    Field("organization", "Наименование организации"),
+    Field("decision_date", "Дата решения", convert=to_iso_date),
+    Field("decision_number", "Номер принятия"),
+], fill=True)
+
+DETAIL_SCHEMA = Schema([
+    Field("violation_type", "Вид взыскания"),
+    Field("sanction_type", "Тип взыскания"),
+    Field("sanction_amount", "Наложенное взыскание"),
+    Field("responsible_body", "Существо нарушения"),
+    Field("execution_deadline", "Срок исполнения", convert=to_iso_date),
+    Field("npa_article", "Статья"),
+    Field("note", "Примечание"),
+    Field("npa_type", "Тип НПА"),
+    Field("department", "Наименование департамента"),
+], fill=True)
+
 
-    options = Options()
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    # options.add_argument('--headless')  # можно вернуть, когда всё отладите
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument(f'--user-data-dir={tmp_profile}')
+def build_item(header, details):
+    item = HEADER_SCHEMA.empty()
+    item.update(DETAIL_SCHEMA.empty())
+    HEADER_SCHEMA.build(header, item)
+    return DETAIL_SCHEMA.build(details, item)
 
-    service = Service("chromedriver.exe")
-    driver = webdriver.Chrome(service=service, options=options)
+def open_sanctions(driver, waiter):
+    with metrics.span("page_get", registry="sanctions"):
+        driver.get(URL)
+        waiter.page_ready()
 
+    # Опционально: закрыть баннер куки
     try:
-        driver.get("https://www.gov.kz/memleket/entities/ardfm/sanctions?lang=ru")
-        time.sleep(1)
+        btn = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"))
+        )
+        btn.click()
+    except Exception:
+        pass
 
-        # Опционально: закрыть баннер куки
-        try:
-            btn = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button#onetrust-accept-btn-handler"))
-            )
-            btn.click()
-        except Exception:
-            pass
-
-        current_page = driver.find_element(
-            By.CSS_SELECTOR, "li.ant-pagination-item-active"
-        ).text
-        
-        all_results = []
-        while True:
-            from selenium.common.exceptions import ElementClickInterceptedException, NoSuchElementException
-
-            # Ждём появления хотя бы одного заголовка
-            WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".collapse-group button.collapse__header"))
-            )
+def active_page(driver):
+    return driver.find_element(By.CSS_SELECTOR, "li.ant-pagination-item-active").text
+
+def total_pages(driver):
+    # Последний номер в пагинации Ant Design — всегда общее число страниц
+    return driver.execute_script("""
+        const pages = Array.from(document.querySelectorAll('li.ant-pagination-item'))
+            .map(li => parseInt(li.getAttribute('title') || li.innerText, 10))
+            .filter(n => !isNaN(n));
+        return pages.length ? Math.max(...pages) : 1;
+    """)
+
+def block_data(block):
+    return {"header": header_pairs(block), "details": detail_pairs(block)}
+
+def extract_from_html(html, backend=None, workers=None):
+    cards = map_cards(html, "sanctions", ".collapse-group .card.collapse", block_data, backend=backend, workers=workers)
+    return [build_item(card["header"], card["details"]) for card in cards]
 
-            # Раскрываем все блоки
-            buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse-group button.collapse__header")
-            for btn in buttons:
-                driver.execute_script("""
-                    const rect = arguments[0].getBoundingClientRect();
-                    window.scrollBy(0, rect.top - (window.innerHeight / 2));
-                """, btn)
-                try:
-                    btn.click()
-                except ElementClickInterceptedException:
-                    driver.execute_script("arguments[0].click();", btn)
-
-                time.sleep(0.1)
-
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            blocks = soup.select(".collapse-group .card.collapse")
-
-            for block in blocks:
-                item = {
-                    "bin": None,
-                    "organization": None,
-                    "decision_date": None,
-                    "decision_number": None,
-                    "violation_type": None,
-                    "sanction_type": None,
-                    "sanction_amount": None,
-                    "responsible_body": None,
-                    "execution_deadline": None,
-                    "npa_article": None,
-                    "note": None,
-                    "npa_type": None,
-                    "department": None,
-                }
-
-                # Заголовок
-                rows = block.select(".collapse__header__title--html .row")
-                for row in rows:
-                    k = get_text_or_none(row, ".col-md-4")
-                    v = get_text_or_none(row, ".col-md-8")
-                    if not k or not v:
-                        continue
-                    if "БИН" in k:
-                        item["bin"] = v
-                    elif "Наименование организации" in k:
-                        item["organization"] = v
-                    elif "Дата решения" in k:
-                        try:
-                            item["decision_date"] = datetime.strptime(v, "%d.%m.%Y").date().isoformat()
-                        except ValueError:
-                            item["decision_date"] = v
-                    elif "Номер принятия" in k:
-                        item["decision_number"] = v
-
-                # Детали
-                details = block.select(".collapse__content__card .row")
-                for row in details:
-                    label = get_text_or_none(row, ".typography__variant-bodyhl")
-                    value = get_text_or_none(row, ".typography__variant-body")
-                    if not label:
-                        continue
-                    if "Вид взыскания" in label:
-                        item["violation_type"] = value
-                    elif "Тип взыскания" in label:
-                        item["sanction_type"] = value
-                    elif "Наложенное взыскание" in label:
-                        item["sanction_amount"] = value
-                    elif "Существо нарушения" in label:
-                        item["responsible_body"] = value
-                    elif "Срок исполнения" in label:
-                        try:
-                            item["execution_deadline"] = datetime.strptime(value, "%d.%m.%Y").date().isoformat()
-                        except ValueError:
-                            item["execution_deadline"] = value
-                    elif "Статья" in label:
-                        item["npa_article"] = value
-                    elif "Примечание" in label:
-                        item["note"] = value
-                    elif "Тип НПА" in label:
-                        item["npa_type"] = value
-                    elif "Наименование департамента" in label:
-                        item["department"] = value
-
-                all_results.append(item)
-            
-            next_link = driver.find_element(By.CSS_SELECTOR, "li.ant-pagination-next a")
-            # проверяем, не отключена ли кнопка
-            parent_li = next_link.find_element(By.XPATH, "..")
-            if "ant-pagination-disabled" in parent_li.get_attribute("class"):
-                break  # больше нет страниц
-
-            # скроллим в видимую область
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_link)
-            time.sleep(0.2)  # даём браузеру отреагировать
-
-            old_page = current_page
-
-            # клик
+def scrape_page(driver, waiter, extraction="browser", snapshot=None):
+    # Ждём появления хотя бы одного заголовка
+    waiter.until(
+        "present",
+        EC.element_to_be_clickable((By.CSS_SELECTOR, ".collapse-group button.collapse__header")),
+        required=True,
+    )
+
+    with metrics.span("expand", registry="sanctions"):
+        # Раскрываем все блоки
+        buttons = driver.find_elements(By.CSS_SELECTOR, ".collapse-group button.collapse__header")
+        metrics.count("blocks", len(buttons), registry="sanctions")
+        for btn in buttons:
+            driver.execute_script("""
+                const rect = arguments[0].getBoundingClientRect();
+                window.scrollBy(0, rect.top - (window.innerHeight / 2));
+            """, btn)
             try:
-                next_link.click()
+                btn.click()
             except ElementClickInterceptedException:
-                driver.execute_script("arguments[0].click();", next_link)
-
-            retries = 3
-            for attempt in range(retries):
-                try:
-                    WebDriverWait(driver, 10).until(
-                        lambda d: d.find_element(By.CSS_SELECTOR, "li.ant-pagination-item-active").text != old_page
-                    )
-                    break
-                except Exception:
-                    if attempt == retries - 1:
-                        print(f"⚠️ Не удалось перейти на страницу после {old_page} даже после повторов.")
-                        break
-                    print("🔁 Повторная попытка перехода страницы...")
-                    time.sleep(2)
+                driver.execute_script("arguments[0].click();", btn)
+                metrics.count("clicks_js_fallback", registry="sanctions")
 
-    finally:
-        driver.quit()
-        shutil.rmtree(tmp_profile, ignore_errors=True)
+        # Ждём, пока отрисуется содержимое всех раскрытых карточек
+        waiter.until("all_collapse_open", present(".collapse-group .collapse__content__card", len(buttons)))
+        waiter.until("dom_quiet", dom_quiet())
+    metrics.count("pages", registry="sanctions")
+
+    html = None
+    if snapshot is not None or extraction != "browser":
+        with metrics.span("page_source", registry="sanctions"):
+            html = driver.page_source
+    if snapshot is not None:
+        # snapshot — метаданные снимка: номер прогона и страницы
+        save_snapshot("sanctions", html, **snapshot)
+
+    if extraction == "browser":
+        # Один execute_script на страницу вместо page_source + BeautifulSoup
+        with metrics.span("extract_browser", registry="sanctions"):
+            return [build_item(card["header"], card["details"]) for card in extract_sanctions(driver)]
+
+    with metrics.span("parse", registry="sanctions"):
+        return extract_from_html(html)
+
+def wait_page_change(driver, waiter, old_page):
+    retries = 3
+    for attempt in range(retries):
+        if waiter.until("page_changed", text_changed("li.ant-pagination-item-active", old_page)):
+            break
+        if attempt == retries - 1:
+            print(f"⚠️ Не удалось перейти на страницу после {old_page} даже после повторов.")
+            break
+        metrics.count("page_retries", registry="sanctions")
+        print("🔁 Повторная попытка перехода страницы...")
+
+    waiter.settle()
+    return active_page(driver)
+
+def click(driver, element):
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+    try:
+        element.click()
+    except ElementClickInterceptedException:
+        driver.execute_script("arguments[0].click();", element)
+        metrics.count("clicks_js_fallback", registry="sanctions")
+
+def next_page(driver, waiter, current_page):
+    # Возвращает номер новой страницы или None, если страниц больше нет
+    next_link = driver.find_element(By.CSS_SELECTOR, "li.ant-pagination-next a")
+    # проверяем, не отключена ли кнопка
+    parent_li = next_link.find_element(By.XPATH, "..")
+    if "ant-pagination-disabled" in parent_li.get_attribute("class"):
+        return None
+
+    # Клик может потеряться — тогда номер страницы не меняется, кликаем ещё раз
+    for _ in range(3):
+        click(driver, next_link)
+        new_page = wait_page_change(driver, waiter, current_page)
+        if new_page != current_page:
+            return new_page
+        next_link = driver.find_element(By.CSS_SELECTOR, "li.ant-pagination-next a")
+        metrics.count("pagination_reclicks", registry="sanctions")
+    raise RuntimeError(f"Не удалось перейти со страницы {current_page}")
 
+def goto_page(driver, waiter, page):
+    # Переход сразу на нужную страницу: через quick jumper, если он есть,
+    # иначе кликами по номерам и кнопкам «±5 страниц»
+    current_page = active_page(driver)
+    jumper = driver.find_elements(By.CSS_SELECTOR, ".ant-pagination-options-quick-jumper input")
+    if jumper and current_page != str(page):
+        jumper[0].clear()
+        jumper[0].send_keys(str(page), Keys.ENTER)
+        current_page = wait_page_change(driver, waiter, current_page)
+
+    while current_page != str(page):
+        target = driver.find_elements(By.CSS_SELECTOR, f"li.ant-pagination-item-{page}")
+        if target:
+            step = target[0]
+        else:
+            visible = [
+                int(li.get_attribute("title"))
+                for li in driver.find_elements(By.CSS_SELECTOR, "li.ant-pagination-item")
+                if (li.get_attribute("title") or "").isdigit()
+            ]
+            forward = page > int(current_page)
+            jump = driver.find_elements(
+                By.CSS_SELECTOR, "li.ant-pagination-jump-next" if forward else "li.ant-pagination-jump-prev"
+            )
+            if jump:
+                step = jump[0]
+            elif not visible:
+                raise RuntimeError(f"Не удалось перейти на страницу {page}: пагинация не отрисована")
+            else:
+                nearest = max(visible) if forward else min(visible)
+                step = driver.find_element(By.CSS_SELECTOR, f"li.ant-pagination-item-{nearest}")
+
+        old_page = current_page
+        click(driver, step)
+        current_page = wait_page_change(driver, waiter, old_page)
+        if current_page == old_page:
+            raise RuntimeError(f"Не удалось перейти на страницу {page}, застряли на {current_page}")
+
+def save_results(all_results, start, output_path=OUTPUT_PATH):
     # Сохраняем JSON
-    output_path = os.path.join(os.path.dirname(__file__), "sanctions.json")
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(all_results, f, ensure_ascii=False, indent=2)
+    save_watermark(newest(all_results))
 
     # Вывод инфо
-    duration = round(time.time() - start, 1)
+    metrics.observe("run", time.time() - start, registry="sanctions")
+    metrics.count("records", len(all_results), registry="sanctions")
     print(f"✅ Спарсено: {len(all_results)} записей")
     print(f"💾 JSON сохранён в: {output_path}")
-    print(f"⏱️ Время выполнения: {duration} сек")
+    metrics.write_report("sanctions", registry="sanctions")
+
+class SanctionsStream:
+    # Построчная запись в JSON Lines + чекпоинт после каждой завершённой страницы.
+    # offset в чекпоинте — размер файла после последней целой страницы: при --resume
+    # всё, что дописано после него (недописанная страница), отрезается.
+
+    def __init__(self, stream_path=STREAM_PATH, checkpoint_path=CHECKPOINT_PATH, resume=False):
+        self.stream_path = stream_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = self.load_checkpoint() if resume else None
+
+        if self.checkpoint:
+            with open(self.stream_path, "a+b") as f:
+                f.truncate(self.checkpoint["offset"])
+        else:
+            open(self.stream_path, "w").close()
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+
+        self.file = open(self.stream_path, "a", encoding="utf-8")
+        self.records = self.checkpoint["records"] if self.checkpoint else 0
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path) or not os.path.exists(self.stream_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def last_page(self):
+        return self.checkpoint["page"] if self.checkpoint else None
+
+    @property
+    def done(self):
+        return bool(self.checkpoint and self.checkpoint.get("done"))
+
+    def write_page(self, page, items, done=False, ack=None):
+        for item in items:
+            self.file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.records += len(items)
+
+        self.checkpoint = {
+            "page": int(page),
+            "offset": self.file.tell(),
+            "records": self.records,
+            "last_decision_number": items[-1].get("decision_number") if items else None,
+            "done": done,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save_checkpoint(self.checkpoint, ack)
+
+    def save_checkpoint(self, checkpoint, ack=None):
+        if ack:
+            # ack — Pipeline.after: чекпоинт сохранит поток-писатель, когда страница будет в БД
+            ack(lambda: self.save_checkpoint(checkpoint))
+            return
+        # Через временный файл: чекпоинт либо старый, либо новый, но не обрезанный
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def mark_done(self, ack=None):
+        self.checkpoint = dict(self.checkpoint, done=True)
+        self.save_checkpoint(self.checkpoint, ack)
+
+    def close(self):
+        self.file.close()
+
+def iter_stream(stream_path=STREAM_PATH):
+    with open(stream_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def compact_stream(stream_path=STREAM_PATH, output_path=OUTPUT_PATH):
+    # Сборка итогового JSON-массива из JSON Lines без загрузки всего файла в память
+    count = 0
+    best = None
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for item in iter_stream(stream_path):
+            f.write(",\n" if count else "\n")
+            f.write("\n".join("  " + line for line in json.dumps(item, ensure_ascii=False, indent=2).splitlines()))
+            best = newest([best, item] if best else [item]) or best
+            count += 1
+        f.write("\n]" if count else "]")
+    save_watermark(best)
+    print(f"🗜️ JSON собран: {output_path} ({count} записей)")
+    return count
+
+def sanctions_pipeline():
+    # Элемент очереди — страница целиком: пачка из одной страницы = одна транзакция (см. loaders.SanctionsLoader)
+    from loaders import SanctionsLoader
+    loader = SanctionsLoader()
+    return Pipeline(lambda pages: [loader(page) for page in pages], batch_size=1, maxsize=20, name="sanctions")
+
+def load_items(items, batch_size=500):
+    # Загрузка уже собранных записей (JSON Lines, результат инкрементального/параллельного обхода) пачками
+    from loaders import SanctionsLoader
+    loader = SanctionsLoader()
+    batch, count = [], 0
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            loader(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        loader(batch)
+        count += len(batch)
+    metrics.write_report("sanctions-load")
+    return count
+
+def parse_sanctions_from_snapshot(ref=None, sink=None):
+    # Повторный разбор снимков без Chrome: конкретный снимок по ref или все страницы последнего прогона
+    if ref and ref != "latest":
+        pages = [load_snapshot("sanctions", ref)]
+    else:
+        pages = [load_snapshot("sanctions", entry["sha256"]) for entry in latest_run("sanctions")]
+    all_results = []
+    with profiling.stage("extract"), metrics.span("parse", registry="sanctions"):
+        for html in pages:
+            items = extract_from_html(html)
+            if sink:
+                sink(items)
+            all_results.extend(items)
+    print(f"✅ Разобрано из снимков: {len(all_results)} записей")
+    return all_results
+
+def parse_sanctions(extraction="browser", resume=False, compact=True, snapshot=False,
+                    stream_path=STREAM_PATH, checkpoint_path=CHECKPOINT_PATH, driver=None, sink=None, ack=None):
+    # sink — приёмник записей конвейера (Pipeline.put/put_many): страница уходит в БД,
+    # пока браузер листает следующую; ack — Pipeline.after того же конвейера
+    start = time.time()
+    stream = SanctionsStream(stream_path, checkpoint_path, resume=resume)
+    if stream.done:
+        print(f"✅ Прошлый прогон уже завершён ({stream.records} записей), нечего продолжать")
+        stream.close()
+        if compact:
+            compact_stream(stream_path)
+        return stream.records
+
+    run = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    try:
+        with driver_session(driver) as driver:
+            waiter = Waiter(driver, registry="sanctions")
+            open_sanctions(driver, waiter)
+            current_page = active_page(driver)
+            if stream.last_page and stream.last_page >= total_pages(driver):
+                # Упали между последней страницей и mark_done — следующей страницы нет, обход завершён
+                print(f"✅ Страница {stream.last_page} была последней, прошлый прогон завершён")
+                current_page = None
+            elif stream.last_page:
+                print(f"⏯️ Продолжаем после страницы {stream.last_page} ({stream.records} записей)")
+                goto_page(driver, waiter, stream.last_page + 1)
+                current_page = active_page(driver)
+
+            with profiling.stage("extract"):
+                while current_page:
+                    meta = {"run": run, "page": current_page} if snapshot else None
+                    items = scrape_page(driver, waiter, extraction, meta)
+                    # Чекпоинт с конвейером сдвигается только после коммита страницы (ack):
+                    # страница, не дошедшая до БД, при --resume будет пройдена заново
+                    if sink:
+                        sink(items)
+                    stream.write_page(current_page, items, ack=ack)
+                    current_page = next_page(driver, waiter, current_page)
+            stream.mark_done(ack)
+
+    finally:
+        stream.close()
+        metrics.observe("run", time.time() - start, registry="sanctions")
+        metrics.count("records", stream.records, registry="sanctions")
+        metrics.write_report("sanctions", registry="sanctions")
+
+    print(f"✅ Спарсено: {stream.records} записей")
+    print(f"💾 JSON Lines: {stream_path}")
+    if compact:
+        with profiling.stage("compact"):
+            compact_stream(stream_path)
+    return stream.records
+
+def crawl_pages(pages, extraction="browser"):
+    # Воркер: свой Chrome со своим профилем, прыжок на первую страницу диапазона, дальше — «следующая»
+    drivers = get_pool()
+    driver = drivers.acquire()
+    waiter = Waiter(driver, registry="sanctions")
+
+    results = {}
+    try:
+        open_sanctions(driver, waiter)
+        current_page = active_page(driver)
+        for page in pages:
+            if current_page != str(page):
+                goto_page(driver, waiter, page)
+            results[page] = scrape_page(driver, waiter, extraction)
+            print(f"📄 Страница {page}: {len(results[page])} записей")
+            if page != pages[-1]:
+                current_page = next_page(driver, waiter, str(page))
+    finally:
+        drivers.release(driver)
+    return results
+
+def split_pages(total, workers):
+    # Непрерывные диапазоны, чтобы внутри воркера листать «следующей» без прыжков
+    pages = list(range(1, total + 1))
+    size, rest = divmod(total, workers)
+    chunks, offset = [], 0
+    for i in range(workers):
+        length = size + (1 if i < rest else 0)
+        if length:
+            chunks.append(pages[offset:offset + length])
+        offset += length
+    return chunks
+
+def merge_pages(page_results):
+    # Склейка в порядке страниц с дедупликацией по номеру решения
+    seen = set()
+    merged = []
+    for page in sorted(page_results):
+        for item in page_results[page]:
+            key = item.get("decision_number")
+            if key:
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(item)
+    return merged
+
+def parse_sanctions_parallel(workers=4, extraction="browser"):
+    start = time.time()
+
+    drivers = get_pool(size=workers)
+    driver = drivers.acquire()
+    try:
+        open_sanctions(driver, Waiter(driver, registry="sanctions"))
+        total = total_pages(driver)
+    finally:
+        drivers.release(driver)
+
+    chunks = split_pages(total, workers)
+    print(f"🧵 Страниц: {total}, воркеров: {len(chunks)}")
+
+    page_results = {}
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        for result in pool.map(lambda chunk: crawl_pages(chunk, extraction), chunks):
+            page_results.update(result)
+
+    all_results = merge_pages(page_results)
+    save_results(all_results, start)
+    return all_results
+
+def record_key(item):
+    return (item.get("decision_number"), item.get("decision_date"), item.get("bin"))
+
+def load_store(path=OUTPUT_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_watermark(path=STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_watermark(watermark, path=STATE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, ensure_ascii=False, indent=2)
+
+def decision_day(item):
+    # Дата решения как date; нераспознанная схемой (осталась в виде с сайта) — None
+    try:
+        return date.fromisoformat(item.get("decision_date") or "")
+    except (TypeError, ValueError):
+        return None
+
+def newest(items):
+    # Водяной знак — самое свежее решение среди тех, чью дату удалось распознать
+    dated = [i for i in items if decision_day(i)]
+    if not dated:
+        return None
+    top = max(dated, key=lambda i: (decision_day(i), i.get("decision_number") or ""))
+    return {"decision_date": decision_day(top).isoformat(), "decision_number": top.get("decision_number")}
+
+def is_known(item, known_keys, watermark):
+    if record_key(item) in known_keys:
+        return True
+    # Решения старше водяного знака уже были у нас на прошлых прогонах. Сравниваем только
+    # даты: решение с нераспознанной датой не «старое», а неизвестное — его берём
+    day = decision_day(item)
+    mark = decision_day(watermark) if watermark else None
+    return bool(day and mark and day < mark)
+
+def merge_store(new_items, existing):
+    # Новые решения появляются в голове списка — туда их и ставим
+    new_keys = {record_key(i) for i in new_items}
+    return new_items + [i for i in existing if record_key(i) not in new_keys]
+
+def parse_sanctions_incremental(extraction="browser"):
+    start = time.time()
+    existing = load_store()
+    known_keys = {record_key(i) for i in existing}
+    watermark = load_watermark() if existing else None
+    if watermark:
+        print(f"🔖 Водяной знак: {watermark['decision_date']} / {watermark['decision_number']}")
+
+    drivers = get_pool()
+    driver = drivers.acquire()
+    waiter = Waiter(driver, registry="sanctions")
+
+    new_items = []
+    try:
+        open_sanctions(driver, waiter)
+        current_page = active_page(driver)
+
+        with profiling.stage("extract"):
+            while current_page:
+                fresh = [i for i in scrape_page(driver, waiter, extraction) if not is_known(i, known_keys, watermark)]
+                print(f"📄 Страница {current_page}: новых записей {len(fresh)}")
+                if not fresh:
+                    break  # дальше только то, что уже есть
+                new_items.extend(fresh)
+                known_keys.update(record_key(i) for i in fresh)
+                current_page = next_page(driver, waiter, current_page)
+
+    finally:
+        drivers.release(driver)
+
+    all_results = merge_store(new_items, existing)
+    save_results(all_results, start)
+    print(f"🆕 Новых решений: {len(new_items)}")
+    return new_items
 
 if __name__ == "__main__":
-    parse_sanctions()
+    parser = argparse.ArgumentParser(description="Парсер реестра санкций gov.kz")
+    parser.add_argument("--workers", type=int, default=1, help="число параллельных браузеров")
+    parser.add_argument("--incremental", action="store_true", help="докачать только новые решения")
+    parser.add_argument("--resume", action="store_true", help="продолжить с последнего чекпоинта")
+    parser.add_argument("--no-compact", action="store_true", help="не собирать sanctions.json из JSON Lines")
+    parser.add_argument("--compact-only", action="store_true", help="только собрать sanctions.json из JSON Lines")
+    parser.add_argument("--snapshot", action="store_true", help="сохранять снимок каждой страницы")
+    parser.add_argument("--from-snapshot", nargs="?", const="latest", help="разобрать снимки вместо Chrome")
+    parser.add_argument("--load", action="store_true", help="загрузить решения в БД (постранично, параллельно с обходом)")
+    parser.add_argument("--load-only", action="store_true", help="только загрузить sanctions.jsonl в БД")
+    parser.add_argument("--profile", action="store_true", help="профилировать разбор и загрузку (cProfile + tracemalloc)")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable("sanctions")
+    # Конвейер — только там, где записи идут постранично; инкрементальный и параллельный
+    # обходы отдают всё разом и грузятся через load_items
+    streaming = not (args.load_only or args.compact_only or args.incremental or args.workers > 1)
+    pipeline = sanctions_pipeline() if args.load and streaming else None
+    sink = pipeline.put if pipeline else None
+    with pipeline or contextlib.nullcontext():
+        if args.load_only:
+            load_items(iter_stream())
+        elif args.from_snapshot:
+            parse_sanctions_from_snapshot(args.from_snapshot, sink=sink)
+        elif args.compact_only:
+            compact_stream()
+        elif args.incremental:
+            new_items = parse_sanctions_incremental()
+            if args.load:
+                load_items(new_items)
+        elif args.workers > 1:
+            results = parse_sanctions_parallel(args.workers)
+            if args.load:
+                load_items(results)
+        else:
+            parse_sanctions(resume=args.resume, compact=not args.no_compact, snapshot=args.snapshot,
+                            sink=sink, ack=pipeline.after if pipeline else None)
+    if pipeline:
+        metrics.write_report("sanctions-load")
@@ -0,0 +1,87 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+# Декларативное описание полей реестра: метки -> поле записи + конвертер.
+# Схема компилируется один раз: точные метки — в словарь, остальные ищутся по подстроке,
+# причём побеждает самая длинная подходящая метка, а не первая по порядку ветка if/elif.
+# Результат для каждой встреченной метки кэшируется, так что на строку — один поиск в dict.
+
+
+def to_date(value):
+    return datetime.strptime(value.strip(), "%d.%m.%Y").date()
+
+
+def to_iso_date(value):
+    return to_date(value).isoformat()
+
+
+def to_int(value):
+    return int(value.replace(" ", "").replace("\xa0", ""))
+
+
+def to_decimal(value):
+    try:
+        return Decimal(value.replace(" ", "").replace("\xa0", "").replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(value)
+
+
+class Field:
+    # from_label — значением поля становится сама метка (строки-флажки вроде
+    # «Банковские заемные операции ...»)
+
+    def __init__(self, name, *labels, convert=None, from_label=False):
+        self.name = name
+        self.labels = labels
+        self.convert = convert
+        self.from_label = from_label
+
+    def value(self, label, value):
+        if self.from_label:
+            return label
+        if self.convert is None or value is None:
+            return value
+        try:
+            return self.convert(value)
+        except (ValueError, TypeError):
+            # Не удалось привести — оставляем как есть, как делали парсеры раньше
+            return value
+
+
+class Schema:
+    # fill=True — в записи сразу все поля схемы со значением None
+
+    def __init__(self, fields, fill=False):
+        self.fields = list(fields)
+        self.fill = fill
+        self.exact = {}
+        self.substrings = []
+        for order, field in enumerate(self.fields):
+            for label in field.labels:
+                self.exact.setdefault(label, field)
+                self.substrings.append((-len(label), order, label, field))
+        self.substrings.sort(key=lambda item: item[:2])
+        self.cache = {}
+
+    def resolve(self, label):
+        try:
+            return self.cache[label]
+        except KeyError:
+            pass
+        field = self.exact.get(label)
+        if field is None and label:
+            field = next((f for _, _, sub, f in self.substrings if sub in label), None)
+        self.cache[label] = field
+        return field
+
+    def empty(self):
+        return {field.name: None for field in self.fields} if self.fill else {}
+
+    def build(self, pairs, record=None):
+        if record is None:
+            record = self.empty()
+        for label, value in pairs:
+            field = self.resolve(label)
+            if field is not None:
+                record[field.name] = field.value(label, value)
+        return record
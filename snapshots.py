@@ -0,0 +1,102 @@
+import os
+import gzip
+import json
+import hashlib
+from datetime import datetime
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+# Хранилище снимков страниц: содержимое адресуется sha256 и лежит сжатым в objects/,
+# а на каждый реестр ведётся индекс <registry>.jsonl со временем снятия — только дописывается,
+# по строке на снимок (старый <registry>.json, если остался, читается первым).
+# Одинаковые страницы хранятся один раз, сколько бы раз их ни снимали.
+
+
+def object_path(digest, root=SNAPSHOT_DIR):
+    return os.path.join(root, "objects", digest[:2], f"{digest}.html.gz")
+
+
+def index_path(registry, root=SNAPSHOT_DIR):
+    return os.path.join(root, f"{registry}.jsonl")
+
+
+def legacy_index_path(registry, root=SNAPSHOT_DIR):
+    return os.path.join(root, f"{registry}.json")
+
+
+def load_index(registry, root=SNAPSHOT_DIR):
+    index = []
+    legacy = legacy_index_path(registry, root)
+    if os.path.exists(legacy):
+        with open(legacy, "r", encoding="utf-8") as f:
+            index.extend(json.load(f))
+    path = index_path(registry, root)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    index.append(json.loads(line))
+                except ValueError:
+                    continue  # пустая или недописанная при падении строка
+    return index
+
+
+def save_snapshot(registry, html, root=SNAPSHOT_DIR, **meta):
+    data = html.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+
+    path = object_path(digest, root)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    entry = {"sha256": digest, "taken_at": datetime.now().isoformat(timespec="seconds"), "size": len(data)}
+    entry.update(meta)
+    os.makedirs(root, exist_ok=True)
+    with open(index_path(registry, root), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    print(f"📸 Снимок {registry} сохранён: {digest[:12]} ({len(data) // 1024} КБ)")
+    return digest
+
+
+def read_object(digest, root=SNAPSHOT_DIR):
+    with gzip.open(object_path(digest, root), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def resolve(registry, ref=None, root=SNAPSHOT_DIR):
+    # ref: None/"latest" — последний снимок, иначе префикс sha256 или путь к .html/.html.gz
+    if ref and os.path.isfile(ref):
+        return ref
+    index = load_index(registry, root)
+    if not index:
+        raise FileNotFoundError(f"Нет снимков для реестра {registry}")
+    if not ref or ref == "latest":
+        return index[-1]["sha256"]
+    matches = {entry["sha256"] for entry in index if entry["sha256"].startswith(ref)}
+    if len(matches) != 1:
+        raise LookupError(f"Снимок '{ref}' для {registry}: найдено {len(matches)} совпадений")
+    return matches.pop()
+
+
+def load_snapshot(registry, ref=None, root=SNAPSHOT_DIR):
+    target = resolve(registry, ref, root)
+    if os.path.isfile(target):
+        opener = gzip.open if target.endswith(".gz") else open
+        with opener(target, "rb") as f:
+            return f.read().decode("utf-8")
+    return read_object(target, root)
+
+
+def latest_run(registry, root=SNAPSHOT_DIR):
+    # Снимки многостраничного реестра (санкции) последнего прогона, по порядку страниц
+    index = load_index(registry, root)
+    if not index:
+        raise FileNotFoundError(f"Нет снимков для реестра {registry}")
+    run = index[-1].get("run")
+    entries = [entry for entry in index if entry.get("run") == run]
+    return sorted(entries, key=lambda entry: int(entry.get("page") or 0))
@@ -0,0 +1,104 @@
+from fins.models import LicenseType, OperationType, OrganizationTypeLicense
+
+
+class TaxonomyResolver:
+    # Справочники лицензий в памяти по натуральным ключам:
+    #   вид организации — name
+    #   тип лицензии    — (вид организации, name)
+    #   вид операции    — (вид организации, тип лицензии, name)
+    # Загрузчик сначала копит ключи всех операций пачки, новые значения вставляются
+    # одним bulk_create на таблицу в flush(), после чего ids() отдаёт id по ключу.
+
+    def __init__(self):
+        self.org_types = {}
+        self.license_types = {}
+        self.operation_types = {}
+        self.pending_org_types = set()
+        self.pending_license_types = set()
+        self.pending_operation_types = set()
+        self.load()
+
+    def load(self):
+        org_types_by_id = {}
+        for org_type in OrganizationTypeLicense.objects.order_by("id"):
+            self.org_types.setdefault(org_type.name, org_type)
+            org_types_by_id[org_type.id] = org_type
+
+        license_types_by_id = {}
+        for lic_type in LicenseType.objects.order_by("id"):
+            org_type = org_types_by_id.get(lic_type.type_id)
+            if org_type is None:
+                continue
+            self.license_types.setdefault((org_type.name, lic_type.name), lic_type)
+            license_types_by_id[lic_type.id] = lic_type
+
+        for op_type in OperationType.objects.exclude(licensetype=None).order_by("id"):
+            lic_type = license_types_by_id.get(op_type.licensetype_id)
+            if lic_type is None:
+                continue
+            org_type = org_types_by_id[lic_type.type_id]
+            self.operation_types.setdefault((org_type.name, lic_type.name, op_type.name), op_type)
+
+    def org_type(self, name):
+        if name not in self.org_types:
+            self.pending_org_types.add(name)
+        return name
+
+    def license_type(self, org_type_name, name):
+        key = (self.org_type(org_type_name), name)
+        if key not in self.license_types:
+            self.pending_license_types.add(key)
+        return key
+
+    def operation_type(self, license_type_key, name):
+        key = license_type_key + (name,)
+        if key not in self.operation_types:
+            self.pending_operation_types.add(key)
+        return key
+
+    def flush(self):
+        # По одному bulk_create на таблицу и одному select для получения id (не все БД
+        # возвращают pk из bulk_create)
+        if self.pending_org_types:
+            names = sorted(self.pending_org_types)
+            OrganizationTypeLicense.objects.bulk_create([OrganizationTypeLicense(name=n) for n in names])
+            for org_type in OrganizationTypeLicense.objects.filter(name__in=names).order_by("id"):
+                self.org_types.setdefault(org_type.name, org_type)
+            self.pending_org_types.clear()
+
+        if self.pending_license_types:
+            keys = sorted(self.pending_license_types)
+            LicenseType.objects.bulk_create([
+                LicenseType(type=self.org_types[org_name], name=name) for org_name, name in keys
+            ])
+            names_by_id = {self.org_types[org_name].id: org_name for org_name, _ in keys}
+            created = LicenseType.objects.filter(
+                type_id__in=names_by_id, name__in={name for _, name in keys}
+            ).order_by("id")
+            for lic_type in created:
+                self.license_types.setdefault((names_by_id[lic_type.type_id], lic_type.name), lic_type)
+            self.pending_license_types.clear()
+
+        if self.pending_operation_types:
+            keys = sorted(self.pending_operation_types)
+            OperationType.objects.bulk_create([
+                OperationType(licensetype=self.license_types[(org_name, lic_name)], name=name)
+                for org_name, lic_name, name in keys
+            ])
+            keys_by_id = {
+                self.license_types[(org_name, lic_name)].id: (org_name, lic_name)
+                for org_name, lic_name, _ in keys
+            }
+            created = OperationType.objects.filter(
+                licensetype_id__in=keys_by_id, name__in={name for _, _, name in keys}
+            ).order_by("id")
+            for op_type in created:
+                self.operation_types.setdefault(keys_by_id[op_type.licensetype_id] + (op_type.name,), op_type)
+            self.pending_operation_types.clear()
+
+    def ids(self, org_type_name, license_type_name, operation_name):
+        # (id типа лицензии, id вида операции) — после flush()
+        return (
+            self.license_types[(org_type_name, license_type_name)].id,
+            self.operation_types[(org_type_name, license_type_name, operation_name)].id,
+        )
@@ -0,0 +1,32 @@
+import os
+import sys
+import types
+
+import django
+from django.conf import settings
+
+# Django для тестов без основного проекта. Корень репозитория и есть приложение fins
+# (models.py, migrations/) — регистрируем его пакетом fins, чтобы работали импорты
+# from fins.models, и настраиваем sqlite в памяти. Таблицы создаются по текущим моделям:
+# начальной миграции 0001 в этом дереве нет.
+# Заданный DJANGO_SETTINGS_MODULE (настройки проекта с настоящим fins) не трогаем.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+if not os.environ.get("DJANGO_SETTINGS_MODULE") and not settings.configured:
+    if "fins" not in sys.modules:
+        fins = types.ModuleType("fins")
+        fins.__path__ = [ROOT]
+        sys.modules["fins"] = fins
+    settings.configure(
+        INSTALLED_APPS=["fins"],
+        DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        MIGRATION_MODULES={"fins": None},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        DEFAULT_AUTO_FIELD="django.db.models.AutoField",
+        USE_TZ=False,
+    )
+    django.setup()
@@ -0,0 +1,123 @@
+import unittest
+
+from bench import mock_kdfo
+
+# FinResolver против заглушки КДФО: найденный БИН, отрицательный кэш, ошибки сервиса
+# и истечение TTL отрицательной записи. Django настраивает tests/conftest.py (sqlite в памяти),
+# либо берутся настройки проекта из DJANGO_SETTINGS_MODULE — тогда в отдельной тестовой БД
+# (create_test_db), рабочую не трогаем.
+
+FOUND = "000000000001"
+MISSING = "000000000002"
+FAILING = "000000000003"
+
+fin_resolver = None
+Fin = None
+old_config = None
+
+
+def setUpModule():
+    global fin_resolver, Fin, old_config
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+    old_config = connection.creation.create_test_db(verbosity=0)
+
+    import fin_resolver as module
+    from fins.models import Fin as model
+    fin_resolver, Fin = module, model
+
+
+def tearDownModule():
+    from django.db import connection
+    from django.test.utils import teardown_test_environment
+
+    connection.creation.destroy_test_db(old_config, verbosity=0)
+    teardown_test_environment()
+
+
+class FinResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.kdfo = mock_kdfo.KdfoConfig(found=[FOUND], failing=[FAILING])
+        self.server, url_template = mock_kdfo.serve(self.kdfo)
+        self.cache = fin_resolver.KdfoCache(path=None, missing_ttl=60)
+        self.resolver = fin_resolver.FinResolver(fin_resolver.make_http_lookup(url_template), workers=2, cache=self.cache)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        Fin.objects.all().delete()
+
+    def test_hit_creates_fin_and_caches_found(self):
+        fins = self.resolver.resolve([FOUND])
+
+        self.assertEqual(fins[FOUND].short_name_ru, "АО «Организация 1»")
+        self.assertTrue(self.cache.fresh(FOUND)["found"])
+        # Второй раз БИН уже в БД — в КДФО не ходим
+        self.resolver.resolve([FOUND])
+        self.assertEqual(self.kdfo.requests[FOUND], 1)
+
+    def test_miss_is_cached_negative(self):
+        fins = self.resolver.resolve([MISSING])
+
+        self.assertNotIn(MISSING, fins)
+        self.assertFalse(self.cache.fresh(MISSING)["found"])
+        self.resolver.resolve([MISSING])
+        self.assertEqual(self.kdfo.requests[MISSING], 1)
+
+    def test_error_is_not_cached(self):
+        fins = self.resolver.resolve([FAILING])
+
+        self.assertNotIn(FAILING, fins)
+        self.assertIsNone(self.cache.fresh(FAILING))
+        self.resolver.resolve([FAILING])
+        self.assertEqual(self.kdfo.requests[FAILING], 2)
+
+    def test_one_read_and_one_read_back(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            fins = self.resolver.resolve([FOUND, MISSING, FAILING])
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(set(fins), {FOUND})
+        self.assertEqual(len(selects), 2)
+
+        # Известный БИН и БИН из отрицательного кэша — один select, без КДФО
+        with CaptureQueriesContext(connection) as queries:
+            self.resolver.resolve([FOUND, MISSING])
+        self.assertEqual(len(queries), 1)
+        self.assertEqual((self.kdfo.requests[FOUND], self.kdfo.requests[MISSING]), (1, 1))
+
+    def test_negative_entry_expires(self):
+        self.resolver.resolve([MISSING])
+        self.cache.entries[MISSING]["checked_at"] -= self.cache.missing_ttl + 1
+
+        self.assertIsNone(self.cache.fresh(MISSING))
+        self.resolver.resolve([MISSING])
+        self.assertEqual(self.kdfo.requests[MISSING], 2)
+        self.assertFalse(self.cache.fresh(MISSING)["found"])
+
+    def test_found_decided_by_database_not_lookup_result(self):
+        # Как update_fin_from_kdfo: lookup сам пишет Fin, а его ответ ничего не значит
+        def writes_and_returns_none(bin_code):
+            if bin_code == FOUND:
+                Fin.objects.create(bin=bin_code)
+
+        def returns_true_without_writing(bin_code):
+            return True
+
+        resolver = fin_resolver.FinResolver(writes_and_returns_none, workers=1, cache=self.cache)
+        self.assertIn(FOUND, resolver.resolve([FOUND]))
+        self.assertTrue(self.cache.fresh(FOUND)["found"])
+
+        resolver = fin_resolver.FinResolver(returns_true_without_writing, workers=1, cache=self.cache)
+        self.assertNotIn(MISSING, resolver.resolve([MISSING]))
+        self.assertFalse(self.cache.fresh(MISSING)["found"])
+
+
+if __name__ == "__main__":
+    unittest.main()
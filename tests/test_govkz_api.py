@@ -0,0 +1,137 @@
+import os
+import json
+import tempfile
+import unittest
+
+import govkz_api
+
+# fetch-режим против локального стаба (serve_captures) на записанных вручную ответах:
+# постраничный GET в формате Spring Data, постраничный POST с номером в JSON-теле,
+# ответы с {label, value} и посторонний эндпоинт без записей реестра.
+
+HOST = "https://www.gov.kz"
+
+
+def sanction(i):
+    return {
+        "bin": f"{i:012d}",
+        "organization": f"ТОО «Организация {i}»",
+        "decisionDate": "02.01.2024",
+        "decisionNumber": f"{i}-1",
+        "sanctionType": "Штраф",
+        "department": {"label": "Наименование департамента", "value": "Департамент надзора"},
+    }
+
+
+def spring_page(items, number, total_pages):
+    return {"content": items, "number": number, "totalPages": total_pages, "last": number == total_pages - 1}
+
+
+class StubCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.endpoints = {}
+        self.server = None
+
+    def tearDown(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        self.tmp.cleanup()
+
+    def capture(self, registry, url, payload, method="GET", body=None):
+        directory = os.path.join(self.tmp.name, registry)
+        os.makedirs(directory, exist_ok=True)
+        items = self.endpoints.setdefault(registry, [])
+        name = f"{len(items):03d}.json"
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        items.append({"url": HOST + url, "method": method, "body": body, "capture": name})
+
+    def fetch(self, registry):
+        self.server, base_url = govkz_api.serve_captures(self.endpoints, self.tmp.name)
+        return govkz_api.fetch_registry(registry, base_url, endpoints=self.endpoints)
+
+
+class FetchRegistryTest(StubCase):
+    def test_sanctions_follow_pages_and_map_plain_keys(self):
+        pages = [[sanction(1), sanction(2)], [sanction(3), sanction(4)], [sanction(5)]]
+        for number, items in enumerate(pages):
+            self.capture("sanctions", f"/api/sanctions?size=2&page={number}", spring_page(items, number, len(pages)))
+        self.capture("sanctions", "/api/menu?lang=ru", {"menu": [{"title": "Главная", "url": "/"}]})
+
+        records = self.fetch("sanctions")
+
+        self.assertEqual([r["decision_number"] for r in records], ["1-1", "2-1", "3-1", "4-1", "5-1"])
+        self.assertEqual(records[0]["bin"], "000000000001")
+        self.assertEqual(records[0]["organization"], "ТОО «Организация 1»")
+        self.assertEqual(records[0]["decision_date"], "2024-01-02")
+        self.assertEqual(records[0]["sanction_type"], "Штраф")
+        self.assertEqual(records[0]["department"], "Департамент надзора")
+
+    def test_fetch_pages_beyond_captured_until_last(self):
+        # Через браузер записана только первая страница — остальные дочитываются по номеру
+        self.capture("sanctions", "/api/sanctions?page=0", spring_page([sanction(1)], 0, 2))
+        self.capture("sanctions", "/api/sanctions?page=1", spring_page([sanction(2)], 1, 2))
+        self.server, base_url = govkz_api.serve_captures(self.endpoints, self.tmp.name)
+
+        first_only = {"sanctions": self.endpoints["sanctions"][:1]}
+        records = govkz_api.fetch_registry("sanctions", base_url, endpoints=first_only)
+        self.assertEqual([r["decision_number"] for r in records], ["1-1", "2-1"])
+
+    def test_stub_routes_on_query(self):
+        self.capture("sanctions", "/api/sanctions?page=0", spring_page([sanction(1)], 0, 2))
+        self.capture("sanctions", "/api/sanctions?page=1", spring_page([sanction(2)], 1, 2))
+        self.server, base_url = govkz_api.serve_captures(self.endpoints, self.tmp.name)
+        session = govkz_api.make_session()
+        try:
+            first = session.get(base_url + "/api/sanctions?page=0").json()
+            second = session.get(base_url + "/api/sanctions?page=1").json()
+            missing = session.get(base_url + "/api/sanctions?page=2")
+        finally:
+            session.close()
+        self.assertEqual(first["content"][0]["decisionNumber"], "1-1")
+        self.assertEqual(second["content"][0]["decisionNumber"], "2-1")
+        self.assertEqual(missing.status_code, 404)
+
+    def test_post_pages_in_json_body(self):
+        for number in range(2):
+            body = json.dumps({"pageNumber": number + 1, "pageSize": 1})
+            payload = {"data": {"items": [sanction(number + 1)], "total": 2}}
+            self.capture("sanctions", "/api/sanctions/search", payload, method="POST", body=body)
+        # Страница 3 — пустая, на ней обход и заканчивается
+        self.capture("sanctions", "/api/sanctions/search", {"data": {"items": [], "total": 2}},
+                     method="POST", body=json.dumps({"pageNumber": 3, "pageSize": 1}))
+
+        records = self.fetch("sanctions")
+        self.assertEqual([r["decision_number"] for r in records], ["1-1", "2-1"])
+
+    def test_issued_labelled_pairs_and_name(self):
+        item = {
+            "id": 7,
+            "name": "АО «Банк 7»",
+            "fields": [
+                {"label": "БИН", "value": "000000000007"},
+                {"label": "Номер действующей лицензии", "value": "1.2.7/1"},
+                {"label": "Количество операций", "value": "12"},
+            ],
+        }
+        self.capture("issued", "/api/registry/19?page=0", spring_page([item], 0, 1))
+
+        records = self.fetch("issued")
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["name"], "АО «Банк 7»")
+        self.assertEqual(records[0]["bin"], "000000000007")
+        self.assertEqual(records[0]["current_license_number"], "1.2.7/1")
+        self.assertEqual(records[0]["operations_count"], 12)
+
+    def test_explicit_field_mapping(self):
+        self.capture("sanctions", "/api/sanctions?page=0", spring_page([{"iin_bin": "000000000009", "num": "9-1"}], 0, 1))
+        self.endpoints["sanctions"][0]["fields"] = {"iin_bin": "bin", "num": "decision_number"}
+
+        records = self.fetch("sanctions")
+        self.assertEqual((records[0]["bin"], records[0]["decision_number"]), ("000000000009", "9-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import io
+import os
+import sys
+import types
+import tempfile
+import unittest
+from datetime import date
+from contextlib import redirect_stdout
+from unittest import mock
+
+import issued_parser
+import issued_insurances_parser
+from bench import fixtures
+
+# --load --pipeline на сохранённом снимке: записи уходят в загрузчик через поток-писатель.
+# Загрузчик подменён модулем-заглушкой loaders — БД не нужна.
+
+
+class PipelinedLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.batches = []
+        loaders = types.ModuleType("loaders")
+        loaders.load_issued_licenses = self.batches.append
+        patcher = mock.patch.dict(sys.modules, {"loaders": loaders})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def snapshot(self, registry, cards):
+        path = os.path.join(self.tmp.name, f"{registry}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(fixtures.registry_page(registry, cards))
+        return path
+
+    def loaded(self):
+        return [record for batch in self.batches for record in batch]
+
+    def test_issued(self):
+        path = self.snapshot("issued", 5)
+        with redirect_stdout(io.StringIO()):
+            issued_parser.parse_issued_licenses(from_snapshot=path, load=True, pipelined=True)
+
+        self.assertEqual(self.loaded(), issued_parser.extract_from_snapshot(path))
+        self.assertEqual(len(self.loaded()), 5)
+
+    def test_insurances(self):
+        path = self.snapshot("insurances", 4)
+        with redirect_stdout(io.StringIO()):
+            issued_insurances_parser.parse_issued_assurances_licenses(from_snapshot=path, load=True, pipelined=True)
+
+        self.assertEqual(len(self.loaded()), 4)
+        reissues = [r for record in self.loaded() for r in record["reissues"] or []]
+        self.assertTrue(reissues)
+        self.assertTrue(all(isinstance(r["date"], date) for r in reissues))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+import registry
+from bench import fixtures
+
+# Разбор снимков экспериментальных реестров suspended/revoked. Страницы собраны вручную по
+# меткам схем — это фиксирует, что схема разбирает карточку в обеих вёрстках строк
+# (th/td и две td), но не то, что метки совпадают с настоящим gov.kz.
+
+SUSPENDED = [
+    ("БИН", "000000000011"),
+    ("Номер лицензии", "1.2.11/1"),
+    ("Дата выдачи лицензии", "05.03.2015"),
+    ("Тип приостановления", "Полное"),
+    ("Номер решения", "214"),
+    ("Дата решения", "12.09.2023"),
+    ("Основание", "подпункт 2) пункта 1 статьи 48 Закона о банках"),
+    ("Валюта", "KZT"),
+]
+
+REVOKED = [
+    ("БИН", "000000000012"),
+    ("Номер решения", "77"),
+    ("Дата решения", "01.02.2022"),
+    ("Номер лицензии", "1.1.12"),
+    ("Дата выдачи лицензии", "19.06.2008"),
+    ("Вид деятельности", "банковские операции"),
+    ("Валюта", "в национальной и иностранной валюте"),
+]
+
+
+def page(name, pairs, layout):
+    content = fixtures.descriptions(pairs) if layout == "descriptions" else fixtures.two_cells(pairs)
+    return fixtures.page_shell(fixtures.card(name, content))
+
+
+class ExperimentalRegistryTest(unittest.TestCase):
+    def replay(self, registry_name, html):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"{registry_name}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+            return registry.parse_from_snapshot(registry_name, path)
+
+    def test_suspended_card(self):
+        for layout in ("descriptions", "cells"):
+            records = self.replay("suspended", page("АО «Банк 11»", SUSPENDED, layout))
+            self.assertEqual(records, [{
+                "name": "АО «Банк 11»",
+                "bin": "000000000011",
+                "license_number": "1.2.11/1",
+                "license_issue_date": "05.03.2015",
+                "suspension_type": "Полное",
+                "decision_number": "214",
+                "decision_date": "12.09.2023",
+                "suspension_reason": "подпункт 2) пункта 1 статьи 48 Закона о банках",
+                "currency": "KZT",
+            }])
+
+    def test_revoked_card(self):
+        for layout in ("descriptions", "cells"):
+            records = self.replay("revoked", page("АО «Банк 12»", REVOKED, layout))
+            self.assertEqual(records, [{
+                "name": "АО «Банк 12»",
+                "bin": "000000000012",
+                "decision_number": "77",
+                "decision_date": "01.02.2022",
+                "license_number": "1.1.12",
+                "license_issue_date": "19.06.2008",
+                "activity_type": "банковские операции",
+                "currency": "в национальной и иностранной валюте",
+            }])
+
+    def test_check_schema_reports_unknown_and_missing(self):
+        pairs = [pair for pair in SUSPENDED if pair[0] != "Основание"] + [("Срок приостановления", "6 месяцев")]
+        cards, unknown, missing = registry.REGISTRIES["suspended"].check_schema(page("АО «Банк 11»", pairs, "descriptions"))
+        self.assertEqual((cards, unknown, missing), (1, ["Срок приостановления"], ["suspension_reason"]))
+
+    def test_experimental_without_address_is_skipped(self):
+        for name in ("suspended", "revoked"):
+            spec = registry.REGISTRIES[name]
+            self.assertTrue(spec.experimental)
+            if not os.environ.get(f"GOVKZ_{name.upper()}_URL"):
+                self.assertIsNone(spec.address())
+
+
+if __name__ == "__main__":
+    unittest.main()
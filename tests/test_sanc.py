@@ -0,0 +1,33 @@
+import unittest
+
+import sanc
+
+# Водяной знак инкрементального обхода: сравниваются только распознанные даты решений.
+
+
+def decision(number, decision_date, bin_code="000000000001"):
+    return {"decision_number": number, "decision_date": decision_date, "bin": bin_code}
+
+
+class WatermarkTest(unittest.TestCase):
+    def test_newest_ignores_unparsed_dates(self):
+        items = [decision("1", "2023-05-01"), decision("2", "31.12.2024 г."), decision("3", "2024-02-10")]
+        self.assertEqual(sanc.newest(items), {"decision_date": "2024-02-10", "decision_number": "3"})
+        self.assertIsNone(sanc.newest([decision("2", "31.12.2024 г.")]))
+
+    def test_is_known(self):
+        watermark = {"decision_date": "2024-02-10", "decision_number": "3"}
+        known = {sanc.record_key(decision("3", "2024-02-10"))}
+
+        self.assertTrue(sanc.is_known(decision("3", "2024-02-10"), known, watermark))
+        self.assertTrue(sanc.is_known(decision("1", "2023-05-01"), known, watermark))
+        self.assertFalse(sanc.is_known(decision("4", "2024-02-11"), known, watermark))
+        self.assertFalse(sanc.is_known(decision("5", "2024-02-10"), known, watermark))
+        # Сырая дата с сайта строкой «меньше» ISO-водяного знака, но это не значит, что решение старое
+        self.assertFalse(sanc.is_known(decision("6", "01.03.2025"), known, watermark))
+        self.assertFalse(sanc.is_known(decision("7", None), known, watermark))
+        self.assertFalse(sanc.is_known(decision("1", "2023-05-01"), set(), None))
+
+
+if __name__ == "__main__":
+    unittest.main()
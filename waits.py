@@ -0,0 +1,191 @@
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+import metrics
+
+# Таймауты по умолчанию для каждого вида ожидания, сек
+DEFAULT_TIMEOUTS = {
+    "page_ready": 30,
+    "network_idle": 15,
+    "dom_quiet": 10,
+    "present": 15,
+    "collapse_open": 3,
+    "all_collapse_open": 15,
+    "page_changed": 10,
+}
+
+# Счётчик незавершённых XHR/fetch и отметка последней мутации DOM.
+# Ставится до скриптов страницы через CDP и повторно после загрузки (на случай, если CDP нет).
+HOOKS_JS = """
+(function () {
+    if (window.__waitHooks) { return; }
+    window.__waitHooks = true;
+    window.__pendingRequests = 0;
+    window.__lastActivity = Date.now();
+
+    const begin = () => { window.__pendingRequests++; window.__lastActivity = Date.now(); };
+    const end = () => { window.__pendingRequests = Math.max(0, window.__pendingRequests - 1); window.__lastActivity = Date.now(); };
+
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end);
+        return send.apply(this, arguments);
+    };
+
+    if (window.fetch) {
+        const fetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return fetch.apply(this, arguments).finally(end);
+        };
+    }
+
+    const observe = () => {
+        window.__lastMutation = Date.now();
+        new MutationObserver(() => { window.__lastMutation = Date.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    };
+    if (document.documentElement) { observe(); }
+    else { document.addEventListener('DOMContentLoaded', observe); }
+})();
+"""
+
+
+def install_hooks(driver):
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": HOOKS_JS})
+    except (AttributeError, WebDriverException):
+        pass
+
+
+def inject_hooks(driver):
+    driver.execute_script(HOOKS_JS)
+
+
+# Условия — обычные callables для WebDriverWait: driver -> truthy/falsy
+
+def document_ready():
+    return lambda d: d.execute_script("return document.readyState") == "complete"
+
+
+def network_idle(quiet=0.5):
+    quiet_ms = int(quiet * 1000)
+    return lambda d: d.execute_script(
+        "return window.__waitHooks === undefined || "
+        "(window.__pendingRequests === 0 && Date.now() - window.__lastActivity >= arguments[0]);",
+        quiet_ms,
+    )
+
+
+def dom_quiet(quiet=0.3):
+    quiet_ms = int(quiet * 1000)
+    return lambda d: d.execute_script(
+        "return !window.__lastMutation || Date.now() - window.__lastMutation >= arguments[0];",
+        quiet_ms,
+    )
+
+
+def present(selector, min_count=1):
+    return lambda d: d.execute_script(
+        "return document.querySelectorAll(arguments[0]).length >= arguments[1];",
+        selector, min_count,
+    )
+
+
+def collapse_open(element):
+    # Внутренний ant-collapse раскрыт и его содержимое уже отрисовано
+    return lambda d: d.execute_script(
+        """
+        const item = arguments[0].closest('.ant-collapse-item');
+        return !item || (item.classList.contains('ant-collapse-item-active')
+            && item.querySelector('.ant-collapse-content') !== null);
+        """,
+        element,
+    )
+
+
+def all_collapse_open():
+    return lambda d: d.execute_script(
+        """
+        const items = document.querySelectorAll('.ant-collapse-item');
+        for (const item of items) {
+            if (!item.querySelector('.ant-collapse-content')) { return false; }
+        }
+        return true;
+        """
+    )
+
+
+def text_changed(selector, old_text):
+    return lambda d: d.execute_script(
+        "const el = document.querySelector(arguments[0]); return el !== null && el.innerText.trim() !== arguments[1];",
+        selector, old_text,
+    )
+
+
+def all_of(*conditions):
+    return lambda d: all(condition(d) for condition in conditions)
+
+
+class Waiter:
+    def __init__(self, driver, timeouts=None, poll=0.05, registry=None):
+        self.driver = driver
+        self.registry = registry
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.poll = poll
+        self.stats = defaultdict(list)
+        self.timeouts_hit = defaultdict(int)
+
+    def until(self, name, condition, timeout=None, required=False):
+        # Ждём ровно столько, сколько нужно странице, и запоминаем фактическое время
+        timeout = timeout if timeout is not None else self.timeouts.get(name, 10)
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(condition)
+        except TimeoutException:
+            self.record(name, time.perf_counter() - start)
+            self.timeouts_hit[name] += 1
+            metrics.count("wait_timeouts", registry=self.registry, wait=name)
+            if required:
+                raise
+            print(f"⚠️ Ожидание '{name}' не дождалось условия за {timeout} сек")
+            return None
+        self.record(name, time.perf_counter() - start)
+        return result
+
+    def record(self, name, seconds):
+        self.stats[name].append(seconds)
+        metrics.observe("wait", seconds, registry=self.registry, wait=name)
+
+    def page_ready(self):
+        inject_hooks(self.driver)
+        self.until("page_ready", document_ready())
+        self.until("network_idle", network_idle())
+        self.until("dom_quiet", dom_quiet())
+
+    def settle(self):
+        self.until("network_idle", network_idle())
+        self.until("dom_quiet", dom_quiet())
+
+    def summary(self):
+        return {
+            name: {
+                "count": len(durations),
+                "total": round(sum(durations), 3),
+                "max": round(max(durations), 3),
+                "timeouts": self.timeouts_hit.get(name, 0),
+            }
+            for name, durations in self.stats.items()
+        }
+
+    def report(self):
+        print("⏳ Ожидания:")
+        for name, stat in self.summary().items():
+            print(
+                f"  └ {name}: {stat['count']} раз, всего {stat['total']} сек, "
+                f"макс {stat['max']} сек, таймаутов {stat['timeouts']}"
+            )